@@ -0,0 +1,305 @@
+"""
+Activity Tracker for ScienceGPT
+Buffered learning-activity events applied to student progress on a background thread
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+# (kind, session_id, timestamp, payload)
+Event = Tuple[str, str, float, Dict[str, Any]]
+
+
+def new_progress_data() -> Dict[str, Any]:
+    """Empty progress record in the shape StudentProgress keeps in session state"""
+    return {
+        "sessions": [],
+        "questions_by_subject": {},
+        "questions_by_grade": {},
+        "learning_time": {},
+        "topic_coverage": {},
+        "performance_metrics": {
+            "total_questions": 0,
+            "total_time_spent": 0,
+            "favorite_subjects": [],
+            "learning_patterns": {}
+        }
+    }
+
+
+def open_session(grade: int, language: str, start: Optional[datetime] = None) -> Dict[str, Any]:
+    """Create a learning session record"""
+    return {
+        "start_time": (start or datetime.now()).isoformat(),
+        "end_time": None,
+        "questions_asked": 0,
+        "subjects_covered": set(),
+        "grade": grade,
+        "language": language
+    }
+
+
+def apply_question(data: Dict[str, Any], session: Optional[Dict[str, Any]], subject: str, grade: int,
+                   topic: Optional[str] = None):
+    """Count a question in the progress record and the open session"""
+    if session is not None:
+        session["questions_asked"] += 1
+        session["subjects_covered"].add(subject)
+
+    by_subject = data["questions_by_subject"]
+    by_subject[subject] = by_subject.get(subject, 0) + 1
+
+    grade_key = f"Grade {grade}"
+    by_grade = data["questions_by_grade"]
+    by_grade[grade_key] = by_grade.get(grade_key, 0) + 1
+
+    if topic and topic != "All Topics":
+        data["topic_coverage"].setdefault(subject, set()).add(topic)
+
+    data["performance_metrics"]["total_questions"] += 1
+
+
+def close_session(data: Dict[str, Any], session: Dict[str, Any], end: Optional[datetime] = None):
+    """Finish a session, append it to the history and update the derived metrics"""
+    session["end_time"] = (end or datetime.now()).isoformat()
+    session["subjects_covered"] = list(session["subjects_covered"])
+    data["sessions"].append(session)
+
+    start_time = datetime.fromisoformat(session["start_time"])
+    end_time = datetime.fromisoformat(session["end_time"])
+    data["performance_metrics"]["total_time_spent"] += max(0.0, (end_time - start_time).total_seconds() / 60)
+
+    favorite_subjects = sorted(data["questions_by_subject"].items(), key=lambda x: x[1], reverse=True)[:3]
+    data["performance_metrics"]["favorite_subjects"] = [
+        {"subject": subject, "count": count} for subject, count in favorite_subjects
+    ]
+
+
+class _TrackedSession:
+    """Background-side view of one browser session"""
+
+    __slots__ = ("data", "current", "last_seen", "lock", "grade", "language", "version")
+
+    def __init__(self, data: Dict[str, Any]):
+        self.data = data
+        self.version = 0
+        self.current: Optional[Dict[str, Any]] = None
+        self.last_seen = 0.0
+        self.lock = threading.Lock()
+        self.grade = 3
+        self.language = "English"
+
+
+class ActivityTracker:
+    """Collects activity events in memory and applies them to progress data in batches
+
+    The request path only appends a tuple to a deque. A background thread drains the
+    queue every ``flush_interval`` seconds (or sooner once ``batch_size`` events are
+    waiting), opens a learning session on the first heartbeat, and closes it at the
+    last heartbeat once the student has been idle for ``idle_timeout`` seconds.
+
+    A session has at most one heartbeat queued: later ones only refresh it, so the
+    queue grows with active sessions and questions, not with reruns. When it is
+    full anyway, heartbeats are shed at half of ``max_queue`` so questions and
+    session ends keep the rest.
+    """
+
+    def __init__(self, flush_interval: float = 2.0, batch_size: int = 1000, idle_timeout: float = 1800.0,
+                 max_queue: int = 100_000, start_thread: bool = True):
+        """Initialize the queue and, unless disabled, start the flush thread"""
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.idle_timeout = idle_timeout
+        self._queue: deque = deque()
+        self.max_queue = max_queue
+        # session_id -> payload of its queued heartbeat, refreshed in place by later heartbeats
+        self._pending_heartbeats: Dict[str, Dict[str, Any]] = {}
+        self._queue_lock = threading.Lock()
+        self._sessions: Dict[str, _TrackedSession] = {}
+        self._sessions_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._flush_lock = threading.Lock()
+        self.stats = {
+            "enqueued": 0,
+            "coalesced": 0,
+            "dropped": 0,
+            "dropped_heartbeats": 0,
+            "applied": 0,
+            "batches": 0,
+            "sessions_started": 0,
+            "sessions_ended": 0,
+            "last_flush_ms": 0.0,
+            "max_lag_ms": 0.0
+        }
+        if start_thread:
+            threading.Thread(target=self._loop, name="activity-flush", daemon=True).start()
+
+    def _enqueue(self, kind: str, session_id: str, payload: Dict[str, Any]):
+        """O(1) append from the request path; drops the event if the queue is full"""
+        now = time.time()
+        with self._queue_lock:
+            if kind == "heartbeat":
+                pending = self._pending_heartbeats.get(session_id)
+                if pending is not None:
+                    pending.update(payload, last_seen=now)
+                    self.stats["coalesced"] += 1
+                    return
+                if len(self._queue) >= self.max_queue // 2:
+                    self.stats["dropped_heartbeats"] += 1
+                    return
+                payload["last_seen"] = now
+                self._pending_heartbeats[session_id] = payload
+            elif len(self._queue) >= self.max_queue:
+                self.stats["dropped"] += 1
+                return
+            self._queue.append((kind, session_id, now, payload))
+            self.stats["enqueued"] += 1
+            queued = len(self._queue)
+        if queued >= self.batch_size:
+            self._wake.set()
+
+    def _take_batch(self) -> List[Event]:
+        """Pop up to ``batch_size`` events, releasing their sessions' heartbeat slots"""
+        with self._queue_lock:
+            batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+            for kind, session_id, _, _ in batch:
+                if kind == "heartbeat":
+                    self._pending_heartbeats.pop(session_id, None)
+        return batch
+
+    def heartbeat(self, session_id: str, progress_data: Dict[str, Any], grade: int, language: str):
+        """Record that a session is active (call once per rerun)"""
+        self._enqueue("heartbeat", session_id, {"data": progress_data, "grade": grade, "language": language})
+
+    def question(self, session_id: str, subject: str, grade: int, topic: Optional[str] = None):
+        """Record a question asked in a session"""
+        self._enqueue("question", session_id, {"subject": subject, "grade": grade, "topic": topic})
+
+    def end(self, session_id: str):
+        """Close a session's current learning session explicitly"""
+        self._enqueue("end", session_id, {})
+
+    def session_lock(self, session_id: Optional[str]) -> threading.Lock:
+        """Lock guarding a session's progress data against a concurrent flush"""
+        with self._sessions_lock:
+            tracked = self._sessions.get(session_id)
+        return tracked.lock if tracked is not None else threading.Lock()
+
+    def data_version(self, session_id: Optional[str]) -> Tuple[int, int]:
+        """Counter bumped whenever a flush changes a session's progress data
+
+        Paired with the tracked record's identity, since an idle session's record is
+        dropped and a new one starts from zero.
+        """
+        with self._sessions_lock:
+            tracked = self._sessions.get(session_id)
+        return (id(tracked), tracked.version) if tracked is not None else (0, 0)
+
+    def _apply(self, event: Event):
+        kind, session_id, timestamp, payload = event
+        with self._sessions_lock:
+            tracked = self._sessions.get(session_id)
+            if tracked is None:
+                if kind != "heartbeat":
+                    return
+                tracked = self._sessions[session_id] = _TrackedSession(payload["data"])
+
+        with tracked.lock:
+            moment = datetime.fromtimestamp(timestamp)
+            if kind == "heartbeat":
+                tracked.data = payload["data"]
+                tracked.grade = payload["grade"]
+                tracked.language = payload["language"]
+            if tracked.current is not None and timestamp - tracked.last_seen > self.idle_timeout:
+                close_session(tracked.data, tracked.current, datetime.fromtimestamp(tracked.last_seen))
+                tracked.current = None
+                tracked.version += 1
+                self.stats["sessions_ended"] += 1
+
+            if kind == "end":
+                if tracked.current is not None:
+                    close_session(tracked.data, tracked.current, moment)
+                    tracked.current = None
+                    tracked.version += 1
+                    self.stats["sessions_ended"] += 1
+                return
+
+            if tracked.current is None:
+                tracked.current = open_session(tracked.grade, tracked.language, moment)
+                self.stats["sessions_started"] += 1
+            # A coalesced heartbeat is queued at its first rerun and carries the time of its last
+            tracked.last_seen = max(tracked.last_seen, payload.get("last_seen", timestamp))
+            if kind == "question":
+                apply_question(tracked.data, tracked.current, payload["subject"], payload["grade"], payload["topic"])
+                tracked.version += 1
+
+    def _expire_idle(self, now: float):
+        """Close sessions idle past the timeout and stop tracking them"""
+        with self._sessions_lock:
+            idle = [(sid, t) for sid, t in self._sessions.items() if now - t.last_seen > self.idle_timeout]
+            for session_id, _ in idle:
+                del self._sessions[session_id]
+        for _, tracked in idle:
+            with tracked.lock:
+                if tracked.current is not None:
+                    close_session(tracked.data, tracked.current, datetime.fromtimestamp(tracked.last_seen))
+                    tracked.current = None
+                    tracked.version += 1
+                    self.stats["sessions_ended"] += 1
+
+    def flush(self) -> int:
+        """Apply every queued event now; returns how many were applied"""
+        with self._flush_lock:
+            start = time.perf_counter()
+            applied = 0
+            while True:
+                batch = self._take_batch()
+                if not batch:
+                    break
+                self.stats["max_lag_ms"] = max(self.stats["max_lag_ms"], (time.time() - batch[0][2]) * 1000)
+                for event in batch:
+                    self._apply(event)
+                applied += len(batch)
+                self.stats["batches"] += 1
+            self._expire_idle(time.time())
+            self.stats["applied"] += applied
+            self.stats["last_flush_ms"] = round((time.perf_counter() - start) * 1000, 3)
+            return applied
+
+    def _loop(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                # A bad event must not stop analytics for every other session
+                pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth, flush timings and session lifecycle counts"""
+        with self._sessions_lock:
+            tracked = len(self._sessions)
+        with self._queue_lock:
+            return {**self.stats, "queued": len(self._queue), "tracked_sessions": tracked}
+
+
+_tracker: Optional[ActivityTracker] = None
+_tracker_lock = threading.Lock()
+
+
+def get_activity_tracker() -> ActivityTracker:
+    """Get the process-wide activity tracker"""
+    global _tracker
+    if _tracker is None:
+        with _tracker_lock:
+            if _tracker is None:
+                _tracker = ActivityTracker(
+                    flush_interval=float(os.getenv("ACTIVITY_FLUSH_SECONDS", "2")),
+                    idle_timeout=float(os.getenv("ACTIVITY_IDLE_TIMEOUT_SECONDS", "1800"))
+                )
+    return _tracker
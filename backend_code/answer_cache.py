@@ -0,0 +1,73 @@
+"""
+Answer Cache for ScienceGPT
+Shared cache of chat answers keyed by question and learning settings
+"""
+
+import re
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from backend_code.tiered_cache import TieredCache, get_shared_cache
+
+AnswerKey = Tuple[str, int, str, str, str]
+
+
+def normalize_question(question: str) -> str:
+    """Normalize case, whitespace and trailing punctuation so equivalent questions share a key"""
+    return re.sub(r"\s+", " ", question.strip().lower()).rstrip(" ?!.")
+
+
+def make_answer_key(question: str, grade: int, subject: str, language: str, topic: str) -> AnswerKey:
+    """Build the cache key for an answer"""
+    return (normalize_question(question), grade, subject, language, topic)
+
+
+class AnswerCache:
+    """Answer cache stored in the shared tiered cache, so all server processes see it"""
+
+    def __init__(self, cache: Optional[TieredCache] = None, ttl_seconds: float = 24 * 3600):
+        """Initialize on top of a tiered cache (the process-wide one by default)"""
+        self.cache = cache if cache is not None else get_shared_cache()
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "stores": 0}
+
+    def get(self, key: AnswerKey) -> Optional[Dict[str, Any]]:
+        """Get a fresh answer for the key, or None"""
+        answer = self.cache.get("answer", key)
+        with self._lock:
+            self.stats["hits" if answer is not None else "misses"] += 1
+        return answer
+
+    def contains(self, key: AnswerKey) -> bool:
+        """Check for a fresh answer without touching the hit/miss counters"""
+        return self.cache.contains("answer", key)
+
+    def put(self, key: AnswerKey, answer: Dict[str, Any]):
+        """Store an answer with the cache TTL"""
+        self.cache.set("answer", key, answer, self.ttl_seconds)
+        with self._lock:
+            self.stats["stores"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counts"""
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0
+            }
+
+
+_answer_cache: Optional[AnswerCache] = None
+_answer_cache_lock = threading.Lock()
+
+
+def get_answer_cache() -> AnswerCache:
+    """Get the process-wide answer cache"""
+    global _answer_cache
+    if _answer_cache is None:
+        with _answer_cache_lock:
+            if _answer_cache is None:
+                _answer_cache = AnswerCache()
+    return _answer_cache
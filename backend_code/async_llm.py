@@ -0,0 +1,33 @@
+"""
+Async Runtime for ScienceGPT
+Shared per-process event loop that async answers run on
+"""
+
+import asyncio
+import threading
+from typing import Any, Coroutine, Optional
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Get the process-wide event loop, starting its thread on first use"""
+    global _loop
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="sciencegpt-asyncio", daemon=True)
+                thread.start()
+                _loop = loop
+    return _loop
+
+
+def run_sync(coro: Coroutine, timeout: Optional[float] = None) -> Any:
+    """Run a coroutine on the shared loop and block the calling thread for its result
+
+    This is the bridge for Streamlit call sites: the script thread waits, but the
+    network I/O of every session is multiplexed onto the single loop thread.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop()).result(timeout)
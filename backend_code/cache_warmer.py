@@ -0,0 +1,263 @@
+"""
+Cache Warmer for ScienceGPT
+Tracks popular suggestion sets, facts, questions, quizzes and challenge calendars and pre-warms them off-peak
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+KINDS = ["suggestions", "fact", "answer", "quiz", "challenge"]
+
+# Answers report their real token use; these are checked against the budget before a job runs
+TOKEN_ESTIMATES = {"suggestions": 600, "fact": 1000, "answer": 1200, "quiz": 2500, "challenge": 2000}
+
+
+class SpaceSaving:
+    """Space-saving heavy-hitters sketch: approximate top items in fixed memory
+
+    At most ``capacity`` items are tracked. A new item replaces the least counted
+    one and inherits its count as ``error``, so ``count - error`` is a guaranteed
+    lower bound on the item's true frequency.
+    """
+
+    def __init__(self, capacity: int = 256):
+        self.capacity = capacity
+        self._counts: Dict[Hashable, List[Any]] = {}  # item -> [count, error, payload]
+
+    def offer(self, item: Hashable, weight: float = 1.0, payload: Any = None):
+        """Count one occurrence of an item, keeping an optional payload with it"""
+        entry = self._counts.get(item)
+        if entry is not None:
+            entry[0] += weight
+            if payload is not None:
+                entry[2] = payload
+            return
+        if len(self._counts) < self.capacity:
+            self._counts[item] = [weight, 0.0, payload]
+            return
+        victim = min(self._counts, key=lambda k: self._counts[k][0])
+        floor = self._counts.pop(victim)[0]
+        self._counts[item] = [floor + weight, floor, payload]
+
+    def payload(self, item: Hashable) -> Any:
+        """The payload kept with a tracked item, or None"""
+        entry = self._counts.get(item)
+        return None if entry is None else entry[2]
+
+    def top(self, k: int) -> List[Tuple[Hashable, float, float, Any]]:
+        """Get the ``k`` most frequent items as (item, count, error, payload)"""
+        ranked = sorted(self._counts.items(), key=lambda kv: kv[1][0], reverse=True)[:k]
+        return [(item, count, error, payload) for item, (count, error, payload) in ranked]
+
+    def decay(self, factor: float = 0.5):
+        """Scale all counts down so demand that has gone quiet fades out"""
+        for entry in self._counts.values():
+            entry[0] *= factor
+            entry[1] *= factor
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+
+class CacheWarmer:
+    """Pre-warms the most requested cache entries when the server is quiet
+
+    Demand is recorded from the request path; a background thread wakes every
+    ``interval_seconds`` and, during off-peak hours or when traffic is idle, fills
+    the most popular missing entries through the attached ``LLMHandler`` until the
+    daily token budget is spent.
+    """
+
+    def __init__(self, capacity: int = 256, top_n: int = 8, interval_seconds: float = 300.0,
+                 tokens_per_day: int = 50_000, off_peak_hours: Tuple[int, int] = (0, 6),
+                 idle_requests_per_minute: int = 5, enabled: bool = True):
+        """Initialize the sketches, schedule and budget"""
+        self.top_n = top_n
+        self.interval_seconds = interval_seconds
+        self.tokens_per_day = tokens_per_day
+        self.off_peak_hours = off_peak_hours
+        self.idle_requests_per_minute = idle_requests_per_minute
+        self.enabled = enabled
+        self.sketches = {kind: SpaceSaving(capacity) for kind in KINDS}
+        self._seen: Dict[str, "OrderedDict[Hashable, None]"] = {kind: OrderedDict() for kind in KINDS}
+        self._seen_limit = capacity * 8
+        self._recent: deque = deque()
+        self._handler: Any = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._run_lock = threading.Lock()
+        self._budget_day = datetime.now().date()
+        self._tokens_today = 0
+        self.stats = {
+            "runs": 0,
+            "skipped_peak": 0,
+            "skipped_budget": 0,
+            "failed": 0,
+            "tokens_spent": 0,
+            "last_run": None,
+            "jobs": {kind: 0 for kind in KINDS},
+            "lookups": {kind: {"hits": 0, "misses": 0} for kind in KINDS},
+            "first_requests": {kind: {"hits": 0, "misses": 0} for kind in KINDS}
+        }
+
+    def attach(self, handler: Any):
+        """Use this LLMHandler for warm-up jobs (its ``warm_*`` methods must not touch ``st``)"""
+        with self._lock:
+            self._handler = handler
+
+    def record(self, kind: str, key: Hashable, hit: bool, payload: Any = None):
+        """Record a cache lookup from the request path
+
+        A lookup is a first request when the key has not been asked for recently
+        in this process; the hit rate of first requests is what warming improves.
+        """
+        with self._lock:
+            now = time.time()
+            self._recent.append(now)
+            while self._recent and now - self._recent[0] > 60:
+                self._recent.popleft()
+
+            self.sketches[kind].offer(key, payload=payload)
+            outcome = "hits" if hit else "misses"
+            self.stats["lookups"][kind][outcome] += 1
+
+            seen = self._seen[kind]
+            if key in seen:
+                seen.move_to_end(key)
+            else:
+                seen[key] = None
+                if len(seen) > self._seen_limit:
+                    seen.popitem(last=False)
+                self.stats["first_requests"][kind][outcome] += 1
+
+    def is_off_peak(self, now: Optional[datetime] = None) -> bool:
+        """Off-peak means inside the configured hours or below the idle request rate"""
+        now = now or datetime.now()
+        start, end = self.off_peak_hours
+        in_window = start <= now.hour < end if start <= end else (now.hour >= start or now.hour < end)
+        with self._lock:
+            idle = len(self._recent) < self.idle_requests_per_minute
+        return in_window or idle
+
+    def _budget_left(self) -> int:
+        """Tokens left today, resetting the budget at midnight (caller holds the lock)"""
+        today = datetime.now().date()
+        if today != self._budget_day:
+            self._budget_day = today
+            self._tokens_today = 0
+        return self.tokens_per_day - self._tokens_today
+
+    def _run_job(self, handler: Any, kind: str, key: Hashable, payload: Any) -> Optional[int]:
+        """Warm one entry and return the tokens it cost, or None if it was already cached"""
+        if kind == "suggestions":
+            return handler.warm_suggestions(*key)
+        if kind == "fact":
+            return handler.warm_fact_pool(*key)
+        if kind == "quiz":
+            return handler.warm_quiz(*key)
+        if kind == "challenge":
+            return handler.warm_challenges(*key)
+        _, grade, subject, language, topic = key
+        return handler.warm_answer(payload, grade, subject, language, topic)
+
+    def run_once(self, force: bool = False) -> Dict[str, int]:
+        """Warm the most popular entries of each kind; returns jobs run per kind
+
+        Without ``force`` nothing runs during peak traffic. Popularity decays after
+        each pass so yesterday's favourites give way to today's.
+        """
+        jobs = {kind: 0 for kind in KINDS}
+        with self._lock:
+            handler = self._handler
+        if handler is None or not self.enabled:
+            return jobs
+        if not force and not self.is_off_peak():
+            with self._lock:
+                self.stats["skipped_peak"] += 1
+            return jobs
+
+        with self._run_lock:
+            for kind in KINDS:
+                with self._lock:
+                    candidates = self.sketches[kind].top(self.top_n)
+                for key, _, _, payload in candidates:
+                    with self._lock:
+                        if self._budget_left() < TOKEN_ESTIMATES[kind]:
+                            self.stats["skipped_budget"] += 1
+                            break
+                    try:
+                        tokens = self._run_job(handler, kind, key, payload)
+                    except Exception:
+                        with self._lock:
+                            self.stats["failed"] += 1
+                        continue
+                    if tokens is not None:
+                        jobs[kind] += 1
+                        with self._lock:
+                            self._tokens_today += tokens
+                            self.stats["tokens_spent"] += tokens
+                            self.stats["jobs"][kind] += 1
+
+            with self._lock:
+                for sketch in self.sketches.values():
+                    sketch.decay()
+                self.stats["runs"] += 1
+                self.stats["last_run"] = datetime.now().isoformat(timespec="seconds")
+        return jobs
+
+    def start(self):
+        """Start the background scheduler thread if it is not running"""
+        with self._lock:
+            if self._thread is not None or not self.enabled:
+                return
+            self._thread = threading.Thread(target=self._loop, name="cache-warmer", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.wait(self.interval_seconds):
+            self.run_once()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get warm-up job counts, token use and first-request hit rates per kind"""
+        with self._lock:
+            first_hit_rate = {}
+            for kind, counts in self.stats["first_requests"].items():
+                total = counts["hits"] + counts["misses"]
+                first_hit_rate[kind] = round(counts["hits"] / total, 4) if total else 0.0
+            return {
+                **self.stats,
+                "jobs": dict(self.stats["jobs"]),
+                "tokens_today": self._tokens_today,
+                "tokens_per_day": self.tokens_per_day,
+                "tracked_items": {kind: len(sketch) for kind, sketch in self.sketches.items()},
+                "first_request_hit_rate": first_hit_rate
+            }
+
+
+_warmer: Optional[CacheWarmer] = None
+_warmer_lock = threading.Lock()
+
+
+def get_cache_warmer() -> CacheWarmer:
+    """Get the process-wide cache warmer, configured from the environment and started"""
+    global _warmer
+    if _warmer is None:
+        with _warmer_lock:
+            if _warmer is None:
+                start, _, end = os.getenv("WARMER_OFF_PEAK_HOURS", "0-6").partition("-")
+                _warmer = CacheWarmer(
+                    interval_seconds=float(os.getenv("WARMER_INTERVAL_SECONDS", "300")),
+                    tokens_per_day=int(os.getenv("WARMER_TOKENS_PER_DAY", "50000")),
+                    off_peak_hours=(int(start), int(end or start)),
+                    enabled=os.getenv("WARMER_ENABLED", "1") != "0"
+                )
+                _warmer.start()
+    return _warmer
@@ -0,0 +1,238 @@
+"""
+Challenge Calendar for ScienceGPT
+Monthly daily-challenge calendars generated in batch, date lookups and per-student completion bitmaps
+"""
+
+import calendar
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+DEFAULT_CALENDAR_PATH = os.path.join(tempfile.gettempdir(), "sciencegpt_challenges.sqlite3")
+
+# Served when a month could not be generated, rotated by day so it still changes daily
+DEFAULT_CHALLENGES = {
+    1: "Can you name 3 things you see around you that are living?",
+    2: "What makes plants green? Think about it!",
+    3: "How many bones do you think are in your body?",
+    4: "What happens to water when you heat it?",
+    5: "Why do we see different shapes of the moon?",
+    6: "What is the smallest unit of life?",
+    7: "How do magnets work?",
+    8: "What causes earthquakes?"
+}
+GENERAL_CHALLENGES = [
+    "What's your favorite science topic and why?",
+    "Find one thing at home that uses electricity and think about how it works.",
+    "Look at the sky today. What do you notice about the clouds?",
+    "Why do you think leaves fall from some trees?",
+    "What would happen if there was no friction?",
+    "How does your body know when you are hungry?",
+    "Why does ice float on water?"
+]
+
+JSON_ARRAY_PATTERN = re.compile(r"\[.*\]", re.DOTALL)
+
+# (grade, subject, months since year 0)
+MonthKey = Tuple[int, str, int]
+
+
+def month_index(day: date) -> int:
+    return day.year * 12 + day.month - 1
+
+
+def days_in_month(day: date) -> int:
+    return calendar.monthrange(day.year, day.month)[1]
+
+
+def fallback_challenge(grade: int, day: date) -> str:
+    """Built-in challenge for a day: the grade's own one day in eight, general ones otherwise"""
+    options = GENERAL_CHALLENGES + [DEFAULT_CHALLENGES.get(grade, GENERAL_CHALLENGES[0])]
+    return options[day.toordinal() % len(options)]
+
+
+def parse_challenges(text: str, days: int) -> List[str]:
+    """Challenges from a generated JSON array of strings, cycled to fill ``days`` (empty if none)"""
+    match = JSON_ARRAY_PATTERN.search(text or "")
+    if not match:
+        return []
+    try:
+        values = json.loads(match.group(0))
+    except json.JSONDecodeError:
+        return []
+    challenges = [str(value).strip() for value in values if isinstance(value, str) and value.strip()]
+    if not challenges:
+        return []
+    return [challenges[i % len(challenges)] for i in range(days)]
+
+
+class ChallengeCalendar:
+    """One calendar per grade, subject and month, generated in a single batch
+
+    Months live in SQLite and in memory, so the challenge for a day is a dict
+    lookup plus a list index. A per-key lock makes concurrent sessions wait for a
+    single generation.
+    """
+
+    def __init__(self, path: str = DEFAULT_CALENDAR_PATH):
+        """Open (or create) the calendar store and load every stored month"""
+        self.path = path
+        self._local = threading.local()
+        self._months: Dict[MonthKey, List[str]] = {}
+        self._lock = threading.Lock()
+        self._key_locks: Dict[MonthKey, threading.Lock] = {}
+        self.stats = {"lookups": 0, "misses": 0, "generations": 0, "failed_generations": 0}
+
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS challenge_months (grade INTEGER NOT NULL, subject TEXT NOT NULL, "
+            "month INTEGER NOT NULL, challenges TEXT NOT NULL, created_at REAL NOT NULL, "
+            "PRIMARY KEY (grade, subject, month))"
+        )
+        conn.commit()
+        self.refresh()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def refresh(self, key: Optional[MonthKey] = None):
+        """Load stored months (one if ``key`` is given), including those written by other processes"""
+        query = "SELECT grade, subject, month, challenges FROM challenge_months"
+        params: tuple = ()
+        if key is not None:
+            query += " WHERE grade = ? AND subject = ? AND month = ?"
+            params = key
+        rows = self._connection().execute(query, params).fetchall()
+        with self._lock:
+            for grade, subject, month, challenges in rows:
+                self._months[(grade, subject, month)] = json.loads(challenges)
+
+    def has_month(self, grade: int, subject: str, day: date) -> bool:
+        with self._lock:
+            return (grade, subject, month_index(day)) in self._months
+
+    def lookup(self, grade: int, subject: str, day: date) -> Optional[str]:
+        """The day's challenge, or None if its month has not been generated"""
+        with self._lock:
+            self.stats["lookups"] += 1
+            challenges = self._months.get((grade, subject, month_index(day)))
+            if challenges is None:
+                self.stats["misses"] += 1
+                return None
+            return challenges[day.day - 1]
+
+    def ensure_month(self, grade: int, subject: str, day: date, generate: Callable[[int], List[str]]) -> bool:
+        """Generate and store the month containing ``day`` if missing; returns whether it is available"""
+        key = (grade, subject, month_index(day))
+        with self._lock:
+            if key in self._months:
+                return True
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            self.refresh(key)
+            with self._lock:
+                if key in self._months:
+                    return True
+            challenges = generate(days_in_month(day))
+            with self._lock:
+                self.stats["generations" if challenges else "failed_generations"] += 1
+            if not challenges:
+                return False
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO challenge_months (grade, subject, month, challenges, created_at) "
+                "VALUES (?, ?, ?, ?, ?)", (*key, json.dumps(challenges, ensure_ascii=False), time.time())
+            )
+            conn.commit()
+            with self._lock:
+                self._months[key] = challenges
+            return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get lookup, miss and generation counts and the number of stored months"""
+        with self._lock:
+            return {**self.stats, "months": len(self._months)}
+
+
+def new_day_bitmap() -> Dict[str, Any]:
+    """Empty completion bitmap: bit i of ``bits`` is the day ``start + i`` (date ordinals)
+
+    Plain ints and bytes, so it is stored in session state and snapshots as is.
+    """
+    return {"start": 0, "bits": b""}
+
+
+def mark_day(bitmap: Dict[str, Any], day: date) -> bool:
+    """Set the bit for a day; returns False if it was already set"""
+    ordinal = day.toordinal()
+    bits = bytearray(bitmap["bits"])
+    start = bitmap["start"]
+    if not bits:
+        start = ordinal - ordinal % 8
+    elif ordinal < start:
+        # Grow to the left by whole bytes so existing bits keep their positions
+        extra = (start - ordinal + 7) // 8
+        bits[0:0] = bytes(extra)
+        start -= extra * 8
+    offset = ordinal - start
+    if offset // 8 >= len(bits):
+        bits.extend(bytes(offset // 8 + 1 - len(bits)))
+    mask = 1 << (offset % 8)
+    if bits[offset // 8] & mask:
+        return False
+    bits[offset // 8] |= mask
+    bitmap["start"] = start
+    bitmap["bits"] = bytes(bits)
+    return True
+
+
+def is_marked(bitmap: Dict[str, Any], day: date) -> bool:
+    offset = day.toordinal() - bitmap["start"]
+    bits = bitmap["bits"]
+    return 0 <= offset < len(bits) * 8 and bool(bits[offset // 8] & (1 << (offset % 8)))
+
+
+def count_marked(bitmap: Dict[str, Any], first: date, last: date) -> int:
+    """Days marked from ``first`` to ``last`` inclusive, counted a whole integer at a time"""
+    bits = bitmap["bits"]
+    low = max(first.toordinal() - bitmap["start"], 0)
+    high = min(last.toordinal() - bitmap["start"], len(bits) * 8 - 1)
+    if high < low:
+        return 0
+    value = int.from_bytes(bits[low // 8:high // 8 + 1], "little") >> (low % 8)
+    return bin(value & ((1 << (high - low + 1)) - 1)).count("1")
+
+
+def current_streak(bitmap: Dict[str, Any], today: date) -> int:
+    """Consecutive marked days ending today, or yesterday if today is not marked yet"""
+    day = today if is_marked(bitmap, today) else today - timedelta(days=1)
+    streak = 0
+    while is_marked(bitmap, day):
+        streak += 1
+        day -= timedelta(days=1)
+    return streak
+
+
+_calendar: Optional[ChallengeCalendar] = None
+_calendar_lock = threading.Lock()
+
+
+def get_challenge_calendar() -> ChallengeCalendar:
+    """Get the process-wide challenge calendar, stored at ``SCIENCEGPT_CHALLENGE_PATH`` if set"""
+    global _calendar
+    if _calendar is None:
+        with _calendar_lock:
+            if _calendar is None:
+                _calendar = ChallengeCalendar(os.getenv("SCIENCEGPT_CHALLENGE_PATH", DEFAULT_CALENDAR_PATH))
+    return _calendar
@@ -0,0 +1,246 @@
+"""
+Chat Store for ScienceGPT
+Persistent per-student chat history with compressed text, keyword search and paginated loading
+"""
+
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+import unicodedata
+import zlib
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from backend_code.retrieval_engine import tokenize
+from backend_code.session_memory import ChatMessage
+from backend_code.token_ledger import name_id
+
+DEFAULT_CHAT_PATH = os.path.join(tempfile.gettempdir(), "sciencegpt_chat_history.sqlite3")
+
+# Stored text encodings; codecs are never renumbered so old rows stay readable
+CODEC_RAW = 0
+CODEC_ZLIB = 1
+
+# Shorter texts are stored raw: zlib's header and checksum outweigh the savings
+COMPRESS_MIN_BYTES = 120
+COMPRESSION_LEVEL = 6
+
+ROLES = ["user", "assistant"]
+
+# Words in any script; \w alone would split Indic words at their vowel signs and viramas
+WORD_PATTERN = re.compile(r"[\w\u0900-\u0963\u0966-\u0D7F]+")
+
+
+def encode_text(text: str) -> Tuple[int, bytes]:
+    """(codec, bytes) for a message text"""
+    raw = text.encode("utf-8")
+    if len(raw) >= COMPRESS_MIN_BYTES:
+        packed = zlib.compress(raw, COMPRESSION_LEVEL)
+        if len(packed) < len(raw):
+            return CODEC_ZLIB, packed
+    return CODEC_RAW, raw
+
+
+def decode_text(codec: int, data: bytes) -> str:
+    return (zlib.decompress(data) if codec == CODEC_ZLIB else bytes(data)).decode("utf-8")
+
+
+def search_terms(text: str) -> Set[str]:
+    """Index terms of a text: English words as ``tokenize`` stems them, other words as a hashed term
+
+    Hashing keeps every term plain ASCII, so FTS5's tokenizer cannot split a
+    Hindi or Tamil word apart the way it splits on combining marks.
+    """
+    english = []
+    terms = set()
+    for word in WORD_PATTERN.findall(unicodedata.normalize("NFC", text).casefold()):
+        if word.isascii():
+            english.append(word)
+        elif len(word) > 1:
+            terms.add(f"w{name_id(word):x}")
+    terms.update(tokenize(" ".join(english)))
+    return terms
+
+
+def _owner(student_id: str) -> int:
+    """Signed 64-bit owner id for SQLite"""
+    return name_id(student_id) - (1 << 63)
+
+
+def _owner_token(owner: int) -> str:
+    """Owner as a search term, so a search only walks that student's postings"""
+    return f"o{owner + (1 << 63):x}"
+
+
+class ChatStore:
+    """Chat turns of every student in SQLite, with an FTS5 inverted index over past answers
+
+    Texts are zlib-compressed; the index is contentless, so it holds only postings.
+    Each answer is indexed together with its question under the student's owner
+    term, which makes a keyword search an intersection of posting lists. Pages are
+    read newest-first by message id, so opening the app reads one page whatever
+    the length of the history.
+    """
+
+    def __init__(self, path: str = DEFAULT_CHAT_PATH):
+        """Open (or create) the store"""
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.stats = {"appended": 0, "pages": 0, "searches": 0, "search_ms": 0.0, "errors": 0,
+                      "raw_bytes": 0, "stored_bytes": 0}
+
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS chat_messages ("
+            "id INTEGER PRIMARY KEY, owner INTEGER NOT NULL, created_at INTEGER NOT NULL, role INTEGER NOT NULL, "
+            "subject TEXT, codec INTEGER NOT NULL, content BLOB NOT NULL, video_url TEXT)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS chat_messages_owner ON chat_messages (owner, id)")
+        conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS chat_search USING fts5(terms, content='', detail='none')"
+        )
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _insert(self, conn: sqlite3.Connection, owner: int, message: ChatMessage, subject: str,
+                question: Optional[str], created_at: int) -> int:
+        codec, content = encode_text(message.content)
+        cursor = conn.execute(
+            "INSERT INTO chat_messages (owner, created_at, role, subject, codec, content, video_url) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (owner, created_at, ROLES.index(message.role), subject, codec, content, message.video_url)
+        )
+        message_id = cursor.lastrowid
+        if message.role == "assistant":
+            terms = search_terms(f"{question or ''} {message.content}")
+            if terms:
+                conn.execute("INSERT INTO chat_search (rowid, terms) VALUES (?, ?)",
+                             (message_id, " ".join([_owner_token(owner), *terms])))
+        with self._lock:
+            self.stats["appended"] += 1
+            self.stats["raw_bytes"] += len(message.content.encode("utf-8"))
+            self.stats["stored_bytes"] += len(content)
+        return message_id
+
+    def append(self, student_id: str, message: Any, subject: str = "", question: Optional[str] = None) -> int:
+        """Store one turn; answers are indexed with their ``question``. Returns the message id (0 on failure)"""
+        conn = self._connection()
+        try:
+            message_id = self._insert(conn, _owner(student_id), ChatMessage.from_value(message), subject,
+                                      question, int(time.time()))
+            conn.commit()
+            return message_id
+        except sqlite3.Error:
+            # Persistence is best-effort; the session keeps its in-memory history either way.
+            # Roll back so a message whose index insert failed is not committed by the next append
+            conn.rollback()
+            with self._lock:
+                self.stats["errors"] += 1
+            return 0
+
+    def append_many(self, student_id: str, turns: List[Tuple[Any, str, Optional[str]]],
+                    created_at: Optional[int] = None) -> int:
+        """Store (message, subject, question) turns in one transaction; returns how many (0 on failure)"""
+        conn = self._connection()
+        owner = _owner(student_id)
+        created_at = int(time.time()) if created_at is None else created_at
+        try:
+            for message, subject, question in turns:
+                self._insert(conn, owner, ChatMessage.from_value(message), subject, question, created_at)
+            conn.commit()
+            return len(turns)
+        except sqlite3.Error:
+            conn.rollback()
+            with self._lock:
+                self.stats["errors"] += 1
+            return 0
+
+    def _messages(self, rows) -> List[Dict[str, Any]]:
+        return [
+            {"id": message_id, "role": ROLES[role], "content": decode_text(codec, content),
+             "video_url": video_url, "subject": subject, "created_at": created_at}
+            for message_id, created_at, role, subject, codec, content, video_url in rows
+        ]
+
+    def page(self, student_id: str, limit: int = 10, before_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Up to ``limit`` turns older than ``before_id`` (newest if None), oldest first"""
+        rows = self._connection().execute(
+            "SELECT id, created_at, role, subject, codec, content, video_url FROM chat_messages "
+            "WHERE owner = ? AND id < ? ORDER BY id DESC LIMIT ?",
+            (_owner(student_id), before_id if before_id is not None else 1 << 62, limit)
+        ).fetchall()
+        with self._lock:
+            self.stats["pages"] += 1
+        return self._messages(reversed(rows))
+
+    def count(self, student_id: str, before_id: Optional[int] = None) -> int:
+        """Stored turns of a student (older than ``before_id`` if given)"""
+        return self._connection().execute(
+            "SELECT COUNT(*) FROM chat_messages WHERE owner = ? AND id < ?",
+            (_owner(student_id), before_id if before_id is not None else 1 << 62)
+        ).fetchone()[0]
+
+    def search(self, student_id: str, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Past answers containing every keyword of ``query``, newest first, each with its question"""
+        start = time.perf_counter()
+        terms = sorted(search_terms(query))
+        if not terms:
+            return []
+        owner = _owner(student_id)
+        conn = self._connection()
+        match = " AND ".join(f'"{term}"' for term in [_owner_token(owner), *terms])
+        rows = conn.execute(
+            "SELECT m.id, m.created_at, m.role, m.subject, m.codec, m.content, m.video_url FROM chat_messages m "
+            "JOIN (SELECT rowid FROM chat_search WHERE chat_search MATCH ? ORDER BY rowid DESC LIMIT ?) hits "
+            "ON m.id = hits.rowid AND m.owner = ? ORDER BY m.id DESC",
+            (match, limit, owner)
+        ).fetchall()
+
+        results = []
+        for answer in self._messages(rows):
+            question = conn.execute(
+                "SELECT codec, content FROM chat_messages WHERE owner = ? AND id < ? AND role = 0 "
+                "ORDER BY id DESC LIMIT 1", (owner, answer["id"])
+            ).fetchone()
+            answer["question"] = decode_text(*question) if question else ""
+            results.append(answer)
+        with self._lock:
+            self.stats["searches"] += 1
+            self.stats["search_ms"] += (time.perf_counter() - start) * 1000
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get stored bytes per message, compression ratio and search latency"""
+        with self._lock:
+            stats = dict(self.stats)
+        return {
+            **stats,
+            "compression_ratio": round(stats["raw_bytes"] / stats["stored_bytes"], 2) if stats["stored_bytes"] else 0.0,
+            "avg_search_ms": round(stats["search_ms"] / stats["searches"], 2) if stats["searches"] else 0.0,
+            "file_bytes": os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        }
+
+
+_chat_store: Optional[ChatStore] = None
+_chat_store_lock = threading.Lock()
+
+
+def get_chat_store() -> ChatStore:
+    """Get the process-wide chat store, stored at ``SCIENCEGPT_CHAT_PATH`` if set"""
+    global _chat_store
+    if _chat_store is None:
+        with _chat_store_lock:
+            if _chat_store is None:
+                _chat_store = ChatStore(os.getenv("SCIENCEGPT_CHAT_PATH", DEFAULT_CHAT_PATH))
+    return _chat_store
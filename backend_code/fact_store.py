@@ -0,0 +1,109 @@
+"""
+Fact Store for ScienceGPT
+Process-wide fact of the day pools shared by every student session
+"""
+
+import threading
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Any, Optional, Tuple
+
+from backend_code.tiered_cache import TieredCache, get_shared_cache
+
+FactKey = Tuple[date, int, str, str]
+
+
+class FactStore:
+    """Holds one small pool of facts per (calendar date, grade, subject, topic)
+
+    Pools live in the shared tiered cache and expire at the next midnight, so they
+    are generated once per key per day no matter how many students (or server
+    processes) ask for them.
+    """
+
+    def __init__(self, pool_size: int = 3, cache: Optional[TieredCache] = None):
+        """Initialize the store on top of a tiered cache (the process-wide one by default)"""
+        self.pool_size = pool_size
+        self.cache = cache if cache is not None else get_shared_cache()
+        self._key_locks: Dict[FactKey, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._current_date = date.today()
+        self.stats = {"generations": 0, "hits": 0, "rotations": 0}
+
+    def _key(self, grade: int, subject: str, topic: str) -> FactKey:
+        """Build the store key for today, rotating the store first if the date changed"""
+        today = date.today()
+        with self._lock:
+            if today != self._current_date:
+                self._key_locks = {k: v for k, v in self._key_locks.items() if k[0] == today}
+                self._current_date = today
+                self.stats["rotations"] += 1
+        return (today, grade, subject, topic)
+
+    @staticmethod
+    def _seconds_until_midnight() -> float:
+        """Seconds left in the current calendar day"""
+        now = datetime.now()
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        return max((midnight - now).total_seconds(), 1.0)
+
+    def get_pool(self, grade: int, subject: str, topic: str,
+                 generate: Callable[[int], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Get today's pool for a combination, calling ``generate(pool_size)`` on a miss
+
+        A per-key lock makes concurrent sessions wait for a single generation instead
+        of all calling the LLM for the same combination.
+        """
+        key = self._key(grade, subject, topic)
+        pool = self.cache.get("fact", key)
+        if pool:
+            with self._lock:
+                self.stats["hits"] += 1
+            return pool
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            pool = self.cache.get("fact", key)
+            if pool:
+                with self._lock:
+                    self.stats["hits"] += 1
+                return pool
+
+            pool = generate(self.pool_size)
+            if pool:
+                self.cache.set("fact", key, pool, self._seconds_until_midnight())
+                with self._lock:
+                    self.stats["generations"] += 1
+            return pool
+
+    def get_fact(self, grade: int, subject: str, topic: str,
+                 generate: Callable[[int], List[Dict[str, Any]]], index: int = 0) -> Optional[Dict[str, Any]]:
+        """Get the fact at ``index`` (wrapping around) from today's pool"""
+        pool = self.get_pool(grade, subject, topic, generate)
+        if not pool:
+            return None
+        return pool[index % len(pool)]
+
+    def is_cached(self, grade: int, subject: str, topic: str) -> bool:
+        """Check whether today's pool for a combination is already generated"""
+        return self.cache.contains("fact", self._key(grade, subject, topic))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get generation and hit counts"""
+        with self._lock:
+            return {**self.stats, "date": self._current_date.isoformat()}
+
+
+_fact_store: Optional[FactStore] = None
+_fact_store_lock = threading.Lock()
+
+
+def get_fact_store() -> FactStore:
+    """Get the process-wide fact store"""
+    global _fact_store
+    if _fact_store is None:
+        with _fact_store_lock:
+            if _fact_store is None:
+                _fact_store = FactStore()
+    return _fact_store
@@ -0,0 +1,240 @@
+"""
+Fair Share Scheduling for ScienceGPT
+Per-student and per-class token buckets with a weighted fair queue for LLM calls
+"""
+
+import heapq
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+MAX_TRACKED_STUDENTS = 10_000
+
+
+class TokenBucket:
+    """LLM token allowance that refills continuously up to ``capacity``
+
+    Requests are admitted while the level is positive. An estimate is reserved up
+    front and corrected to the real token use afterwards, so a long answer can leave
+    the bucket in debt until it refills.
+    """
+
+    __slots__ = ("rate", "capacity", "level", "updated")
+
+    def __init__(self, rate_per_second: float, capacity: float):
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self.level = capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def charge(self, tokens: float, now: float):
+        self.refill(now)
+        self.level -= tokens
+
+    def seconds_until_positive(self, now: float) -> float:
+        self.refill(now)
+        return 0.0 if self.level > 0 else (1 - self.level) / self.rate
+
+
+class Admission:
+    """Outcome of asking for an LLM slot: ``admitted``, ``throttled`` or ``timeout``"""
+
+    __slots__ = ("status", "student_id", "class_id", "retry_after", "wait_ms", "finish", "event", "cancelled",
+                 "reserved")
+
+    def __init__(self, status: str, student_id: str, class_id: Optional[str], retry_after: float = 0.0):
+        self.status = status
+        self.student_id = student_id
+        self.class_id = class_id
+        self.retry_after = retry_after
+        self.wait_ms = 0.0
+        self.finish = 0.0
+        self.event: Optional[threading.Event] = None
+        self.cancelled = False
+        self.reserved = 0.0
+
+    @property
+    def admitted(self) -> bool:
+        return self.status == "admitted"
+
+
+class FairShareScheduler:
+    """Caps concurrent LLM calls and shares them fairly between students
+
+    Below ``max_concurrent`` in-flight calls requests start immediately. Beyond
+    that they wait in a weighted fair queue (start-time fair queueing): each
+    request gets a virtual finish time ``max(now_v, student's last finish) +
+    cost / weight``, so a student with many queued requests falls behind everyone
+    else instead of starving them.
+    """
+
+    def __init__(self, max_concurrent: int = 8, student_tokens_per_minute: float = 6000,
+                 student_burst: float = 12000, class_tokens_per_minute: float = 60000,
+                 class_burst: float = 120000, request_cost: float = 1000, queue_timeout: float = 30.0):
+        """Initialize concurrency, quota and queueing limits"""
+        self.max_concurrent = max_concurrent
+        self.student_rate = (student_tokens_per_minute / 60, student_burst)
+        self.class_rate = (class_tokens_per_minute / 60, class_burst)
+        self.request_cost = request_cost
+        self.queue_timeout = queue_timeout
+        self._lock = threading.Lock()
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self._queue: List[Tuple[float, int, Admission]] = []
+        self._sequence = itertools.count()
+        self._active = 0
+        self._virtual_time = 0.0
+        self._last_finish: Dict[str, float] = {}
+        self._students: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.stats = {"admitted": 0, "queued": 0, "throttled": 0, "timeouts": 0, "max_queue_length": 0}
+
+    def _bucket(self, scope: str, scope_id: str) -> TokenBucket:
+        key = (scope, scope_id)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            rate, burst = self.student_rate if scope == "student" else self.class_rate
+            bucket = self._buckets[key] = TokenBucket(rate, burst)
+        return bucket
+
+    def _student(self, student_id: str) -> Dict[str, Any]:
+        """Per-student counters, keeping only the most recently active students"""
+        stats = self._students.get(student_id)
+        if stats is None:
+            stats = self._students[student_id] = {
+                "requests": 0, "admitted": 0, "queued": 0, "throttled": 0, "timeouts": 0,
+                "tokens": 0, "total_wait_ms": 0.0, "max_wait_ms": 0.0
+            }
+            if len(self._students) > MAX_TRACKED_STUDENTS:
+                evicted, _ = self._students.popitem(last=False)
+                self._last_finish.pop(evicted, None)
+                self._buckets.pop(("student", evicted), None)
+        else:
+            self._students.move_to_end(student_id)
+        return stats
+
+    def _charge(self, admission: Admission, tokens: float, now: float):
+        """Charge (or refund, if negative) the student's and class's buckets (caller holds the lock)"""
+        self._bucket("student", admission.student_id).charge(tokens, now)
+        if admission.class_id:
+            self._bucket("class", admission.class_id).charge(tokens, now)
+
+    def acquire(self, student_id: str, class_id: Optional[str] = None, weight: float = 1.0,
+                timeout: Optional[float] = None) -> Admission:
+        """Ask for an LLM slot, waiting in the fair queue if the server is saturated
+
+        Returns a throttled admission with ``retry_after`` seconds if the student's
+        or class's bucket is empty; call ``release`` after an admitted request.
+        """
+        timeout = self.queue_timeout if timeout is None else timeout
+        start = time.monotonic()
+        with self._lock:
+            stats = self._student(student_id)
+            stats["requests"] += 1
+
+            retry_after = self._bucket("student", student_id).seconds_until_positive(start)
+            if class_id:
+                retry_after = max(retry_after, self._bucket("class", class_id).seconds_until_positive(start))
+            if retry_after > 0:
+                stats["throttled"] += 1
+                self.stats["throttled"] += 1
+                return Admission("throttled", student_id, class_id, retry_after)
+
+            # Reserve the estimated cost now so a burst of concurrent requests cannot overdraw
+            admission = Admission("admitted", student_id, class_id)
+            admission.reserved = self.request_cost
+            self._charge(admission, self.request_cost, start)
+            if self._active < self.max_concurrent and not self._queue:
+                self._active += 1
+                stats["admitted"] += 1
+                self.stats["admitted"] += 1
+                return admission
+
+            admission.status = "queued"
+            admission.event = threading.Event()
+            admission.finish = max(self._virtual_time, self._last_finish.get(student_id, 0.0)) + self.request_cost / weight
+            self._last_finish[student_id] = admission.finish
+            heapq.heappush(self._queue, (admission.finish, next(self._sequence), admission))
+            stats["queued"] += 1
+            self.stats["queued"] += 1
+            self.stats["max_queue_length"] = max(self.stats["max_queue_length"], len(self._queue))
+
+        admission.event.wait(timeout)
+
+        with self._lock:
+            wait_ms = (time.monotonic() - start) * 1000
+            stats = self._student(student_id)
+            if admission.status != "admitted":
+                admission.status = "timeout"
+                admission.cancelled = True
+                self._charge(admission, -admission.reserved, time.monotonic())
+                stats["timeouts"] += 1
+                self.stats["timeouts"] += 1
+                return admission
+            admission.wait_ms = wait_ms
+            stats["admitted"] += 1
+            stats["total_wait_ms"] += wait_ms
+            stats["max_wait_ms"] = max(stats["max_wait_ms"], wait_ms)
+            self.stats["admitted"] += 1
+            return admission
+
+    def release(self, admission: Admission, tokens: int = 0):
+        """Finish an admitted request, charging its tokens and starting the next queued one"""
+        if not admission.admitted:
+            return
+        with self._lock:
+            self._charge(admission, tokens - admission.reserved, time.monotonic())
+            self._student(admission.student_id)["tokens"] += tokens
+            self._active -= 1
+
+            while self._queue and self._active < self.max_concurrent:
+                finish, _, waiting = heapq.heappop(self._queue)
+                if waiting.cancelled:
+                    continue
+                self._virtual_time = finish
+                waiting.status = "admitted"
+                self._active += 1
+                waiting.event.set()
+
+    def get_student_stats(self, student_id: str) -> Dict[str, Any]:
+        """Get queueing delay and throttle counts for one student"""
+        with self._lock:
+            stats = dict(self._students.get(student_id, {}))
+        if stats.get("admitted"):
+            stats["avg_wait_ms"] = round(stats["total_wait_ms"] / stats["admitted"], 2)
+        return stats
+
+    def get_stats(self, top: int = 10) -> Dict[str, Any]:
+        """Get overall counters and the students throttled or delayed the most"""
+        with self._lock:
+            students = sorted(self._students.items(),
+                              key=lambda kv: (kv[1]["throttled"], kv[1]["total_wait_ms"]), reverse=True)
+            return {
+                **self.stats,
+                "active": self._active,
+                "queue_length": len(self._queue),
+                "students": {student_id: dict(stats) for student_id, stats in students[:top]}
+            }
+
+
+_scheduler: Optional[FairShareScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_fair_share() -> FairShareScheduler:
+    """Get the process-wide fair share scheduler, configured from the environment"""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = FairShareScheduler(
+                    max_concurrent=int(os.getenv("FAIR_SHARE_MAX_CONCURRENT", "8")),
+                    student_tokens_per_minute=float(os.getenv("FAIR_SHARE_STUDENT_TOKENS_PER_MIN", "6000")),
+                    class_tokens_per_minute=float(os.getenv("FAIR_SHARE_CLASS_TOKENS_PER_MIN", "60000"))
+                )
+    return _scheduler
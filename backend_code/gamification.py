@@ -7,8 +7,21 @@ import streamlit as st
 from datetime import datetime, timedelta
 from typing import List, Dict, Any
 
+from backend_code.challenge_calendar import count_marked, current_streak, is_marked, mark_day, new_day_bitmap
+from backend_code.leaderboard import get_leaderboards
+from backend_code.state_store import StateStore
+
+# Name every session starts with; a student who kept it has not introduced themselves
+DEFAULT_STUDENT_NAME = "Learner"
+
+
 class GamificationManager:
-    """Manages gamification features like points, badges, and achievements"""
+    """Manages gamification features like points, badges, and achievements
+
+    Every change to ``gamification_data`` goes through this class and bumps its
+    version in the session's StateStore, so the stats and badge lists drawn on
+    each rerun are rebuilt only after something changed.
+    """
 
     def __init__(self):
         """Initialize gamification manager"""
@@ -73,13 +86,59 @@ class GamificationManager:
                 "facts_generated": 0,
                 "streak_days": 0,
                 "last_visit": datetime.now(),
-                "daily_visits": []
+                "daily_visits": [],
+                "challenge_days": new_day_bitmap()
             }
 
+    def _store(self) -> StateStore:
+        return StateStore(st.session_state)
+
+    def _touch(self):
+        """Record a change to gamification data so derived views are rebuilt"""
+        self._store().touch("gamification_data")
+
     def add_points(self, points: int):
         """Add points to user's total"""
         st.session_state.gamification_data["points"] += points
         self.check_achievements()
+        self._touch()
+        self.sync_leaderboards()
+
+    def sync_leaderboards(self):
+        """Push the current points to the class, school and district leaderboards
+
+        Skipped when neither the points nor the profile changed since the last sync,
+        and for anonymous sessions that set neither a name nor a class, school or
+        district, so drive-by visitors do not fill the global board.
+        """
+        student_id = st.session_state.get("student_id") or st.session_state.get("session_id")
+        if not student_id:
+            return
+        memberships = {
+            "class": st.session_state.get("class_id", ""),
+            "school": st.session_state.get("school_id", ""),
+            "district": st.session_state.get("district_id", "")
+        }
+        name = st.session_state.get("student_name")
+        if name == DEFAULT_STUDENT_NAME:
+            name = None
+        if not name and not any(memberships.values()):
+            return
+        if not self._store().changed("leaderboard_sync", student_id, self.get_total_points(),
+                                     tuple(memberships.values()), name):
+            return
+        get_leaderboards().update_student(student_id, self.get_total_points(), memberships, name=name)
+
+    def get_leaderboard_ranks(self) -> Dict[str, Dict[str, Any]]:
+        """Get the student's rank in each leaderboard scope they belong to"""
+        student_id = st.session_state.get("student_id") or st.session_state.get("session_id")
+        if not student_id:
+            return {}
+        return get_leaderboards().get_ranks(student_id)
+
+    def get_leaderboard_top(self, scope: str, scope_id: str, k: int = 5) -> List[Dict[str, Any]]:
+        """Get the top students of a leaderboard scope"""
+        return get_leaderboards().get_top(scope, scope_id, k)
 
     def get_total_points(self) -> int:
         """Get total points earned"""
@@ -93,6 +152,7 @@ class GamificationManager:
     def add_subject_explored(self, subject: str):
         """Record that a subject was explored"""
         st.session_state.gamification_data["subjects_explored"].add(subject)
+        self._touch()
 
     def add_fact_generated(self):
         """Record that a fact was generated"""
@@ -102,6 +162,9 @@ class GamificationManager:
     def update_streak(self):
         """Update daily learning streak"""
         today = datetime.now().date()
+        # Once per day (and after a reset); the visit list need not be re-read on every rerun
+        if not self._store().changed("streak_update", today, id(st.session_state.gamification_data)):
+            return
         last_visit = st.session_state.gamification_data.get("last_visit")
 
         if isinstance(last_visit, str):
@@ -134,6 +197,7 @@ class GamificationManager:
 
             st.session_state.gamification_data["streak_days"] = streak
             st.session_state.gamification_data["last_visit"] = today
+            self._touch()
 
     def check_achievements(self):
         """Check and award new badges"""
@@ -184,7 +248,10 @@ class GamificationManager:
                 st.toast(f"🎉 New Badge: {badge['icon']} {badge['name']}")
 
     def get_user_badges(self) -> List[Dict[str, Any]]:
-        """Get list of user's earned badges with details"""
+        """Get list of user's earned badges with details (memoized; read-only)"""
+        return self._store().view("earned_badges", ("gamification_data",), self._user_badges)
+
+    def _user_badges(self) -> List[Dict[str, Any]]:
         earned_badge_ids = st.session_state.gamification_data.get("badges", [])
         return [
             {
@@ -197,7 +264,10 @@ class GamificationManager:
         ]
 
     def get_available_badges(self) -> List[Dict[str, Any]]:
-        """Get list of badges not yet earned"""
+        """Get list of badges not yet earned (memoized; read-only)"""
+        return self._store().view("available_badges", ("gamification_data",), self._available_badges)
+
+    def _available_badges(self) -> List[Dict[str, Any]]:
         earned_badge_ids = set(st.session_state.gamification_data.get("badges", []))
         return [
             {
@@ -211,8 +281,38 @@ class GamificationManager:
             if badge_id not in earned_badge_ids
         ]
 
+    def _challenge_days(self) -> Dict[str, Any]:
+        return st.session_state.gamification_data.setdefault("challenge_days", new_day_bitmap())
+
+    def is_challenge_completed(self, day=None) -> bool:
+        """Check whether the daily challenge of ``day`` (default today) was completed"""
+        return is_marked(self._challenge_days(), day or datetime.now().date())
+
+    def complete_challenge(self, points: int = 5) -> bool:
+        """Mark today's challenge done and award points once; returns False if already done"""
+        if not mark_day(self._challenge_days(), datetime.now().date()):
+            return False
+        self.add_points(points)
+        return True
+
+    def get_challenge_stats(self) -> Dict[str, int]:
+        """Get the challenge streak and the days completed this month (memoized per day)"""
+        today = datetime.now().date()
+        return self._store().view("challenge_stats", ("gamification_data",),
+                                  lambda: self._challenge_stats(today), today)
+
+    def _challenge_stats(self, today) -> Dict[str, int]:
+        days = self._challenge_days()
+        return {
+            "streak": current_streak(days, today),
+            "this_month": count_marked(days, today.replace(day=1), today)
+        }
+
     def get_stats(self) -> Dict[str, Any]:
-        """Get comprehensive user statistics"""
+        """Get comprehensive user statistics (memoized; read-only)"""
+        return self._store().view("gamification_stats", ("gamification_data",), self._stats)
+
+    def _stats(self) -> Dict[str, Any]:
         data = st.session_state.gamification_data
         return {
             "points": data.get("points", 0),
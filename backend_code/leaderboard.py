@@ -0,0 +1,347 @@
+"""
+Leaderboards for ScienceGPT
+Class, school and district rankings backed by an indexable skip list and a shared SQLite store
+"""
+
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+SCOPES = ["class", "school", "district", "global"]
+
+DEFAULT_LEADERBOARD_PATH = os.path.join(tempfile.gettempdir(), "sciencegpt_leaderboards.sqlite3")
+
+_MAX_LEVEL = 24  # enough for ~16M entries with p = 0.5
+
+
+class _Node:
+    """Skip list node; width[i] is how many positions next[i] jumps ahead"""
+
+    __slots__ = ("key", "next", "width")
+
+    def __init__(self, key: Any, level: int):
+        self.key = key
+        self.next: List[Optional["_Node"]] = [None] * level
+        self.width = [1] * level
+
+
+class IndexableSkipList:
+    """Sorted container with O(log n) insert, remove, rank and index lookups"""
+
+    def __init__(self, seed: Optional[int] = None):
+        self.head = _Node(None, _MAX_LEVEL)
+        self.size = 0
+        self._random = random.Random(seed)
+
+    def _random_level(self) -> int:
+        level = 1
+        while level < _MAX_LEVEL and self._random.random() < 0.5:
+            level += 1
+        return level
+
+    def insert(self, key: Any):
+        """Insert a key (keys must be unique and mutually comparable)"""
+        update: List[_Node] = [self.head] * _MAX_LEVEL
+        rank_at = [0] * _MAX_LEVEL
+        node, pos = self.head, 0
+        for i in reversed(range(_MAX_LEVEL)):
+            while node.next[i] is not None and node.next[i].key < key:
+                pos += node.width[i]
+                node = node.next[i]
+            update[i] = node
+            rank_at[i] = pos
+
+        level = self._random_level()
+        new = _Node(key, level)
+        for i in range(_MAX_LEVEL):
+            if i < level:
+                new.next[i] = update[i].next[i]
+                update[i].next[i] = new
+                new.width[i] = update[i].width[i] - (pos - rank_at[i])
+                update[i].width[i] = pos - rank_at[i] + 1
+            else:
+                update[i].width[i] += 1
+        self.size += 1
+
+    def remove(self, key: Any):
+        """Remove a key; raises KeyError if it is not present"""
+        update: List[_Node] = [self.head] * _MAX_LEVEL
+        node = self.head
+        for i in reversed(range(_MAX_LEVEL)):
+            while node.next[i] is not None and node.next[i].key < key:
+                node = node.next[i]
+            update[i] = node
+
+        target = update[0].next[0]
+        if target is None or target.key != key:
+            raise KeyError(key)
+
+        for i in range(_MAX_LEVEL):
+            if update[i].next[i] is target:
+                update[i].width[i] += target.width[i] - 1
+                update[i].next[i] = target.next[i]
+            else:
+                update[i].width[i] -= 1
+        self.size -= 1
+
+    def index(self, key: Any) -> int:
+        """Get the 0-based position of a key; raises KeyError if it is not present"""
+        node, pos = self.head, 0
+        for i in reversed(range(_MAX_LEVEL)):
+            while node.next[i] is not None and node.next[i].key < key:
+                pos += node.width[i]
+                node = node.next[i]
+        if node.next[0] is None or node.next[0].key != key:
+            raise KeyError(key)
+        return pos
+
+    def _node_at(self, index: int) -> _Node:
+        if not 0 <= index < self.size:
+            raise IndexError(index)
+        node, pos = self.head, 0
+        target = index + 1
+        for i in reversed(range(_MAX_LEVEL)):
+            while node.next[i] is not None and pos + node.width[i] <= target:
+                pos += node.width[i]
+                node = node.next[i]
+        return node
+
+    def __getitem__(self, index: int) -> Any:
+        return self._node_at(index).key
+
+    def iter_from(self, index: int) -> Iterator[Any]:
+        """Iterate keys in order starting at a position"""
+        if index >= self.size:
+            return
+        node = self._node_at(index)
+        while node is not None:
+            yield node.key
+            node = node.next[0]
+
+    def __len__(self) -> int:
+        return self.size
+
+
+class Leaderboard:
+    """Ranking of students in one scope, highest score first"""
+
+    def __init__(self):
+        self._ranking = IndexableSkipList()
+        self._scores: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def update(self, student_id: str, score: int):
+        """Set a student's score, O(log n)"""
+        with self._lock:
+            old = self._scores.get(student_id)
+            if old == score:
+                return
+            if old is not None:
+                self._ranking.remove((-old, student_id))
+            self._ranking.insert((-score, student_id))
+            self._scores[student_id] = score
+
+    def remove(self, student_id: str):
+        """Drop a student from this leaderboard"""
+        with self._lock:
+            old = self._scores.pop(student_id, None)
+            if old is not None:
+                self._ranking.remove((-old, student_id))
+
+    def rank(self, student_id: str) -> Optional[int]:
+        """Get a student's 1-based rank, O(log n); None if not ranked"""
+        with self._lock:
+            score = self._scores.get(student_id)
+            if score is None:
+                return None
+            return self._ranking.index((-score, student_id)) + 1
+
+    def top(self, k: int = 10, offset: int = 0) -> List[Tuple[int, str, int]]:
+        """Get (rank, student_id, score) for ``k`` students starting at ``offset``"""
+        with self._lock:
+            result = []
+            for i, (neg_score, student_id) in enumerate(self._ranking.iter_from(offset)):
+                if i >= k:
+                    break
+                result.append((offset + i + 1, student_id, -neg_score))
+            return result
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+
+class LeaderboardRegistry:
+    """All leaderboards, keyed by (scope, scope id), rebuilt from a store shared by processes
+
+    Every student's points and memberships are written through to SQLite. Boards
+    are loaded from it at start and catch up with rows other processes wrote at
+    most every ``refresh_seconds``, so all server processes rank the same students.
+    Students without an update for ``max_idle_days`` are dropped.
+    """
+
+    def __init__(self, path: str = DEFAULT_LEADERBOARD_PATH, refresh_seconds: float = 5.0,
+                 max_idle_days: float = 30.0, purge_interval: float = 3600.0):
+        """Open (or create) the store and load every active student"""
+        self.path = path
+        self.refresh_seconds = refresh_seconds
+        self.max_idle_days = max_idle_days
+        self.purge_interval = purge_interval
+        self._local = threading.local()
+        self._boards: Dict[Tuple[str, str], Leaderboard] = {}
+        self._memberships: Dict[str, Dict[str, str]] = {}
+        self._names: Dict[str, str] = {}
+        self._updated: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._seen_until = 0.0
+        self._next_refresh = 0.0
+        self._next_purge = 0.0
+
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS leaderboard_students (student_id TEXT PRIMARY KEY, name TEXT, "
+            "class_id TEXT NOT NULL, school_id TEXT NOT NULL, district_id TEXT NOT NULL, "
+            "points INTEGER NOT NULL, updated_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS leaderboard_students_updated ON leaderboard_students (updated_at)")
+        conn.commit()
+        self.refresh()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def board(self, scope: str, scope_id: str) -> Leaderboard:
+        """Get (creating if needed) the leaderboard for a scope"""
+        with self._lock:
+            key = (scope, scope_id)
+            if key not in self._boards:
+                self._boards[key] = Leaderboard()
+            return self._boards[key]
+
+    def _apply(self, student_id: str, score: int, memberships: Dict[str, str], name: Optional[str],
+               updated_at: float):
+        """Move a student into their current scopes with a score, in memory only"""
+        memberships = {scope: scope_id for scope, scope_id in memberships.items() if scope_id}
+        memberships["global"] = "all"
+        with self._lock:
+            previous = self._memberships.get(student_id, {})
+            self._memberships[student_id] = memberships
+            self._updated[student_id] = max(updated_at, self._updated.get(student_id, 0.0))
+            if name:
+                self._names[student_id] = name
+
+        for scope, scope_id in previous.items():
+            if memberships.get(scope) != scope_id:
+                self.board(scope, scope_id).remove(student_id)
+        for scope, scope_id in memberships.items():
+            self.board(scope, scope_id).update(student_id, score)
+
+    def _drop(self, student_id: str):
+        with self._lock:
+            memberships = self._memberships.pop(student_id, {})
+            self._names.pop(student_id, None)
+            self._updated.pop(student_id, None)
+        for scope, scope_id in memberships.items():
+            self.board(scope, scope_id).remove(student_id)
+
+    def update_student(self, student_id: str, score: int, memberships: Dict[str, str],
+                       name: Optional[str] = None):
+        """Record a student's score in every scope they belong to
+
+        ``memberships`` maps scope to scope id (e.g. ``{"class": "6B"}``); empty ids
+        are skipped, and the student is moved out of scopes they no longer belong to.
+        """
+        now = time.time()
+        self._apply(student_id, score, memberships, name, now)
+        try:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO leaderboard_students "
+                "(student_id, name, class_id, school_id, district_id, points, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (student_id, name or self._names.get(student_id), memberships.get("class", ""),
+                 memberships.get("school", ""), memberships.get("district", ""), score, now)
+            )
+            conn.commit()
+        except sqlite3.Error:
+            # This process still ranks the student; other processes catch up on the next write
+            pass
+
+    def refresh(self):
+        """Apply rows written since the last refresh (by any process) and drop idle students"""
+        now = time.time()
+        cutoff = now - self.max_idle_days * 86400
+        # Overlap by a second so rows committed with a slightly older timestamp are not missed
+        try:
+            rows = self._connection().execute(
+                "SELECT student_id, name, class_id, school_id, district_id, points, updated_at "
+                "FROM leaderboard_students WHERE updated_at > ?", (max(self._seen_until - 1.0, cutoff),)
+            ).fetchall()
+        except sqlite3.Error:
+            rows = []
+        for student_id, name, class_id, school_id, district_id, points, updated_at in rows:
+            if updated_at >= self._updated.get(student_id, 0.0):
+                self._apply(student_id, points, {"class": class_id, "school": school_id, "district": district_id},
+                            name, updated_at)
+            self._seen_until = max(self._seen_until, updated_at)
+        self._next_refresh = now + self.refresh_seconds
+
+        if now >= self._next_purge:
+            self._next_purge = now + self.purge_interval
+            with self._lock:
+                idle = [student_id for student_id, updated_at in self._updated.items() if updated_at < cutoff]
+            for student_id in idle:
+                self._drop(student_id)
+            try:
+                conn = self._connection()
+                conn.execute("DELETE FROM leaderboard_students WHERE updated_at < ?", (cutoff,))
+                conn.commit()
+            except sqlite3.Error:
+                pass
+
+    def _maybe_refresh(self):
+        if time.time() >= self._next_refresh:
+            self.refresh()
+
+    def get_ranks(self, student_id: str) -> Dict[str, Dict[str, Any]]:
+        """Get the student's rank and board size in each scope they belong to"""
+        self._maybe_refresh()
+        with self._lock:
+            memberships = dict(self._memberships.get(student_id, {}))
+        ranks = {}
+        for scope in SCOPES:
+            if scope in memberships:
+                board = self.board(scope, memberships[scope])
+                ranks[scope] = {"scope_id": memberships[scope], "rank": board.rank(student_id), "size": len(board)}
+        return ranks
+
+    def get_top(self, scope: str, scope_id: str, k: int = 5) -> List[Dict[str, Any]]:
+        """Get the top ``k`` students of a scope with display names"""
+        self._maybe_refresh()
+        return [
+            {"rank": rank, "student_id": student_id, "name": self._names.get(student_id, "Student"), "points": score}
+            for rank, student_id, score in self.board(scope, scope_id).top(k)
+        ]
+
+
+_registry: Optional[LeaderboardRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_leaderboards() -> LeaderboardRegistry:
+    """Get the process-wide leaderboard registry, stored at ``SCIENCEGPT_LEADERBOARD_PATH`` if set"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = LeaderboardRegistry(os.getenv("SCIENCEGPT_LEADERBOARD_PATH", DEFAULT_LEADERBOARD_PATH))
+    return _registry
@@ -4,15 +4,63 @@ Handles Groq API integration, YouTube video search, and dynamic content generati
 """
 
 import streamlit as st
+import asyncio
 import os
-from groq import Groq
 import hashlib
 import json
-from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+import threading
+from functools import partial
+from datetime import date, datetime, timedelta
+from typing import List, Dict, Any, Optional, Tuple
 import time
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
+
+from backend_code.retrieval_engine import get_retrieval_engine
+from backend_code.fact_store import get_fact_store
+from backend_code.answer_cache import get_answer_cache, make_answer_key
+from backend_code.prefetch import get_prefetcher
+from backend_code.async_llm import run_sync
+from backend_code.tiered_cache import get_shared_cache
+from backend_code.translation import get_pivot_stats, get_translation_cache
+from backend_code.cache_warmer import TOKEN_ESTIMATES, get_cache_warmer
+from backend_code.trending import get_trending
+from backend_code.fair_share import get_fair_share
+from backend_code.llm_providers import get_provider_router
+from backend_code.video_search import get_video_searcher
+from backend_code.quiz_bank import DIFFICULTIES, QuizItem, get_quiz_bank, parse_items
+from backend_code.challenge_calendar import (
+    days_in_month, fallback_challenge, get_challenge_calendar, parse_challenges
+)
+from backend_code.token_ledger import current_attribution, get_token_ledger, set_attribution
+
+SUGGESTION_TTL_SECONDS = 12 * 3600
+
+# Completion cap for answers once a token budget passes its soft limit
+BRIEF_MAX_TOKENS = 350
+
+FALLBACK_SUGGESTIONS = [
+    "What is the structure of an atom?",
+    "How do plants make their food?",
+    "What causes the seasons to change?",
+    "Why is water important for living things?"
+]
+
+# API clients are shared by every handler in the process and built on first use,
+# so googleapiclient (and groq, see llm_providers.py) are only imported when a
+# request actually needs them.
+_api_clients: Dict[Any, Any] = {}
+_api_clients_lock = threading.Lock()
+
+
+def _get_youtube_service(api_key: str):
+    """Get the shared YouTube Data API client for an API key"""
+    key = ("youtube", api_key)
+    if key not in _api_clients:
+        with _api_clients_lock:
+            if key not in _api_clients:
+                from googleapiclient.discovery import build
+                _api_clients[key] = build('youtube', 'v3', developerKey=api_key, cache_discovery=False)
+    return _api_clients[key]
+
 
 class LLMHandler:
     """Enhanced LLM Handler with YouTube integration, improved caching, and dynamic content"""
@@ -22,84 +70,150 @@ class LLMHandler:
         self.groq_api_key = st.secrets.get("GROQ_API_KEY", os.getenv("GROQ_API_KEY"))
         self.youtube_api_key = st.secrets.get("YOUTUBE_API_KEY", os.getenv("YOUTUBE_API_KEY"))
 
-        if not self.groq_api_key:
+        # Chat providers in preference order: groq, openai (any OpenAI-compatible endpoint) or fake
+        providers = st.secrets.get("LLM_PROVIDERS", os.getenv("LLM_PROVIDERS", "groq"))
+        self.providers = tuple(name.strip() for name in providers.split(",") if name.strip())
+        self.openai_base_url = st.secrets.get("OPENAI_COMPAT_BASE_URL", os.getenv("OPENAI_COMPAT_BASE_URL"))
+        self.openai_api_key = st.secrets.get("OPENAI_COMPAT_API_KEY", os.getenv("OPENAI_COMPAT_API_KEY", ""))
+        self.openai_model = st.secrets.get("OPENAI_COMPAT_MODEL", os.getenv("OPENAI_COMPAT_MODEL"))
+
+        # Re-send slow requests to the next provider once the first passes its p90 time to first token
+        self.hedge_requests = st.secrets.get("LLM_HEDGE", os.getenv("LLM_HEDGE", "1")) in ("1", "true", True)
+
+        if "groq" in self.providers and not self.groq_api_key:
             st.error("GROQ_API_KEY not found in secrets or environment variables!")
             st.stop()
         
         if not self.youtube_api_key:
             st.warning("YOUTUBE_API_KEY not found. Video search will be disabled.")
-            self.youtube_service = None
-        else:
-            try:
-                self.youtube_service = build('youtube', 'v3', developerKey=self.youtube_api_key)
-            except Exception as e:
-                st.error(f"Failed to initialize YouTube service: {e}")
-                self.youtube_service = None
 
-
-        self.client = Groq(api_key=self.groq_api_key)
         self.model = "llama-3.3-70b-versatile"
-
-        # Initialize cache in session state
-        if 'llm_cache' not in st.session_state:
-            st.session_state.llm_cache = {}
-        if 'fact_cache' not in st.session_state:
-            st.session_state.fact_cache = {}
+        self.translation_model = "llama-3.1-8b-instant"
+
+        # Generate answers once in English and translate them with the fast model
+        self.pivot_translation = st.secrets.get("PIVOT_TRANSLATION", os.getenv("PIVOT_TRANSLATION", "1")) in ("1", "true", True)
+
+        # Run answers as coroutines on the shared event loop when enabled
+        self.use_async = st.secrets.get("USE_ASYNC_LLM", os.getenv("USE_ASYNC_LLM", "0")) in ("1", "true", True)
+
+        # Rotation position of the "did you know" facts per topic
+        if 'fact_index' not in st.session_state:
+            st.session_state.fact_index = {}
+
+        # Charge LLM calls made during this rerun to the student and school in the ledger
+        set_attribution(
+            st.session_state.get("student_id") or st.session_state.get("session_id", ""),
+            st.session_state.get("school_id", "")
+        )
+
+        # Give the background cache warmer a handler to generate with
+        get_cache_warmer().attach(self)
+
+    @property
+    def client(self):
+        """Chat client routing to the configured providers, created on first use"""
+        return get_provider_router(
+            self.providers, self.hedge_requests,
+            groq_api_key=self.groq_api_key,
+            openai_base_url=self.openai_base_url,
+            openai_api_key=self.openai_api_key,
+            openai_model=self.openai_model
+        )
+
+    @property
+    def youtube_service(self):
+        """YouTube client, built on first video search; None when no API key is set"""
+        if not self.youtube_api_key:
+            return None
+        return _get_youtube_service(self.youtube_api_key)
 
     def _create_settings_hash(self, grade: int, subject: str, language: str, topic: str) -> str:
         """Create a hash for the current settings combination"""
         settings_string = f"{grade}-{subject}-{language}-{topic}"
         return hashlib.md5(settings_string.encode()).hexdigest()
 
-    def _is_cache_valid(self, cache_key: str, cache_duration_hours: int = 24) -> bool:
-        """Check if cached content is still valid"""
-        if cache_key not in st.session_state.fact_cache:
-            return False
-
-        cache_entry = st.session_state.fact_cache[cache_key]
-        cache_time = cache_entry.get('timestamp', datetime.min)
-
-        if isinstance(cache_time, str):
-            cache_time = datetime.fromisoformat(cache_time)
+    def search_youtube_video(self, question: str, grade: int, subject: str, topic: str,
+                             language: str = "English", quiet: bool = False) -> Optional[str]:
+        """Find a grade-appropriate YouTube video for a question.
 
-        return datetime.now() - cache_time < timedelta(hours=cache_duration_hours)
-
-    def search_youtube_video(self, query: str) -> Optional[str]:
-        """Search for a relevant YouTube video."""
-        if not self.youtube_service:
+        Candidates come from a shared per-topic pool and are ranked locally (see
+        video_search.py). With ``quiet`` set, errors are swallowed instead of shown,
+        which is required when searching from a background thread without a
+        Streamlit script context.
+        """
+        if not self.youtube_api_key:
             return None
-        
+
+        from googleapiclient.errors import HttpError
         try:
-            search_response = self.youtube_service.search().list(
-                q=query,
-                part='snippet',
-                maxResults=1,
-                type='video',
-                videoCategoryId='27',  # Category for Education
-                relevanceLanguage='en' # Prioritize English content
-            ).execute()
-
-            results = search_response.get('items', [])
-            if not results:
-                return None
-
-            video_id = results[0]['id']['videoId']
-            return f"https://www.youtube.com/watch?v={video_id}"
+            searcher = get_video_searcher(self.youtube_api_key, partial(_get_youtube_service, self.youtube_api_key))
+            return searcher.find_url(question, grade, subject, topic, language)
 
         except HttpError as e:
-            st.error(f"An HTTP error {e.resp.status} occurred during YouTube search: {e.content}")
+            if not quiet:
+                st.error(f"An HTTP error {e.resp.status} occurred during YouTube search: {e.content}")
             return None
         except Exception as e:
-            st.error(f"An error occurred during YouTube search: {e}")
+            if not quiet:
+                st.error(f"An error occurred during YouTube search: {e}")
             return None
 
+    async def search_youtube_video_async(self, question: str, grade: int, subject: str, topic: str,
+                                         language: str = "English") -> Optional[str]:
+        """``search_youtube_video`` on the shared event loop, over httpx; errors are swallowed"""
+        if not self.youtube_api_key:
+            return None
+        try:
+            searcher = get_video_searcher(self.youtube_api_key, partial(_get_youtube_service, self.youtube_api_key))
+            return await searcher.afind_url(question, grade, subject, topic, language)
+        except Exception:
+            return None
+
+    def _generate_suggestion_list(self, grade: int, subject: str, language: str, topic: str) -> List[str]:
+        """Generate 4 question suggestions with a single API call"""
+        # Create the prompt for suggestions
+        topic_text = f" focusing on {topic}" if topic != "All Topics" else ""
+
+        prompt = f"""Generate 4 educational questions for Grade {grade} students studying {subject}{topic_text}.
+
+        Requirements:
+        - Questions must be in {language} language
+        - Age-appropriate for Grade {grade} students
+        - Related to {subject} curriculum
+        - Encourage curiosity and learning
+        - Mix different question types (factual, conceptual, analytical)
+
+        Return only the questions, one per line, without numbering or bullets."""
+
+        # Make API call
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": "You are an educational assistant specialized in creating engaging questions for Indian students following NCERT curriculum."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.7,
+            max_tokens=500,
+            task="suggestions"
+        )
+        get_token_ledger().record_usage("suggestions", self.model, getattr(response, "usage", None))
+
+        # Parse suggestions
+        suggestions_text = response.choices[0].message.content.strip()
+        suggestions = [q.strip() for q in suggestions_text.split('\n') if q.strip()]
+        return suggestions[:4]  # Ensure we have max 4
+
     def generate_suggestions(self, grade: int, subject: str, language: str, topic: str) -> List[str]:
-        """Generate dynamic question suggestions based on current settings"""
+        """Generate dynamic question suggestions based on current settings
+
+        Suggestion sets are shared through the tiered cache, so a combination is
+        generated once for all students and server processes until it expires.
+        """
         try:
             # Create cache key based on settings
             cache_key = self._create_settings_hash(grade, subject, language, topic)
 
-            # Check if we need to generate new suggestions
+            # Check if this session needs a new suggestion set
             if (st.session_state.last_settings_hash != cache_key or 
                 not st.session_state.cached_suggestions or
                 st.session_state.settings_applied):
@@ -107,37 +221,25 @@ class LLMHandler:
                 # Reset the settings_applied flag
                 st.session_state.settings_applied = False
 
-                # Create the prompt for suggestions
-                topic_text = f" focusing on {topic}" if topic != "All Topics" else ""
-
-                prompt = f"""Generate 4 educational questions for Grade {grade} students studying {subject}{topic_text}.
-
-                Requirements:
-                - Questions must be in {language} language
-                - Age-appropriate for Grade {grade} students
-                - Related to {subject} curriculum
-                - Encourage curiosity and learning
-                - Mix different question types (factual, conceptual, analytical)
-
-                Return only the questions, one per line, without numbering or bullets."""
-
-                # Make API call
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {"role": "system", "content": "You are an educational assistant specialized in creating engaging questions for Indian students following NCERT curriculum."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    temperature=0.7,
-                    max_tokens=500
-                )
-
-                # Parse suggestions
-                suggestions_text = response.choices[0].message.content.strip()
-                suggestions = [q.strip() for q in suggestions_text.split('\n') if q.strip()]
-
-                # Cache the results
-                st.session_state.cached_suggestions = suggestions[:4]  # Ensure we have max 4
+                shared_cache = get_shared_cache()
+                shared_key = (grade, subject, language, topic)
+                suggestions = shared_cache.get("suggestions", shared_key)
+                get_cache_warmer().record("suggestions", shared_key, bool(suggestions))
+                budget = get_token_ledger().budget_level()
+                if not suggestions and budget == "cache_only":
+                    suggestions = list(FALLBACK_SUGGESTIONS)
+                elif not suggestions:
+                    suggestions = self._generate_suggestion_list(grade, subject, language, topic)
+                    shared_cache.set("suggestions", shared_key, suggestions, SUGGESTION_TTL_SECONDS)
+
+                # Speculative answers are the first spend to go when the budget runs low
+                if budget == "normal":
+                    get_prefetcher().prefetch(
+                        suggestions, grade, subject, language, topic, self._answer_question
+                    )
+
+                # Cache the results for this session
+                st.session_state.cached_suggestions = suggestions
                 st.session_state.last_settings_hash = cache_key
 
                 return st.session_state.cached_suggestions
@@ -147,145 +249,485 @@ class LLMHandler:
 
         except Exception as e:
             st.error(f"Error generating suggestions: {str(e)}")
-            return [
-                "What is the structure of an atom?",
-                "How do plants make their food?", 
-                "What causes the seasons to change?",
-                "Why is water important for living things?"
-            ]
+            return list(FALLBACK_SUGGESTIONS)
+
+    def _generate_fact_pool(self, grade: int, subject: str, topic: str, count: int) -> List[Dict[str, Any]]:
+        """Generate a pool of facts for one combination in a single API call"""
+        # Create the prompt for fact generation
+        topic_text = f" related to {topic}" if topic != "All Topics" else ""
+
+        prompt = f"""Generate {count} different interesting and educational science facts for Grade {grade} students studying {subject}{topic_text}.
+
+        Requirements:
+        - Must be in English language (always)
+        - Age-appropriate for Grade {grade} students
+        - Related to {subject} curriculum
+        - Fascinating and memorable
+        - Include a brief explanation
+        - Should inspire curiosity
+
+        Format each fact as:
+        Fact: [The interesting fact]
+        Explanation: [Brief 2-3 sentence explanation]"""
+
+        # Make API call
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": "You are an educational assistant specialized in creating fascinating science facts for Indian students following NCERT curriculum."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.8,
+            max_tokens=300 * count,
+            task="fact"
+        )
+        get_token_ledger().record_usage("fact", self.model, getattr(response, "usage", None))
+
+        # Parse the facts; each "Fact:" line starts a new entry
+        fact_text = response.choices[0].message.content.strip()
+        lines = [line.strip() for line in fact_text.split('\n') if line.strip()]
+        timestamp = datetime.now().isoformat()
+        facts = []
+
+        for line in lines:
+            if line.startswith("Fact:"):
+                facts.append({"fact": line.replace("Fact:", "").strip(), "explanation": "", "timestamp": timestamp})
+            elif line.startswith("Explanation:") and facts:
+                facts[-1]["explanation"] = line.replace("Explanation:", "").strip()
+
+        # Fallback if parsing fails
+        if not facts:
+            facts.append({
+                "fact": lines[0] if lines else fact_text,
+                "explanation": ' '.join(lines[1:]),
+                "timestamp": timestamp
+            })
+
+        return facts[:count]
 
     def generate_fact_of_day(self, grade: int, subject: str, topic: str) -> Dict[str, Any]:
-        """Generate fact of the day with priority: Grade > Subject > Topic, Language always English"""
-        try:
-            # Create cache key for fact (language always English for facts)
-            cache_key = self._create_settings_hash(grade, subject, "English", topic)
-
-            # Check if we need to generate a new fact
-            if (not self._is_cache_valid(cache_key) or 
-                st.session_state.settings_applied):
-
-                # Create the prompt for fact generation
-                topic_text = f" related to {topic}" if topic != "All Topics" else ""
-
-                prompt = f"""Generate an interesting and educational science fact for Grade {grade} students studying {subject}{topic_text}.
-
-                Requirements:
-                - Must be in English language (always)
-                - Age-appropriate for Grade {grade} students
-                - Related to {subject} curriculum
-                - Fascinating and memorable
-                - Include a brief explanation
-                - Should inspire curiosity
-
-                Format the response as:
-                Fact: [The interesting fact]
-                Explanation: [Brief 2-3 sentence explanation]"""
-
-                # Make API call
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {"role": "system", "content": "You are an educational assistant specialized in creating fascinating science facts for Indian students following NCERT curriculum."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    temperature=0.8,
-                    max_tokens=300
-                )
-
-                # Parse the fact
-                fact_text = response.choices[0].message.content.strip()
-
-                # Try to parse fact and explanation
-                lines = fact_text.split('\n')
-                fact = ""
-                explanation = ""
-
-                for line in lines:
-                    if line.startswith("Fact:"):
-                        fact = line.replace("Fact:", "").strip()
-                    elif line.startswith("Explanation:"):
-                        explanation = line.replace("Explanation:", "").strip()
-
-                # Fallback if parsing fails
-                if not fact:
-                    fact = fact_text.split('\n')[0]
-                if not explanation and len(lines) > 1:
-                    explanation = ' '.join(lines[1:])
-
-                # Create fact dictionary
-                fact_data = {
-                    "fact": fact,
-                    "explanation": explanation,
-                    "timestamp": datetime.now().isoformat()
-                }
-
-                # Cache the result
-                st.session_state.fact_cache[cache_key] = fact_data
+        """Generate fact of the day with priority: Grade > Subject > Topic, Language always English
 
+        Facts come from the process-wide fact store, so each combination costs one
+        API call per day regardless of how many students view it.
+        """
+        try:
+            index = st.session_state.fact_index.get((grade, subject, topic), 0)
+            fact_store = get_fact_store()
+            cached = fact_store.is_cached(grade, subject, topic)
+            get_cache_warmer().record("fact", (grade, subject, topic), cached)
+            if not cached and get_token_ledger().budget_level() == "cache_only":
+                return self._fallback_fact()
+            fact_data = fact_store.get_fact(
+                grade, subject, topic,
+                lambda count: self._generate_fact_pool(grade, subject, topic, count),
+                index
+            )
+            if fact_data:
                 return fact_data
-            else:
-                # Return cached fact
-                return st.session_state.fact_cache[cache_key]
+            raise ValueError("No facts were generated")
 
         except Exception as e:
             st.error(f"Error generating fact: {str(e)}")
+            return self._fallback_fact()
+
+    def _fallback_fact(self) -> Dict[str, Any]:
+        """Built-in fact shown when one cannot be generated"""
+        return {
+            "fact": "The human brain contains approximately 86 billion neurons!",
+            "explanation": "Each neuron can connect to thousands of other neurons, creating an incredibly complex network that allows us to think, learn, and remember.",
+            "timestamp": datetime.now().isoformat()
+        }
+
+    def warm_suggestions(self, grade: int, subject: str, language: str, topic: str) -> Optional[int]:
+        """Generate a shared suggestion set if missing; returns estimated tokens, None if cached"""
+        shared_cache = get_shared_cache()
+        shared_key = (grade, subject, language, topic)
+        if shared_cache.contains("suggestions", shared_key) or get_token_ledger().budget_level() != "normal":
+            return None
+        suggestions = self._generate_suggestion_list(grade, subject, language, topic)
+        shared_cache.set("suggestions", shared_key, suggestions, SUGGESTION_TTL_SECONDS)
+        return TOKEN_ESTIMATES["suggestions"]
+
+    def warm_fact_pool(self, grade: int, subject: str, topic: str) -> Optional[int]:
+        """Generate today's fact pool if missing; returns estimated tokens, None if cached"""
+        fact_store = get_fact_store()
+        if fact_store.is_cached(grade, subject, topic) or get_token_ledger().budget_level() != "normal":
+            return None
+        fact_store.get_pool(grade, subject, topic,
+                            lambda count: self._generate_fact_pool(grade, subject, topic, count))
+        return TOKEN_ESTIMATES["fact"]
+
+    def warm_answer(self, question: str, grade: int, subject: str, language: str, topic: str) -> Optional[int]:
+        """Answer a question into the shared answer cache if missing; returns tokens, None if cached"""
+        key = make_answer_key(question, grade, subject, language, topic)
+        if get_answer_cache().contains(key) or get_token_ledger().budget_level() != "normal":
+            return None
+        answer = self._answer_question(question, grade, subject, language, topic)
+        get_answer_cache().put(key, answer)
+        return answer.get("tokens", 0)
+
+    def warm_quiz(self, grade: int, subject: str, topic: str) -> Optional[int]:
+        """Top up the quiz bank for a combination if it is short; returns estimated tokens, None if stocked"""
+        bank = get_quiz_bank()
+        if not bank.short_levels(grade, subject, topic) or get_token_ledger().budget_level() != "normal":
+            return None
+        bank.ensure(grade, subject, topic,
+                    lambda count, levels: self._generate_quiz_items(grade, subject, topic, count, levels))
+        return TOKEN_ESTIMATES["quiz"]
+
+    def warm_challenges(self, grade: int, subject: str) -> Optional[int]:
+        """Generate this month's challenge calendar, and next month's in the last week; None if stocked"""
+        calendar = get_challenge_calendar()
+        today = date.today()
+        months = [today]
+        if days_in_month(today) - today.day < 7:
+            months.append(today.replace(day=1) + timedelta(days=days_in_month(today)))
+        missing = [day for day in months if not calendar.has_month(grade, subject, day)]
+        if not missing or get_token_ledger().budget_level() != "normal":
+            return None
+        for day in missing:
+            calendar.ensure_month(grade, subject, day, lambda days: self._generate_challenge_month(grade, subject, days))
+        return TOKEN_ESTIMATES["challenge"] * len(missing)
+
+    def _generate_challenge_month(self, grade: int, subject: str, days: int) -> List[str]:
+        """Generate a month of daily challenges for a grade and subject in a single API call"""
+        prompt = f"""Write {days} different daily science challenges for Grade {grade} students studying {subject} (NCERT curriculum), one for each day of a month.
+
+        Each challenge is one short, curious question or a tiny observation task a child can think about or
+        try safely at home, in English and age-appropriate for Grade {grade}. Cover many topics of the subject
+        and do not repeat ideas.
+
+        Reply with only a JSON array of {days} strings."""
+
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": "You are an educational assistant who creates engaging science activities for Indian students following NCERT curriculum."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.9,
+            max_tokens=60 * days,
+            task="challenge"
+        )
+        get_token_ledger().record_usage("challenge", self.model, getattr(response, "usage", None))
+        return parse_challenges(response.choices[0].message.content, days)
+
+    def get_daily_challenge(self, grade: int, subject: str, day: Optional[date] = None) -> str:
+        """The day's challenge from the monthly calendar; the month is generated once, on first use"""
+        day = day or date.today()
+        calendar = get_challenge_calendar()
+        challenge = calendar.lookup(grade, subject, day)
+        get_cache_warmer().record("challenge", (grade, subject), challenge is not None)
+        if challenge is None and get_token_ledger().budget_level() != "cache_only":
+            try:
+                calendar.ensure_month(grade, subject, day,
+                                      lambda days: self._generate_challenge_month(grade, subject, days))
+                challenge = calendar.lookup(grade, subject, day)
+            except Exception as e:
+                st.error(f"Error generating challenge: {str(e)}")
+        return challenge or fallback_challenge(grade, day)
+
+    def next_fact(self, grade: int, subject: str, topic: str):
+        """Move this session to the next fact in today's pool for the combination"""
+        key = (grade, subject, topic)
+        st.session_state.fact_index[key] = st.session_state.fact_index.get(key, 0) + 1
+
+    def _generate_quiz_items(self, grade: int, subject: str, topic: str, count: int,
+                             difficulties: Optional[List[int]] = None) -> List[QuizItem]:
+        """Generate a batch of quiz items for one combination in a single API call, at the given difficulties"""
+        topic_text = f" on the topic {topic}" if topic != "All Topics" else ""
+        levels = difficulties or list(DIFFICULTIES)
+        difficulty_text = " and ".join(f"{level} ({DIFFICULTIES[level].lower()})" for level in levels)
+        difficulty_rule = "difficulty" if len(levels) == 1 else "difficulties"
+
+        prompt = f"""Write {count} quiz questions for Grade {grade} students studying {subject}{topic_text} (NCERT curriculum).
+
+        Mix the types: "mcq" (4 options), "true_false" and "numeric" (a single number as the answer).
+        Use only the {difficulty_rule} {difficulty_text}. Questions must be in English and
+        age-appropriate for Grade {grade}.
+
+        Reply with only a JSON array of objects like:
+        {{"type": "mcq", "difficulty": 1, "question": "...", "options": ["...", "...", "...", "..."], "answer": 0, "explanation": "..."}}
+        {{"type": "true_false", "difficulty": 2, "question": "...", "answer": true, "explanation": "..."}}
+        {{"type": "numeric", "difficulty": 3, "question": "...", "answer": 9.8, "tolerance": 0.1, "explanation": "..."}}
+        For "mcq", "answer" is the index of the correct option."""
+
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": "You are an educational assistant who writes accurate, unambiguous science quiz questions for Indian students following NCERT curriculum."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.7,
+            max_tokens=200 * count,
+            task="quiz"
+        )
+        get_token_ledger().record_usage("quiz", self.model, getattr(response, "usage", None))
+        return parse_items(response.choices[0].message.content, grade, subject, topic)
+
+    def get_quiz(self, grade: int, subject: str, topic: str, difficulty: Optional[int] = None,
+                 count: int = 5) -> List[QuizItem]:
+        """Pick a quiz from the shared item bank, generating a batch first if its difficulty is short
+
+        Items this session has already seen are avoided while enough others remain.
+        """
+        bank = get_quiz_bank()
+        stocked = not bank.short_levels(grade, subject, topic, difficulty)
+        get_cache_warmer().record("quiz", (grade, subject, topic), stocked)
+        if not stocked and get_token_ledger().budget_level() != "cache_only":
+            try:
+                bank.ensure(grade, subject, topic,
+                            lambda n, levels: self._generate_quiz_items(grade, subject, topic, n, levels),
+                            difficulty)
+            except Exception as e:
+                st.error(f"Error generating quiz: {str(e)}")
+
+        seen = st.session_state.setdefault("quiz_seen", set())
+        items = bank.select(grade, subject, topic, difficulty, count, exclude=seen)
+        seen.update(item.id for item in items)
+        return items
+
+    def _prepare_answer(self, question: str, grade: int, subject: str, language: str, topic: str,
+                        brief: bool = False) -> Dict[str, Any]:
+        """Run local retrieval and build the chat request for an answer
+
+        Returns a dict with ``direct_text`` set when the NCERT index answered the
+        question itself, otherwise ``messages`` for the LLM.
+        """
+        # 1. Try the local NCERT index first; definitional questions it can answer
+        # confidently never reach the LLM, the rest are grounded with its passages
+        engine = get_retrieval_engine()
+        retrieval = engine.retrieve(question, grade, subject, language)
+        if retrieval["mode"] == "direct":
+            return {
+                "direct_text": engine.format_direct_answer(retrieval["answer"]),
+                "messages": None
+            }
+
+        reference_text = ""
+        if retrieval["passages"]:
+            reference_text = f"""
+        Reference passages from the NCERT textbook (use them if relevant):
+        {engine.format_context(retrieval["passages"])}"""
+
+        # 2. Build the text response request
+        topic_context = f" with focus on {topic}" if topic != "All Topics" else ""
+        prompt = f"""You are an expert science teacher for Grade {grade} Indian students following NCERT curriculum.
+        Student Question: {question}
+        Context:
+        - Grade: {grade}
+        - Subject: {subject}
+        - Language: {language}
+        - Topic: {topic}{reference_text}
+        Please provide a comprehensive, age-appropriate answer in {language} language that:
+        1. Directly answers the student's question
+        2. Is appropriate for Grade {grade} level understanding
+        3. Relates to {subject}{topic_context}
+        4. Encourages further learning
+        5. Uses simple language and examples
+        Keep the response educational, engaging, and encouraging."""
+        if brief:
+            prompt += "\n        Keep the whole answer to 3-4 short sentences."
+
+        return {
+            "direct_text": None,
+            "messages": [
+                {"role": "system", "content": f"You are a helpful science teacher for Grade {grade} students. Always respond in {language} language and keep explanations age-appropriate."},
+                {"role": "user", "content": prompt}
+            ]
+        }
+
+    def _answer_question(self, question: str, grade: int, subject: str, language: str, topic: str,
+                         quiet: bool = True, brief: bool = False) -> Dict[str, Any]:
+        """Answer a question and find a video
+
+        Raises on API errors. With ``quiet`` set nothing is written to the page, so it
+        is safe to call from background threads; the returned dict carries the
+        ``tokens`` spent so callers can account for them. ``brief`` asks for a short
+        answer when a token budget is running low.
+        """
+        if self.pivot_translation and language != "English":
+            return self._answer_question_pivot(question, grade, subject, language, topic, quiet, brief)
+        if self.use_async:
+            return run_sync(self._answer_question_async(question, grade, subject, language, topic,
+                                                        brief, current_attribution()))
+
+        request = self._prepare_answer(question, grade, subject, language, topic, brief)
+        if request["direct_text"] is not None:
+            return {
+                "text": request["direct_text"],
+                "video_url": self.search_youtube_video(question, grade, subject, topic, language, quiet=quiet),
+                "tokens": 0
+            }
+
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=request["messages"],
+            temperature=0.6,
+            max_tokens=BRIEF_MAX_TOKENS if brief else 1000,
+            task="answer"
+        )
+        usage = getattr(response, "usage", None)
+        get_token_ledger().record_usage("answer", self.model, usage)
+
+        # 3. Search for a YouTube video
+        return {
+            "text": response.choices[0].message.content.strip(),
+            "video_url": self.search_youtube_video(question, grade, subject, topic, language, quiet=quiet),
+            "tokens": getattr(usage, "total_tokens", 0) or 0
+        }
+
+    def _translate(self, text: str, source: str, target: str, max_tokens: int = 1500) -> Tuple[str, int]:
+        """Translate text with the fast model, returning (translation, tokens spent)
+
+        Translations are cached, so a repeated text costs no tokens.
+        """
+        if source == target:
+            return text, 0
+
+        cache = get_translation_cache()
+        cached = cache.get(text, source, target)
+        if cached is not None:
+            return cached, 0
+
+        response = self.client.chat.completions.create(
+            model=self.translation_model,
+            messages=[
+                {"role": "system", "content": f"You translate school science content from {source} to {target} for Indian students. Keep the meaning, formatting and simple tone. Reply with the translation only."},
+                {"role": "user", "content": text}
+            ],
+            temperature=0.2,
+            max_tokens=max_tokens,
+            task="translation"
+        )
+        usage = getattr(response, "usage", None)
+        get_token_ledger().record_usage("translation", self.translation_model, usage)
+        translation = response.choices[0].message.content.strip()
+        cache.put(text, source, target, translation)
+        return translation, getattr(usage, "total_tokens", 0) or 0
+
+    def _answer_question_pivot(self, question: str, grade: int, subject: str, language: str, topic: str,
+                               quiet: bool = True, brief: bool = False) -> Dict[str, Any]:
+        """Answer via an English canonical answer that is cached once and translated per language
+
+        A ``brief`` canonical answer is not cached, so students with budget left
+        still get the full one.
+        """
+        english_question, question_tokens = self._translate(question, language, "English", max_tokens=200)
+
+        english_key = make_answer_key(english_question, grade, subject, "English", topic)
+        canonical = get_answer_cache().get(english_key)
+        reused = canonical is not None
+        if canonical is None:
+            canonical = self._answer_question(english_question, grade, subject, "English", topic, quiet, brief)
+            if not brief:
+                get_answer_cache().put(english_key, canonical)
+
+        text, answer_tokens = self._translate(canonical["text"], "English", language)
+        translation_tokens = question_tokens + answer_tokens
+        get_pivot_stats().record_pivot("English", language, reused, canonical.get("tokens", 0), translation_tokens)
+
+        return {
+            "text": text,
+            "video_url": canonical["video_url"],
+            "tokens": translation_tokens + (0 if reused else canonical.get("tokens", 0))
+        }
+
+    async def _answer_question_async(self, question: str, grade: int, subject: str, language: str,
+                                     topic: str, brief: bool = False,
+                                     attribution: Optional[Tuple[str, str]] = None) -> Dict[str, Any]:
+        """Async variant of ``_answer_question`` running on the shared event loop
+
+        The completion streams through the provider router's async path and the
+        video search goes over httpx, concurrently and without worker threads. The
+        loop thread has no ledger attribution of its own, so the caller's is passed in.
+        """
+        request = self._prepare_answer(question, grade, subject, language, topic, brief)
+        if request["direct_text"] is not None:
             return {
-                "fact": "The human brain contains approximately 86 billion neurons!",
-                "explanation": "Each neuron can connect to thousands of other neurons, creating an incredibly complex network that allows us to think, learn, and remember.",
-                "timestamp": datetime.now().isoformat()
+                "text": request["direct_text"],
+                "video_url": await self.search_youtube_video_async(question, grade, subject, topic, language),
+                "tokens": 0
             }
 
+        response, video_url = await asyncio.gather(
+            self.client.chat.completions.acreate(
+                model=self.model, messages=request["messages"], temperature=0.6,
+                max_tokens=BRIEF_MAX_TOKENS if brief else 1000, task="answer", attribution=attribution
+            ),
+            self.search_youtube_video_async(question, grade, subject, topic, language)
+        )
+        usage = getattr(response, "usage", None)
+        get_token_ledger().record_usage("answer", self.model, usage, attribution)
+        tokens = getattr(usage, "total_tokens", 0) or 0
+        return {"text": response.choices[0].message.content.strip(), "video_url": video_url, "tokens": tokens}
+
     def generate_response(self, question: str, grade: int, subject: str, language: str, topic: str) -> Dict[str, Optional[str]]:
         """Generate response to student question and find a relevant YouTube video."""
-        response_text = ""
-        video_url = None
-        try:
-            # 1. Generate text response
-            topic_context = f" with focus on {topic}" if topic != "All Topics" else ""
-            prompt = f"""You are an expert science teacher for Grade {grade} Indian students following NCERT curriculum.
-            Student Question: {question}
-            Context:
-            - Grade: {grade}
-            - Subject: {subject}
-            - Language: {language}
-            - Topic: {topic}
-            Please provide a comprehensive, age-appropriate answer in {language} language that:
-            1. Directly answers the student's question
-            2. Is appropriate for Grade {grade} level understanding
-            3. Relates to {subject}{topic_context}
-            4. Encourages further learning
-            5. Uses simple language and examples
-            Keep the response educational, engaging, and encouraging."""
-
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": f"You are a helpful science teacher for Grade {grade} students. Always respond in {language} language and keep explanations age-appropriate."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.6,
-                max_tokens=1000
-            )
-            response_text = response.choices[0].message.content.strip()
+        prefetcher = get_prefetcher()
+        key = make_answer_key(question, grade, subject, language, topic)
+
+        # Served instantly if the answer was prefetched or asked before
+        cached = prefetcher.lookup(key)
+        get_pivot_stats().record_lookup(language, cached is not None)
+        get_cache_warmer().record("answer", key, cached is not None, payload=question)
+        ledger = get_token_ledger()
+        if cached is not None:
+            get_trending().record(question, grade, subject, language, key, current_attribution()[0])
+            ledger.record_served(from_cache=True)
+            return {"text": cached["text"], "video_url": cached["video_url"]}
+
+        # Near a daily token budget answers get shorter; past it only cached answers are served
+        budget = ledger.budget_level(*current_attribution())
+        if budget == "cache_only":
+            return {
+                "text": "📚 You've reached today's limit for new answers. Try one of the trending questions — those answers are ready instantly — or come back tomorrow!",
+                "video_url": None,
+                "throttled": True
+            }
 
-            # 2. Search for a YouTube video
-            video_search_query = f"educational video for grade {grade} {subject} {topic}: {question}"
-            video_url = self.search_youtube_video(video_search_query)
+        # Uncached answers need an LLM slot within the student's and class's fair share
+        scheduler = get_fair_share()
+        admission = scheduler.acquire(
+            st.session_state.get("student_id") or st.session_state.get("session_id", "anonymous"),
+            st.session_state.get("class_id") or None
+        )
+        if admission.status == "throttled":
+            return {
+                "text": f"⏳ You're asking questions very quickly! Please take a moment to read the answers above and try again in about {max(1, round(admission.retry_after))} seconds.",
+                "video_url": None,
+                "throttled": True
+            }
+        if not admission.admitted:
+            return {
+                "text": "⏳ Lots of students are asking questions right now. Please try again in a minute.",
+                "video_url": None,
+                "throttled": True
+            }
 
+        tokens = 0
+        prefetcher.foreground_started()
+        try:
+            brief = budget == "short"
+            answer = self._answer_question(question, grade, subject, language, topic, quiet=False, brief=brief)
+            tokens = answer.get("tokens", 0)
+            # Shortened answers stay out of the shared cache so other students get the full one
+            if not brief:
+                get_answer_cache().put(key, answer)
+                get_trending().record(question, grade, subject, language, key, current_attribution()[0])
+            ledger.record_served()
+            return {"text": answer["text"], "video_url": answer["video_url"]}
         except Exception as e:
             st.error(f"Error generating response: {str(e)}")
             response_text = f"I apologize, but I'm having trouble answering your question right now. Please try again or ask a different question about {subject}."
-        
-        return {"text": response_text, "video_url": video_url}
-
+            return {"text": response_text, "video_url": None, "error": True}
+        finally:
+            prefetcher.foreground_finished()
+            scheduler.release(admission, tokens)
 
     def clear_suggestion_cache(self):
         """Clear the suggestion cache to force regeneration"""
         st.session_state.cached_suggestions = []
         st.session_state.last_settings_hash = None
         st.session_state.settings_applied = True
-
-    def clear_fact_cache(self):
-        """Clear the fact cache to force regeneration"""
-        st.session_state.fact_cache = {}
-        st.session_state.settings_applied = True
@@ -0,0 +1,607 @@
+"""
+LLM Providers for ScienceGPT
+Groq, OpenAI-compatible and local fake chat providers behind one hedging router
+"""
+
+import asyncio
+import json
+import queue
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from backend_code.token_ledger import current_attribution, get_token_ledger
+
+# A streamed chunk: (text delta, usage or None); usage arrives with the last chunk
+Chunk = Tuple[str, Optional[Any]]
+
+
+def make_usage(prompt_tokens: int, completion_tokens: int) -> SimpleNamespace:
+    """Usage object shaped like the Groq/OpenAI one"""
+    return SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                           total_tokens=prompt_tokens + completion_tokens)
+
+
+def make_response(text: str, usage: Any, provider: str, hedged: bool) -> SimpleNamespace:
+    """Chat completion object shaped like the Groq/OpenAI one, plus which provider answered"""
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=text))],
+        usage=usage,
+        provider=provider,
+        hedged=hedged
+    )
+
+
+class LLMProvider(ABC):
+    """A chat completion backend that can stream, blocking or on an event loop, and be cancelled"""
+
+    name = "provider"
+
+    @abstractmethod
+    def stream(self, model: str, messages: List[Dict[str, str]], temperature: float, max_tokens: int,
+               cancel: threading.Event) -> Iterator[Chunk]:
+        """Yield (text delta, usage) chunks, stopping once ``cancel`` is set"""
+
+    @abstractmethod
+    def astream(self, model: str, messages: List[Dict[str, str]], temperature: float,
+                max_tokens: int) -> AsyncIterator[Chunk]:
+        """Async generator of (text delta, usage) chunks; cancelled by cancelling its task"""
+
+
+def _groq_chunk(chunk: Any) -> Optional[Chunk]:
+    delta = chunk.choices[0].delta.content if chunk.choices else None
+    # Groq reports usage on the final chunk under x_groq
+    usage = getattr(getattr(chunk, "x_groq", None), "usage", None)
+    return (delta or "", usage) if delta or usage is not None else None
+
+
+class GroqProvider(LLMProvider):
+    """Groq's hosted models through the official clients"""
+
+    name = "groq"
+
+    def __init__(self, api_key: str):
+        self.api_key = api_key
+        self._client = None
+        self._async_client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            from groq import Groq
+            self._client = Groq(api_key=self.api_key)
+        return self._client
+
+    @property
+    def async_client(self):
+        if self._async_client is None:
+            from groq import AsyncGroq
+            self._async_client = AsyncGroq(api_key=self.api_key)
+        return self._async_client
+
+    def stream(self, model: str, messages: List[Dict[str, str]], temperature: float, max_tokens: int,
+               cancel: threading.Event) -> Iterator[Chunk]:
+        response = self.client.chat.completions.create(
+            model=model, messages=messages, temperature=temperature, max_tokens=max_tokens, stream=True
+        )
+        try:
+            for chunk in response:
+                if cancel.is_set():
+                    return
+                parsed = _groq_chunk(chunk)
+                if parsed is not None:
+                    yield parsed
+        finally:
+            response.close()
+
+    async def astream(self, model: str, messages: List[Dict[str, str]], temperature: float,
+                      max_tokens: int) -> AsyncIterator[Chunk]:
+        response = await self.async_client.chat.completions.create(
+            model=model, messages=messages, temperature=temperature, max_tokens=max_tokens, stream=True
+        )
+        try:
+            async for chunk in response:
+                parsed = _groq_chunk(chunk)
+                if parsed is not None:
+                    yield parsed
+        finally:
+            await response.close()
+
+
+class OpenAICompatibleProvider(LLMProvider):
+    """Any ``/chat/completions`` endpoint speaking the OpenAI streaming protocol
+
+    Covers hosted APIs as well as local servers (vLLM, llama.cpp, Ollama). ``model``
+    overrides the requested model, since other endpoints name models differently.
+    """
+
+    name = "openai"
+
+    def __init__(self, base_url: str, api_key: str = "", model: Optional[str] = None, timeout: float = 30.0):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.model = model
+        self.timeout = timeout
+        self._http = None
+        self._async_http = None
+
+    @property
+    def http(self):
+        if self._http is None:
+            import httpx
+            self._http = httpx.Client(timeout=self.timeout)
+        return self._http
+
+    @property
+    def async_http(self):
+        if self._async_http is None:
+            import httpx
+            self._async_http = httpx.AsyncClient(timeout=self.timeout)
+        return self._async_http
+
+    def _request(self, model: str, messages: List[Dict[str, str]], temperature: float,
+                 max_tokens: int) -> Dict[str, Any]:
+        """Arguments of the streaming POST"""
+        return {
+            "method": "POST",
+            "url": f"{self.base_url}/chat/completions",
+            "headers": {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {},
+            "json": {
+                "model": self.model or model,
+                "messages": messages,
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+                "stream": True,
+                "stream_options": {"include_usage": True}
+            }
+        }
+
+    @staticmethod
+    def _parse_line(line: str) -> Optional[Chunk]:
+        """Chunk in a server-sent event line, None for other lines; raises StopIteration at [DONE]"""
+        if not line.startswith("data:"):
+            return None
+        data = line[5:].strip()
+        if data == "[DONE]":
+            raise StopIteration
+        event = json.loads(data)
+        choices = event.get("choices") or []
+        delta = (choices[0].get("delta") or {}).get("content") if choices else None
+        usage = event.get("usage")
+        if not delta and not usage:
+            return None
+        return delta or "", make_usage(usage["prompt_tokens"], usage["completion_tokens"]) if usage else None
+
+    def stream(self, model: str, messages: List[Dict[str, str]], temperature: float, max_tokens: int,
+               cancel: threading.Event) -> Iterator[Chunk]:
+        with self.http.stream(**self._request(model, messages, temperature, max_tokens)) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if cancel.is_set():
+                    return
+                try:
+                    chunk = self._parse_line(line)
+                except StopIteration:
+                    return
+                if chunk is not None:
+                    yield chunk
+
+    async def astream(self, model: str, messages: List[Dict[str, str]], temperature: float,
+                      max_tokens: int) -> AsyncIterator[Chunk]:
+        async with self.async_http.stream(**self._request(model, messages, temperature, max_tokens)) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                try:
+                    chunk = self._parse_line(line)
+                except StopIteration:
+                    return
+                if chunk is not None:
+                    yield chunk
+
+
+class FakeProvider(LLMProvider):
+    """Local stand-in that streams a canned answer with a configurable latency profile
+
+    Time to first token is log-normal around ``ttft_median`` with a ``stall_rate``
+    chance of an extra ``stall_seconds``, which is what makes real tails long.
+    """
+
+    def __init__(self, name: str = "fake", ttft_median: float = 0.3, ttft_sigma: float = 0.4,
+                 stall_rate: float = 0.0, stall_seconds: float = 2.0, tokens_per_second: float = 500.0,
+                 text: str = "This is a stand-in answer from the local fake provider.", seed: Optional[int] = None):
+        self.name = name
+        self.ttft_median = ttft_median
+        self.ttft_sigma = ttft_sigma
+        self.stall_rate = stall_rate
+        self.stall_seconds = stall_seconds
+        self.tokens_per_second = tokens_per_second
+        self.text = text
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self.calls = 0
+
+    def _ttft(self) -> float:
+        with self._random_lock:
+            self.calls += 1
+            ttft = self.ttft_median * self._random.lognormvariate(0, self.ttft_sigma)
+            if self._random.random() < self.stall_rate:
+                ttft += self.stall_seconds
+        return ttft
+
+    def stream(self, model: str, messages: List[Dict[str, str]], temperature: float, max_tokens: int,
+               cancel: threading.Event) -> Iterator[Chunk]:
+        if cancel.wait(self._ttft()):
+            return
+        words = self.text.split()[:max_tokens]
+        for i, word in enumerate(words):
+            if i and cancel.wait(1 / self.tokens_per_second):
+                return
+            yield (word if i == 0 else " " + word), None
+        prompt_tokens = sum(len(m["content"].split()) for m in messages)
+        yield "", make_usage(prompt_tokens, len(words))
+
+    async def astream(self, model: str, messages: List[Dict[str, str]], temperature: float,
+                      max_tokens: int) -> AsyncIterator[Chunk]:
+        await asyncio.sleep(self._ttft())
+        words = self.text.split()[:max_tokens]
+        for i, word in enumerate(words):
+            if i:
+                await asyncio.sleep(1 / self.tokens_per_second)
+            yield (word if i == 0 else " " + word), None
+        prompt_tokens = sum(len(m["content"].split()) for m in messages)
+        yield "", make_usage(prompt_tokens, len(words))
+
+
+class LatencyTracker:
+    """Rolling time-to-first-token samples for one provider"""
+
+    def __init__(self, window: int = 500):
+        self.samples: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float):
+        with self._lock:
+            self.samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            if not self.samples:
+                return None
+            ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+
+def estimate_usage(messages: List[Dict[str, str]], chunks: int) -> SimpleNamespace:
+    """Rough usage of a stream cut short: about 4 characters per prompt token and one token per chunk"""
+    return make_usage(sum(len(m["content"]) for m in messages) // 4, chunks)
+
+
+class _Attempt:
+    """One provider's run of a request, on a worker thread or as a task on an event loop"""
+
+    __slots__ = ("provider", "cancel", "task", "started", "text", "usage", "charge")
+
+    def __init__(self, provider: LLMProvider, charge: Tuple[Optional[str], Tuple[str, str]]):
+        self.provider = provider
+        # (ledger task, attribution) that the tokens of a cancelled run are charged to
+        self.charge = charge
+        self.cancel = threading.Event()
+        self.task: Optional[asyncio.Task] = None
+        # Stamped when a worker picks the attempt up, so time queued for a thread is not TTFT
+        self.started = 0.0
+        self.text: List[str] = []
+        self.usage: Any = None
+
+    def stop(self):
+        self.cancel.set()
+        if self.task is not None:
+            self.task.cancel()
+
+
+class _Race:
+    """Hedging and failover decisions for one request, shared by the thread and asyncio paths
+
+    The caller waits for attempt events and starts whatever provider ``on_timeout``
+    (a hedge) or ``on_event`` (a failover) returns.
+    """
+
+    def __init__(self, router: "ProviderRouter", primary: _Attempt):
+        self.router = router
+        self.pending = list(router.providers[1:])
+        self.attempts = [primary]
+        self.winner: Optional[_Attempt] = None
+        self.hedged = False
+        self.done = False
+        self.error: Optional[Exception] = None
+        started = time.monotonic()
+        self.request_deadline = started + router.request_timeout
+        self.hedge_deadline = started + router.hedge_delay() if router.hedge else None
+
+    def wait_seconds(self) -> float:
+        wake = self.request_deadline if self.hedge_deadline is None else min(self.hedge_deadline, self.request_deadline)
+        return max(0.0, wake - time.monotonic())
+
+    def on_timeout(self) -> Optional[LLMProvider]:
+        """Nothing arrived in time: raise past the request deadline, else the provider to hedge to"""
+        if time.monotonic() >= self.request_deadline:
+            self.router._count("timeouts")
+            self.error = TimeoutError(f"LLM request took longer than {self.router.request_timeout:g}s")
+            raise self.error
+        # No first token within the primary's p90: hedge once
+        self.hedge_deadline = None
+        return self.pending[0] if self.winner is None and self.pending else None
+
+    def hedge_started(self, attempt: Optional[_Attempt]):
+        """Record the hedge to ``pending[0]``, or that no thread was free for it (None)"""
+        self.router._count("hedged" if attempt is not None else "hedges_skipped")
+        if attempt is not None:
+            self.hedged = True
+            self.pending.pop(0)
+            self.attempts.append(attempt)
+
+    def on_event(self, kind: str, attempt: _Attempt, exc: Optional[Exception]) -> Optional[LLMProvider]:
+        """Apply an attempt's event; returns the provider to fail over to, raises if the request failed"""
+        if kind == "first" and self.winner is None:
+            self.winner = attempt
+            for other in self.attempts:
+                if other is not attempt:
+                    other.stop()
+        elif kind == "done" and attempt is self.winner:
+            self.done = True
+        elif kind == "error" and (self.winner is None or attempt is self.winner):
+            self.error = exc
+            self.attempts.remove(attempt)
+            if attempt is self.winner or (not self.attempts and not self.pending):
+                raise exc
+            if not self.attempts:
+                # Failed before its first token: try the next provider straight away
+                self.hedge_deadline = None
+                self.router._count("failovers")
+                return self.pending.pop(0)
+        return None
+
+    def finish(self):
+        """Stop every attempt but a successful winner"""
+        for attempt in self.attempts:
+            if attempt is not self.winner or self.error is not None:
+                attempt.stop()
+
+    def response(self) -> SimpleNamespace:
+        winner = self.winner
+        if self.hedged and winner.provider is not self.router.providers[0]:
+            self.router._count("hedge_wins")
+        return make_response("".join(winner.text).strip(), winner.usage or make_usage(0, 0),
+                             winner.provider.name, self.hedged)
+
+
+class ProviderRouter:
+    """Sends chat completions to the primary provider, hedging slow ones to a secondary
+
+    If the primary has produced no token within its recent p90 time to first token,
+    the same request goes to the secondary; whichever streams a token first wins and
+    the other is cancelled. A primary that fails (or streams nothing) before its
+    first token fails over, and no request outlives ``request_timeout``. Tokens a
+    cancelled attempt already spent are counted in ``hedge_tokens`` and, when the
+    caller names a ``task``, recorded in the token ledger. Exposes ``chat.completions.create`` so it drops in where a Groq client was used.
+
+    Blocking calls stream on worker threads; hedges run on their own
+    ``hedge_workers`` threads, so a saturated primary pool cannot hold back the
+    request meant to rescue it, and when those are all busy the request is not
+    hedged. ``chat.completions.acreate`` runs the same race as tasks on the
+    caller's event loop with the providers' async clients, using no threads.
+    """
+
+    def __init__(self, providers: List[LLMProvider], hedge: bool = True, hedge_percentile: float = 0.9,
+                 initial_hedge_delay: float = 1.5, min_samples: int = 20, max_workers: int = 64,
+                 hedge_workers: int = 16, request_timeout: float = 60.0):
+        """Initialize with providers in preference order"""
+        if not providers:
+            raise ValueError("At least one LLM provider is required")
+        self.providers = providers
+        self.hedge = hedge and len(providers) > 1
+        self.hedge_percentile = hedge_percentile
+        self.initial_hedge_delay = initial_hedge_delay
+        self.min_samples = min_samples
+        self.request_timeout = request_timeout
+        self.latency = {provider.name: LatencyTracker() for provider in providers}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-provider")
+        self._hedge_executor = ThreadPoolExecutor(max_workers=hedge_workers, thread_name_prefix="llm-hedge")
+        self._hedge_slots = threading.BoundedSemaphore(hedge_workers)
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "hedged": 0, "hedge_wins": 0, "hedges_skipped": 0, "failovers": 0,
+                      "errors": 0, "timeouts": 0, "hedge_tokens": 0}
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create, acreate=self.acreate))
+
+    def _count(self, stat: str):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait for the primary's first token before hedging"""
+        tracker = self.latency[self.providers[0].name]
+        if len(tracker) < self.min_samples:
+            return self.initial_hedge_delay
+        return tracker.percentile(self.hedge_percentile)
+
+    def _on_chunk(self, attempt: _Attempt, delta: str, usage: Any, first: bool, emit):
+        if first:
+            self.latency[attempt.provider.name].add(time.monotonic() - attempt.started)
+            emit(("first", attempt, None))
+        attempt.text.append(delta)
+        if usage is not None:
+            attempt.usage = usage
+
+    def _finished(self, attempt: _Attempt, first: bool, emit):
+        if first:
+            emit(("error", attempt, RuntimeError(f"{attempt.provider.name} returned an empty completion")))
+        else:
+            emit(("done", attempt, None))
+
+    def _run(self, attempt: _Attempt, request: Dict[str, Any], events: "queue.Queue"):
+        """Stream one attempt on a worker thread, reporting its first token, completion or error"""
+        attempt.started = time.monotonic()
+        first = True
+        try:
+            for delta, usage in attempt.provider.stream(cancel=attempt.cancel, **request):
+                self._on_chunk(attempt, delta, usage, first, events.put)
+                first = False
+            if attempt.cancel.is_set():
+                self._charge_cancelled(attempt, request)
+            else:
+                self._finished(attempt, first, events.put)
+        except Exception as e:
+            events.put(("error", attempt, e))
+
+    async def _arun(self, attempt: _Attempt, request: Dict[str, Any], events: "asyncio.Queue"):
+        """Stream one attempt as a task on the event loop; the same events as ``_run``"""
+        attempt.started = time.monotonic()
+        first = True
+        try:
+            async for delta, usage in attempt.provider.astream(**request):
+                self._on_chunk(attempt, delta, usage, first, events.put_nowait)
+                first = False
+            self._finished(attempt, first, events.put_nowait)
+        except asyncio.CancelledError:
+            self._charge_cancelled(attempt, request)
+            raise
+        except Exception as e:
+            events.put_nowait(("error", attempt, e))
+
+    def _charge_cancelled(self, attempt: _Attempt, request: Dict[str, Any]):
+        """Account for the tokens a cancelled attempt spent; providers rarely report usage for them"""
+        usage = attempt.usage or estimate_usage(request["messages"], len(attempt.text))
+        with self._lock:
+            self.stats["hedge_tokens"] += usage.total_tokens
+        task, attribution = attempt.charge
+        if task:
+            get_token_ledger().record_usage(task, request["model"], usage, attribution)
+
+    def _start(self, provider: LLMProvider, request: Dict[str, Any], events: "queue.Queue",
+               charge: Tuple[Optional[str], Tuple[str, str]], hedge: bool = False) -> Optional[_Attempt]:
+        """Submit an attempt; a hedge goes to the hedge pool and is skipped (None) when it has no free thread"""
+        attempt = _Attempt(provider, charge)
+        if not hedge:
+            self._executor.submit(self._run, attempt, request, events)
+            return attempt
+        if not self._hedge_slots.acquire(blocking=False):
+            return None
+        future = self._hedge_executor.submit(self._run, attempt, request, events)
+        future.add_done_callback(lambda _: self._hedge_slots.release())
+        return attempt
+
+    def _astart(self, provider: LLMProvider, request: Dict[str, Any], events: "asyncio.Queue",
+                charge: Tuple[Optional[str], Tuple[str, str]]) -> _Attempt:
+        attempt = _Attempt(provider, charge)
+        attempt.task = asyncio.ensure_future(self._arun(attempt, request, events))
+        return attempt
+
+    def create(self, model: str, messages: List[Dict[str, str]], temperature: float = 0.7,
+               max_tokens: int = 1000, task: Optional[str] = None, **_: Any) -> SimpleNamespace:
+        """Chat completion with hedging and failover; raises if every provider fails or time runs out
+
+        ``task`` names the ledger task that tokens of cancelled attempts are charged to.
+        """
+        request = {"model": model, "messages": messages, "temperature": temperature, "max_tokens": max_tokens}
+        charge = (task, current_attribution())
+        events: "queue.Queue" = queue.Queue()
+        race = _Race(self, self._start(self.providers[0], request, events, charge))
+        self._count("requests")
+        try:
+            while not race.done:
+                try:
+                    event = events.get(timeout=race.wait_seconds())
+                except queue.Empty:
+                    provider = race.on_timeout()
+                    if provider is not None:
+                        race.hedge_started(self._start(provider, request, events, charge, hedge=True))
+                    continue
+                provider = race.on_event(*event)
+                if provider is not None:
+                    race.attempts.append(self._start(provider, request, events, charge))
+        except Exception:
+            self._count("errors")
+            raise race.error or RuntimeError("LLM request failed")
+        finally:
+            race.finish()
+        return race.response()
+
+    async def acreate(self, model: str, messages: List[Dict[str, str]], temperature: float = 0.7,
+                      max_tokens: int = 1000, task: Optional[str] = None,
+                      attribution: Optional[Tuple[str, str]] = None, **_: Any) -> SimpleNamespace:
+        """``create`` for coroutines: the same hedging and failover without blocking the event loop
+
+        A loop thread has no ledger attribution of its own, so callers pass theirs.
+        """
+        request = {"model": model, "messages": messages, "temperature": temperature, "max_tokens": max_tokens}
+        charge = (task, attribution or current_attribution())
+        events: "asyncio.Queue" = asyncio.Queue()
+        race = _Race(self, self._astart(self.providers[0], request, events, charge))
+        self._count("requests")
+        try:
+            while not race.done:
+                try:
+                    event = await asyncio.wait_for(events.get(), race.wait_seconds())
+                except asyncio.TimeoutError:
+                    provider = race.on_timeout()
+                    if provider is not None:
+                        race.hedge_started(self._astart(provider, request, events, charge))
+                    continue
+                provider = race.on_event(*event)
+                if provider is not None:
+                    race.attempts.append(self._astart(provider, request, events, charge))
+        except asyncio.CancelledError:
+            race.error = race.error or RuntimeError("LLM request cancelled")
+            raise
+        except Exception:
+            self._count("errors")
+            raise race.error or RuntimeError("LLM request failed")
+        finally:
+            race.finish()
+        return race.response()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hedging counts and per-provider time-to-first-token percentiles"""
+        with self._lock:
+            stats = dict(self.stats)
+        stats["hedge_delay_s"] = round(self.hedge_delay(), 4) if self.hedge else None
+        stats["ttft_s"] = {
+            name: {q: round(tracker.percentile(p) or 0.0, 4) for q, p in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99))}
+            for name, tracker in self.latency.items()
+        }
+        return stats
+
+
+def build_providers(names: List[str], groq_api_key: Optional[str] = None, openai_base_url: Optional[str] = None,
+                    openai_api_key: str = "", openai_model: Optional[str] = None) -> List[LLMProvider]:
+    """Create providers from names (``groq``, ``openai``, ``fake``), skipping ones without credentials"""
+    providers: List[LLMProvider] = []
+    for name in names:
+        if name == "groq" and groq_api_key:
+            providers.append(GroqProvider(groq_api_key))
+        elif name == "openai" and openai_base_url:
+            providers.append(OpenAICompatibleProvider(openai_base_url, openai_api_key, openai_model))
+        elif name == "fake":
+            providers.append(FakeProvider())
+    return providers
+
+
+_routers: Dict[Any, ProviderRouter] = {}
+_routers_lock = threading.Lock()
+
+
+def get_provider_router(names: Tuple[str, ...], hedge: bool = True, **credentials: Any) -> ProviderRouter:
+    """Get the shared router for a provider list and credentials"""
+    key = (names, hedge, tuple(sorted(credentials.items())))
+    if key not in _routers:
+        with _routers_lock:
+            if key not in _routers:
+                _routers[key] = ProviderRouter(build_providers(list(names), **credentials), hedge=hedge)
+    return _routers[key]
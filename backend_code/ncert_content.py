@@ -0,0 +1,561 @@
+"""
+NCERT Content Corpus for ScienceGPT
+Bundled textbook-style passages used by the local retrieval engine
+"""
+
+# Each passage is tagged with the subjects it belongs to (matching the names in
+# CurriculumData.grade_subjects), the curriculum topic and the grade range it is
+# written for. The retrieval engine partitions the corpus by (grade, subject).
+NCERT_PASSAGES = [
+    # ---- General Science / Environmental Studies (Grades 1-5) ----
+    {
+        "id": "gs-living-things",
+        "subjects": ["General Science", "Environmental Studies"],
+        "topic": "Living and Non-living Things",
+        "grades": (1, 5),
+        "title": "Living and non-living things",
+        "text": "Living things are things that are alive. They breathe, eat food, grow, move on their own and can have young ones. "
+                "Plants, animals and people are living things. Non-living things like a stone, a chair or a pencil do not breathe, eat or grow."
+    },
+    {
+        "id": "gs-plants-parts",
+        "subjects": ["General Science", "Environmental Studies"],
+        "topic": "Plants",
+        "grades": (1, 5),
+        "title": "Parts of a plant",
+        "text": "A plant has roots, a stem, leaves, flowers and fruits. The roots hold the plant in the soil and take in water. "
+                "The stem carries water to the leaves. Leaves make food for the plant, and flowers turn into fruits that hold seeds."
+    },
+    {
+        "id": "gs-photosynthesis-basic",
+        "subjects": ["General Science", "Environmental Studies"],
+        "topic": "Plants",
+        "grades": (3, 5),
+        "title": "How plants make their food",
+        "text": "Green plants make their own food in their leaves. Leaves use sunlight, water from the soil and carbon dioxide from the air to make food. "
+                "This process is called photosynthesis. The green colour of leaves comes from chlorophyll, which traps sunlight."
+    },
+    {
+        "id": "evs-plants-around-us",
+        "subjects": ["Environmental Studies"],
+        "topic": "Plants Around Us",
+        "grades": (1, 5),
+        "title": "Plants around us",
+        "text": "Plants around us can be trees, shrubs, herbs, climbers or creepers. Trees like mango and neem are big with thick woody stems. "
+                "Shrubs like rose are smaller and bushy, and herbs like mint are small with soft green stems."
+    },
+    {
+        "id": "gs-animals-food",
+        "subjects": ["General Science", "Environmental Studies"],
+        "topic": "Animals",
+        "grades": (1, 5),
+        "title": "What animals eat",
+        "text": "Animals that eat only plants are called herbivores, like the cow and the deer. Animals that eat other animals are called carnivores, like the lion and the tiger. "
+                "Animals that eat both plants and animals are called omnivores, like the crow and the bear."
+    },
+    {
+        "id": "evs-habitats",
+        "subjects": ["Environmental Studies", "General Science"],
+        "topic": "Animal Habitats",
+        "grades": (2, 5),
+        "title": "Animal habitats",
+        "text": "A habitat is the natural home of an animal where it finds food, water and shelter. Fish live in water, camels live in deserts and monkeys live in forests. "
+                "Animals have special body features that help them live in their habitat, like the hump of a camel that stores fat."
+    },
+    {
+        "id": "gs-human-body",
+        "subjects": ["General Science"],
+        "topic": "Human Body",
+        "grades": (1, 5),
+        "title": "Our body",
+        "text": "Our body has many parts that work together. The heart pumps blood, the lungs help us breathe and the brain controls everything we do. "
+                "An adult human skeleton has 206 bones which give our body shape and protect the organs inside."
+    },
+    {
+        "id": "gs-sense-organs",
+        "subjects": ["General Science"],
+        "topic": "Human Body",
+        "grades": (1, 4),
+        "title": "Sense organs",
+        "text": "We have five sense organs: eyes, ears, nose, tongue and skin. Eyes help us see, ears help us hear, the nose helps us smell, "
+                "the tongue helps us taste and the skin helps us feel touch, heat and cold."
+    },
+    {
+        "id": "gs-food-nutrition",
+        "subjects": ["General Science"],
+        "topic": "Food and Nutrition",
+        "grades": (2, 5),
+        "title": "A balanced diet",
+        "text": "A balanced diet has the right amount of carbohydrates, proteins, fats, vitamins, minerals, water and roughage. "
+                "Carbohydrates and fats give us energy, proteins help us grow and repair the body, and vitamins and minerals protect us from diseases."
+    },
+    {
+        "id": "gs-water-cycle",
+        "subjects": ["General Science", "Environmental Studies"],
+        "topic": "Water",
+        "grades": (3, 5),
+        "title": "The water cycle",
+        "text": "The water cycle is the continuous movement of water on Earth. The Sun heats water in rivers and seas so it evaporates into water vapour. "
+                "The vapour cools high in the sky and condenses into clouds, and the water falls back to the ground as rain."
+    },
+    {
+        "id": "evs-water-sources",
+        "subjects": ["Environmental Studies"],
+        "topic": "Water Sources",
+        "grades": (1, 5),
+        "title": "Sources of water",
+        "text": "We get water from rain, rivers, lakes, ponds, wells and the ground. Rain is the main source of water because it fills the rivers, lakes and wells. "
+                "We must save water by closing taps and reusing water wherever possible."
+    },
+    {
+        "id": "gs-air",
+        "subjects": ["General Science", "Environmental Studies"],
+        "topic": "Air",
+        "grades": (1, 5),
+        "title": "Air around us",
+        "text": "Air is all around us even though we cannot see it. Air is a mixture of gases, mostly nitrogen and oxygen, with a little carbon dioxide. "
+                "We need oxygen from the air to breathe, and moving air is called wind."
+    },
+    {
+        "id": "gs-weather",
+        "subjects": ["General Science", "Environmental Studies"],
+        "topic": "Weather",
+        "grades": (1, 5),
+        "title": "Weather",
+        "text": "Weather is the condition of the air around us on a particular day, such as hot, cold, rainy, cloudy or windy. "
+                "Weather can change from day to day, while climate is the usual weather of a place over many years."
+    },
+    {
+        "id": "gs-shadow",
+        "subjects": ["General Science"],
+        "topic": "Light and Shadow",
+        "grades": (2, 5),
+        "title": "How shadows are formed",
+        "text": "A shadow is formed when an opaque object blocks light. Light travels in straight lines, so it cannot bend around the object and a dark area forms behind it. "
+                "Shadows are long in the morning and evening and shortest at noon when the Sun is overhead."
+    },
+    {
+        "id": "gs-sound",
+        "subjects": ["General Science"],
+        "topic": "Sound",
+        "grades": (2, 5),
+        "title": "Sound",
+        "text": "Sound is produced when an object vibrates, which means it moves quickly to and fro. The vibrations travel through air to our ears. "
+                "Sound can also travel through water and solids like wood and metal."
+    },
+    {
+        "id": "gs-motion",
+        "subjects": ["General Science"],
+        "topic": "Motion",
+        "grades": (2, 5),
+        "title": "Things that move",
+        "text": "Motion is a change in the position of an object with time. A car moving on a road moves in a straight line, a fan moves round and round, "
+                "and a swing moves to and fro. A push or a pull is needed to start or stop motion."
+    },
+    {
+        "id": "gs-simple-machines",
+        "subjects": ["General Science"],
+        "topic": "Simple Machines",
+        "grades": (3, 5),
+        "title": "Simple machines",
+        "text": "Simple machines make our work easier. A lever, a pulley, a wheel and axle, an inclined plane, a wedge and a screw are simple machines. "
+                "A see-saw is a lever and a ramp is an inclined plane that helps us move heavy things up."
+    },
+    {
+        "id": "gs-materials",
+        "subjects": ["General Science"],
+        "topic": "Materials",
+        "grades": (2, 5),
+        "title": "Materials around us",
+        "text": "Objects are made of materials such as wood, metal, plastic, glass, paper and cloth. Some materials are hard and some are soft. "
+                "Materials through which we can see clearly, like glass, are called transparent."
+    },
+    {
+        "id": "gs-safety",
+        "subjects": ["General Science"],
+        "topic": "Safety",
+        "grades": (1, 5),
+        "title": "Safety first",
+        "text": "We should follow safety rules at home, at school and on the road. Never touch electric switches with wet hands and never play with fire. "
+                "Always cross the road at a zebra crossing and keep medicines away from small children."
+    },
+    {
+        "id": "evs-family",
+        "subjects": ["Environmental Studies"],
+        "topic": "Family and Community",
+        "grades": (1, 3),
+        "title": "Family and community",
+        "text": "A family is a group of people who live together and care for each other. Many families living together in an area make a community. "
+                "People in a community help each other, like the doctor, the teacher and the farmer."
+    },
+    {
+        "id": "evs-transport",
+        "subjects": ["Environmental Studies"],
+        "topic": "Travel and Transport",
+        "grades": (1, 5),
+        "title": "Means of transport",
+        "text": "Transport helps us travel from one place to another. Land transport includes buses, trains and bicycles, water transport includes boats and ships, "
+                "and air transport includes aeroplanes and helicopters."
+    },
+    {
+        "id": "evs-environment",
+        "subjects": ["Environmental Studies"],
+        "topic": "Our Environment",
+        "grades": (2, 5),
+        "title": "Our environment",
+        "text": "Our environment is everything around us, including air, water, soil, plants, animals and people. "
+                "Living and non-living things in the environment depend on each other, so we must keep it clean and green."
+    },
+    {
+        "id": "evs-pollution",
+        "subjects": ["Environmental Studies", "General Science"],
+        "topic": "Pollution",
+        "grades": (3, 5),
+        "title": "Pollution",
+        "text": "Pollution is the mixing of harmful things into air, water or soil. Smoke from vehicles and factories pollutes the air, "
+                "and garbage and chemicals pollute water. We can reduce pollution by planting trees, using less plastic and using public transport."
+    },
+    {
+        "id": "evs-natural-resources",
+        "subjects": ["Environmental Studies"],
+        "topic": "Natural Resources",
+        "grades": (3, 5),
+        "title": "Natural resources",
+        "text": "Natural resources are useful things we get from nature, such as air, water, soil, forests, minerals and sunlight. "
+                "Some resources like sunlight and wind never run out, while coal and petroleum can get used up, so we should use them carefully."
+    },
+    {
+        "id": "evs-climate",
+        "subjects": ["Environmental Studies"],
+        "topic": "Weather and Climate",
+        "grades": (3, 5),
+        "title": "Seasons in India",
+        "text": "India has summer, monsoon, autumn, winter and spring seasons. Seasons change because the Earth is tilted and moves around the Sun, "
+                "so different parts of the Earth get different amounts of sunlight during the year."
+    },
+    # ---- Science / Physics / Chemistry / Biology (Grades 6-8) ----
+    {
+        "id": "sci-matter",
+        "subjects": ["Science", "Chemistry", "Physics"],
+        "topic": "Matter",
+        "grades": (6, 8),
+        "title": "What is matter",
+        "text": "Matter is anything that has mass and occupies space. Matter exists in three common states: solid, liquid and gas. "
+                "Solids have a fixed shape and volume, liquids have a fixed volume but take the shape of their container, and gases have neither."
+    },
+    {
+        "id": "chem-states",
+        "subjects": ["Chemistry", "Science"],
+        "topic": "Matter and its States",
+        "grades": (6, 8),
+        "title": "Changes of state",
+        "text": "Matter can change from one state to another on heating or cooling. Melting changes a solid into a liquid, evaporation changes a liquid into a gas, "
+                "condensation changes a gas into a liquid and freezing changes a liquid into a solid. Water boils at 100 degrees Celsius at sea level."
+    },
+    {
+        "id": "chem-elements",
+        "subjects": ["Chemistry", "Science"],
+        "topic": "Elements and Compounds",
+        "grades": (6, 8),
+        "title": "Elements and compounds",
+        "text": "An element is a pure substance made of only one kind of atom, such as oxygen, iron or carbon. "
+                "A compound is formed when two or more elements combine chemically in a fixed ratio, such as water, which is made of hydrogen and oxygen."
+    },
+    {
+        "id": "chem-atom",
+        "subjects": ["Chemistry", "Physics", "Science"],
+        "topic": "Elements and Compounds",
+        "grades": (7, 8),
+        "title": "Structure of an atom",
+        "text": "An atom is the smallest particle of an element. It has a tiny central nucleus containing protons and neutrons, "
+                "with electrons moving around the nucleus. Protons carry a positive charge, electrons carry a negative charge and neutrons have no charge."
+    },
+    {
+        "id": "chem-acids-bases",
+        "subjects": ["Chemistry", "Science"],
+        "topic": "Acids and Bases",
+        "grades": (7, 8),
+        "title": "Acids and bases",
+        "text": "Acids are substances that taste sour and turn blue litmus red, like lemon juice and vinegar. Bases taste bitter, feel soapy and turn red litmus blue, like baking soda. "
+                "When an acid and a base react, they neutralise each other and form salt and water."
+    },
+    {
+        "id": "chem-metals",
+        "subjects": ["Chemistry", "Science"],
+        "topic": "Metals and Non-metals",
+        "grades": (7, 8),
+        "title": "Metals and non-metals",
+        "text": "Metals are usually shiny, hard, sonorous and good conductors of heat and electricity. They can be beaten into sheets (malleable) and drawn into wires (ductile). "
+                "Non-metals such as sulphur and carbon are usually dull, brittle and poor conductors."
+    },
+    {
+        "id": "chem-reactions",
+        "subjects": ["Chemistry", "Science"],
+        "topic": "Chemical Reactions",
+        "grades": (7, 8),
+        "title": "Physical and chemical changes",
+        "text": "A physical change alters only the shape, size or state of a substance and no new substance is formed, like melting ice. "
+                "A chemical change forms one or more new substances, like rusting of iron or burning of paper, and is usually not easily reversed."
+    },
+    {
+        "id": "chem-rusting",
+        "subjects": ["Chemistry", "Science"],
+        "topic": "Chemical Reactions",
+        "grades": (7, 8),
+        "title": "Rusting of iron",
+        "text": "Rusting is a chemical change in which iron reacts with oxygen and water to form a reddish-brown layer called rust, or iron oxide. "
+                "Rusting can be prevented by painting, oiling or galvanising iron with a coat of zinc."
+    },
+    {
+        "id": "chem-air-water",
+        "subjects": ["Chemistry", "Science"],
+        "topic": "Air and Water",
+        "grades": (6, 8),
+        "title": "Composition of air",
+        "text": "Air contains about 78 percent nitrogen, 21 percent oxygen and small amounts of argon, carbon dioxide, water vapour and dust. "
+                "Oxygen supports burning and breathing, while carbon dioxide is used by plants for photosynthesis."
+    },
+    {
+        "id": "chem-carbon",
+        "subjects": ["Chemistry"],
+        "topic": "Carbon Compounds",
+        "grades": (8, 8),
+        "title": "Carbon compounds",
+        "text": "Carbon forms a very large number of compounds because its atoms can join with each other in long chains and rings. "
+                "Fuels like coal, petroleum and natural gas are carbon compounds, and so are the sugars, fats and proteins in our food."
+    },
+    {
+        "id": "chem-periodic-table",
+        "subjects": ["Chemistry"],
+        "topic": "Periodic Table",
+        "grades": (8, 8),
+        "title": "The periodic table",
+        "text": "The periodic table arranges all known elements in order of increasing atomic number. Elements in the same vertical column, called a group, "
+                "have similar chemical properties. Dmitri Mendeleev created an early form of the periodic table in 1869."
+    },
+    {
+        "id": "phy-motion-forces",
+        "subjects": ["Physics", "Science"],
+        "topic": "Motion and Forces",
+        "grades": (6, 8),
+        "title": "Force and motion",
+        "text": "A force is a push or a pull on an object. A force can make a still object move, change the speed or direction of a moving object, or change its shape. "
+                "Speed is the distance covered by an object in unit time, and friction is a force that opposes motion between surfaces in contact."
+    },
+    {
+        "id": "phy-gravity",
+        "subjects": ["Physics", "Science"],
+        "topic": "Forces",
+        "grades": (6, 8),
+        "title": "Gravity",
+        "text": "Gravity is the force of attraction that the Earth exerts on every object. It pulls things towards the centre of the Earth, which is why a ball thrown up falls back down. "
+                "The weight of an object is the force with which gravity pulls it."
+    },
+    {
+        "id": "phy-light",
+        "subjects": ["Physics", "Science"],
+        "topic": "Light",
+        "grades": (6, 8),
+        "title": "Reflection of light",
+        "text": "Light travels in straight lines and bounces back when it falls on a shiny surface. This bouncing back is called reflection. "
+                "According to the laws of reflection, the angle of incidence is equal to the angle of reflection. White light is made of seven colours."
+    },
+    {
+        "id": "phy-sound",
+        "subjects": ["Physics", "Science"],
+        "topic": "Sound",
+        "grades": (6, 8),
+        "title": "Propagation of sound",
+        "text": "Sound is produced by vibrating objects and needs a medium such as air, water or a solid to travel. Sound cannot travel through a vacuum. "
+                "Frequency is the number of vibrations per second and is measured in hertz; humans can hear sounds from about 20 to 20,000 hertz."
+    },
+    {
+        "id": "phy-heat",
+        "subjects": ["Physics", "Science"],
+        "topic": "Heat",
+        "grades": (6, 8),
+        "title": "Heat and temperature",
+        "text": "Heat is a form of energy that flows from a hotter object to a colder object. Temperature tells us how hot or cold an object is and is measured with a thermometer. "
+                "Heat moves by conduction in solids, convection in liquids and gases, and radiation through empty space."
+    },
+    {
+        "id": "phy-electricity",
+        "subjects": ["Physics", "Science"],
+        "topic": "Electricity",
+        "grades": (6, 8),
+        "title": "Electric circuits",
+        "text": "Electric current is the flow of electric charge through a conductor. A closed path from a cell through wires and a bulb back to the cell is an electric circuit. "
+                "Materials that allow current to pass, like copper, are conductors, while rubber and plastic are insulators."
+    },
+    {
+        "id": "phy-magnetism",
+        "subjects": ["Physics", "Science"],
+        "topic": "Magnetism",
+        "grades": (6, 8),
+        "title": "Magnets",
+        "text": "A magnet attracts materials like iron, nickel and cobalt. Every magnet has a north pole and a south pole. "
+                "Like poles repel each other and unlike poles attract. A freely suspended magnet always points in the north-south direction, which is how a compass works."
+    },
+    {
+        "id": "phy-energy",
+        "subjects": ["Physics", "Science"],
+        "topic": "Energy",
+        "grades": (6, 8),
+        "title": "Forms of energy",
+        "text": "Energy is the ability to do work. It exists in many forms such as heat, light, sound, electrical, chemical and mechanical energy. "
+                "Energy can neither be created nor destroyed; it only changes from one form to another."
+    },
+    {
+        "id": "phy-waves",
+        "subjects": ["Physics"],
+        "topic": "Waves",
+        "grades": (7, 8),
+        "title": "Waves",
+        "text": "A wave is a disturbance that carries energy from one place to another without carrying matter. Sound waves need a medium, "
+                "while light waves can travel through a vacuum. The distance between two crests of a wave is its wavelength."
+    },
+    {
+        "id": "phy-matter-properties",
+        "subjects": ["Physics"],
+        "topic": "Matter and its Properties",
+        "grades": (6, 8),
+        "title": "Density",
+        "text": "Density is the mass of a substance per unit volume. Objects that are less dense than water, like wood and ice, float on water, "
+                "while objects that are denser than water, like a stone, sink."
+    },
+    {
+        "id": "sci-natural-phenomena",
+        "subjects": ["Science", "Physics"],
+        "topic": "Natural Phenomena",
+        "grades": (8, 8),
+        "title": "Lightning and earthquakes",
+        "text": "Lightning is an electric spark between clouds or between a cloud and the ground caused by the build-up of electric charges. "
+                "An earthquake is a sudden shaking of the Earth caused by the movement of plates deep inside the Earth's crust."
+    },
+    {
+        "id": "sci-natural-resources",
+        "subjects": ["Science", "Biology"],
+        "topic": "Natural Resources",
+        "grades": (6, 8),
+        "title": "Exhaustible and inexhaustible resources",
+        "text": "Inexhaustible natural resources like sunlight and air are present in unlimited quantity. Exhaustible resources like coal, petroleum and natural gas are limited "
+                "and can be used up. Coal and petroleum are fossil fuels formed from the remains of dead organisms over millions of years."
+    },
+    {
+        "id": "bio-cell",
+        "subjects": ["Biology", "Science"],
+        "topic": "Living Organisms",
+        "grades": (6, 8),
+        "title": "The cell",
+        "text": "The cell is the smallest unit of life and the basic building block of all living organisms. Some organisms, like bacteria and amoeba, are made of a single cell. "
+                "A cell has a cell membrane, cytoplasm and a nucleus; plant cells also have a cell wall and chloroplasts."
+    },
+    {
+        "id": "bio-living-world",
+        "subjects": ["Biology", "Science"],
+        "topic": "Living World",
+        "grades": (6, 7),
+        "title": "Characteristics of living organisms",
+        "text": "All living organisms need food, respire, excrete waste, respond to their surroundings, reproduce, grow and eventually die. "
+                "These characteristics help us tell living organisms apart from non-living things."
+    },
+    {
+        "id": "bio-photosynthesis",
+        "subjects": ["Biology", "Science"],
+        "topic": "Plant Life",
+        "grades": (6, 8),
+        "title": "Photosynthesis",
+        "text": "Photosynthesis is the process by which green plants make glucose from carbon dioxide and water using sunlight energy captured by chlorophyll. "
+                "Oxygen is released as a by-product. It takes place mainly in the leaves, through tiny pores called stomata that let gases in and out."
+    },
+    {
+        "id": "bio-animal-life",
+        "subjects": ["Biology", "Science"],
+        "topic": "Animal Life",
+        "grades": (6, 8),
+        "title": "Adaptation in animals",
+        "text": "Adaptation is the presence of special features that help an animal survive in its habitat. Polar bears have thick white fur to stay warm, "
+                "fish have gills to breathe in water and streamlined bodies to swim, and camels have long legs and can go without water for days."
+    },
+    {
+        "id": "bio-digestion",
+        "subjects": ["Biology", "Science"],
+        "topic": "Human Body Systems",
+        "grades": (7, 8),
+        "title": "The digestive system",
+        "text": "Digestion is the breaking down of complex food into simple substances that the body can absorb. It begins in the mouth with saliva, "
+                "continues in the stomach with acids and enzymes, and is completed in the small intestine, where digested food is absorbed into the blood."
+    },
+    {
+        "id": "bio-circulation",
+        "subjects": ["Biology", "Science"],
+        "topic": "Human Body Systems",
+        "grades": (7, 8),
+        "title": "The circulatory system",
+        "text": "The circulatory system is made of the heart, blood and blood vessels. The heart pumps blood through arteries to all parts of the body, "
+                "and veins carry blood back to the heart. Red blood cells carry oxygen using a pigment called haemoglobin."
+    },
+    {
+        "id": "bio-nutrition",
+        "subjects": ["Biology", "Science"],
+        "topic": "Nutrition",
+        "grades": (6, 8),
+        "title": "Modes of nutrition",
+        "text": "Nutrition is the process of taking in food and using it. Green plants are autotrophs because they make their own food. "
+                "Animals and fungi are heterotrophs because they depend on other organisms for food; fungi are saprotrophs that feed on dead and decaying matter."
+    },
+    {
+        "id": "bio-respiration",
+        "subjects": ["Biology", "Science"],
+        "topic": "Respiration",
+        "grades": (7, 8),
+        "title": "Respiration",
+        "text": "Respiration is the process in which food is broken down inside cells to release energy. Aerobic respiration uses oxygen and produces carbon dioxide and water, "
+                "while anaerobic respiration happens without oxygen. Breathing is only the taking in of oxygen and giving out of carbon dioxide."
+    },
+    {
+        "id": "bio-life-processes",
+        "subjects": ["Biology", "Science"],
+        "topic": "Life Processes",
+        "grades": (7, 8),
+        "title": "Life processes",
+        "text": "Life processes are the basic functions that keep an organism alive: nutrition, respiration, transportation, excretion, growth and reproduction. "
+                "Excretion is the removal of harmful waste from the body; in humans the kidneys filter waste from the blood to make urine."
+    },
+    {
+        "id": "bio-heredity",
+        "subjects": ["Biology"],
+        "topic": "Heredity",
+        "grades": (8, 8),
+        "title": "Heredity",
+        "text": "Heredity is the passing of characters, or traits, from parents to their offspring. Traits such as eye colour are carried by genes, "
+                "which are found on chromosomes in the nucleus of every cell. Gregor Mendel is called the father of genetics."
+    },
+    {
+        "id": "bio-evolution",
+        "subjects": ["Biology"],
+        "topic": "Evolution",
+        "grades": (8, 8),
+        "title": "Evolution",
+        "text": "Evolution is the gradual change in living organisms over many generations. Charles Darwin explained evolution through natural selection, "
+                "in which organisms with features better suited to their environment survive and pass those features on."
+    },
+    {
+        "id": "bio-ecosystem",
+        "subjects": ["Biology", "Science"],
+        "topic": "Ecosystem",
+        "grades": (6, 8),
+        "title": "Ecosystem and food chains",
+        "text": "An ecosystem is a community of living organisms together with the non-living parts of their environment, such as air, water and soil. "
+                "A food chain shows who eats whom, for example grass is eaten by a deer which is eaten by a tiger. Producers, consumers and decomposers all have a role."
+    },
+    {
+        "id": "bio-biodiversity",
+        "subjects": ["Biology"],
+        "topic": "Biodiversity",
+        "grades": (8, 8),
+        "title": "Biodiversity and conservation",
+        "text": "Biodiversity is the variety of plants, animals and micro-organisms found in an area. Deforestation and pollution reduce biodiversity. "
+                "National parks, wildlife sanctuaries and biosphere reserves are protected areas that help conserve plants and animals."
+    },
+]
@@ -0,0 +1,198 @@
+"""
+Speculative Prefetch for ScienceGPT
+Precomputes answers for displayed suggested questions on a background worker pool
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from backend_code.answer_cache import AnswerKey, get_answer_cache, make_answer_key
+
+
+class SpeculativePrefetcher:
+    """Runs low-priority answer generation for questions a student is likely to click
+
+    Prefetching is bounded by an hourly budget and pauses while foreground requests
+    are in flight, so speculative work never competes with real questions. Unclicked
+    prefetches are forgotten once their cached answer expires, and at most
+    ``max_prefetched`` are tracked.
+    """
+
+    def __init__(self, max_workers: int = 2, max_per_hour: int = 200,
+                 max_foreground_inflight: int = 4, enabled: bool = True, max_prefetched: int = 1000):
+        """Initialize the worker pool and budget"""
+        self.enabled = enabled
+        self.max_per_hour = max_per_hour
+        self.max_prefetched = max_prefetched
+        self.max_foreground_inflight = max_foreground_inflight
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._lock = threading.Lock()
+        self._inflight: Dict[AnswerKey, Future] = {}
+        # key -> (tokens, finished at), oldest first
+        self._prefetched: Dict[AnswerKey, Tuple[int, float]] = OrderedDict()
+        self._window_start = time.time()
+        self._window_count = 0
+        self._foreground_inflight = 0
+        self.stats = {
+            "scheduled": 0,
+            "completed": 0,
+            "failed": 0,
+            "skipped_budget": 0,
+            "skipped_busy": 0,
+            "hits": 0,
+            "waited_hits": 0,
+            "misses": 0,
+            "prefetch_tokens": 0,
+            "used_tokens": 0,
+            "expired": 0
+        }
+
+    def set_budget(self, max_per_hour: Optional[int] = None, enabled: Optional[bool] = None):
+        """Adjust the prefetch budget at runtime"""
+        with self._lock:
+            if max_per_hour is not None:
+                self.max_per_hour = max_per_hour
+            if enabled is not None:
+                self.enabled = enabled
+
+    def _take_budget(self) -> bool:
+        """Consume one unit of the hourly budget if available (caller holds the lock)"""
+        now = time.time()
+        if now - self._window_start >= 3600:
+            self._window_start = now
+            self._window_count = 0
+        if self._window_count >= self.max_per_hour:
+            return False
+        self._window_count += 1
+        return True
+
+    def _forget_stale(self, now: float):
+        """Drop prefetches whose cached answer has expired, then the oldest beyond the cap (caller holds the lock)"""
+        ttl = get_answer_cache().ttl_seconds
+        while self._prefetched:
+            key, (_, finished_at) = next(iter(self._prefetched.items()))
+            if now - finished_at < ttl and len(self._prefetched) <= self.max_prefetched:
+                break
+            del self._prefetched[key]
+            self.stats["expired"] += 1
+
+    def prefetch(self, questions: List[str], grade: int, subject: str, language: str, topic: str,
+                 answer_fn: Callable[[str, int, str, str, str], Dict[str, Any]]):
+        """Schedule background answers for questions that are not cached or in flight"""
+        if not self.enabled:
+            return
+
+        cache = get_answer_cache()
+        for question in questions:
+            key = make_answer_key(question, grade, subject, language, topic)
+            with self._lock:
+                if key in self._inflight or cache.contains(key):
+                    continue
+                if self._foreground_inflight >= self.max_foreground_inflight:
+                    self.stats["skipped_busy"] += 1
+                    continue
+                if not self._take_budget():
+                    self.stats["skipped_budget"] += 1
+                    continue
+                future = self._executor.submit(self._run, key, question, grade, subject, language, topic, answer_fn)
+                self._inflight[key] = future
+                self.stats["scheduled"] += 1
+
+    def _run(self, key: AnswerKey, question: str, grade: int, subject: str, language: str, topic: str,
+             answer_fn: Callable[[str, int, str, str, str], Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Worker body: generate, cache and account for one speculative answer"""
+        try:
+            answer = answer_fn(question, grade, subject, language, topic)
+            get_answer_cache().put(key, answer)
+            with self._lock:
+                self.stats["completed"] += 1
+                self.stats["prefetch_tokens"] += answer.get("tokens", 0)
+                now = time.time()
+                self._prefetched.pop(key, None)
+                self._prefetched[key] = (answer.get("tokens", 0), now)
+                self._forget_stale(now)
+            return answer
+        except Exception:
+            with self._lock:
+                self.stats["failed"] += 1
+            return None
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def lookup(self, key: AnswerKey, wait_seconds: float = 30.0) -> Optional[Dict[str, Any]]:
+        """Get a cached answer, waiting briefly for an in-flight prefetch of the same key"""
+        with self._lock:
+            future = self._inflight.get(key)
+
+        waited = False
+        if future is not None:
+            try:
+                future.result(timeout=wait_seconds)
+                waited = True
+            except Exception:
+                pass
+
+        answer = get_answer_cache().get(key)
+        with self._lock:
+            entry = self._prefetched.pop(key, None)
+            tokens = entry[0] if entry is not None else None
+            if answer is not None and tokens is not None:
+                self.stats["waited_hits" if waited else "hits"] += 1
+                self.stats["used_tokens"] += tokens
+            elif answer is None:
+                self.stats["misses"] += 1
+        return answer
+
+    def foreground_started(self):
+        """Mark a foreground (student-initiated) request as in flight"""
+        with self._lock:
+            self._foreground_inflight += 1
+
+    def foreground_finished(self):
+        """Mark a foreground request as finished"""
+        with self._lock:
+            self._foreground_inflight = max(0, self._foreground_inflight - 1)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get prefetch hit rate and token efficiency"""
+        with self._lock:
+            completed = self.stats["completed"]
+            used = self.stats["hits"] + self.stats["waited_hits"]
+            self._forget_stale(time.time())
+            return {
+                **self.stats,
+                "inflight": len(self._inflight),
+                "prefetched_unused": len(self._prefetched),
+                "budget_used_this_hour": self._window_count,
+                "max_per_hour": self.max_per_hour,
+                "enabled": self.enabled,
+                "hit_rate": round(used / completed, 4) if completed else 0.0,
+                "token_efficiency": (
+                    round(self.stats["used_tokens"] / self.stats["prefetch_tokens"], 4)
+                    if self.stats["prefetch_tokens"] else 0.0
+                )
+            }
+
+
+_prefetcher: Optional[SpeculativePrefetcher] = None
+_prefetcher_lock = threading.Lock()
+
+
+def get_prefetcher() -> SpeculativePrefetcher:
+    """Get the process-wide prefetcher, configured from the environment"""
+    global _prefetcher
+    if _prefetcher is None:
+        with _prefetcher_lock:
+            if _prefetcher is None:
+                _prefetcher = SpeculativePrefetcher(
+                    max_workers=int(os.getenv("PREFETCH_WORKERS", "2")),
+                    max_per_hour=int(os.getenv("PREFETCH_MAX_PER_HOUR", "200")),
+                    enabled=os.getenv("PREFETCH_ENABLED", "1") != "0",
+                    max_prefetched=int(os.getenv("PREFETCH_MAX_TRACKED", "1000"))
+                )
+    return _prefetcher
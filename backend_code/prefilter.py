@@ -0,0 +1,227 @@
+"""
+Chat Pre-filter for ScienceGPT
+Resolves greetings, acknowledgements, duplicates and off-topic input locally
+"""
+
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+from backend_code.answer_cache import normalize_question
+from backend_code.curriculum_data import CurriculumData
+from backend_code.ncert_content import NCERT_PASSAGES
+from backend_code.retrieval_engine import tokenize
+
+GREETINGS = {
+    "hi", "hii", "hiii", "hello", "helo", "hey", "heya", "yo", "namaste", "namaskar", "hola",
+    "good morning", "good afternoon", "good evening", "hi there", "hello there", "hey there",
+    "नमस्ते", "नमस्कार", "हेलो", "हाय"
+}
+
+ACKNOWLEDGEMENTS = {
+    "ok", "okay", "k", "kk", "okk", "fine", "cool", "nice", "great", "good", "awesome", "wow",
+    "thanks", "thank you", "thankyou", "thx", "ty", "got it", "i see", "understood", "yes", "no",
+    "yeah", "yep", "nope", "hmm", "hmmm", "alright", "sure", "bye", "goodbye", "see you",
+    "धन्यवाद", "शुक्रिया", "ठीक है", "हाँ", "नहीं"
+}
+
+ACKNOWLEDGEMENT_OPENERS = {"ok", "okay", "thanks", "thank", "cool", "nice", "great", "bye"}
+
+# A short message opening with a greeting or acknowledgement is still a question if it has one of these
+QUESTION_WORDS = {
+    "what", "why", "how", "when", "where", "which", "who", "whom", "whose", "is", "are", "does", "do",
+    "did", "can", "could", "will", "would", "should", "explain", "define", "describe", "tell",
+    "क्या", "क्यों", "कैसे", "कब", "कहाँ", "कौन", "बताओ", "समझाओ"
+}
+
+# Counter-examples for the off-topic model; science examples come from the bundled NCERT text
+OFF_TOPIC_EXAMPLES = [
+    "who won the cricket match yesterday", "which movie should I watch tonight",
+    "tell me a joke", "what is your favourite song", "play a game with me",
+    "who is the best actor in bollywood", "what is the score of india vs australia",
+    "write my english essay on my favourite festival", "how do I get more followers on instagram",
+    "which mobile phone should I buy", "what is the price of iphone", "recommend a web series",
+    "who is the captain of the indian cricket team", "how to win in free fire", "best pubg tips",
+    "what should I eat for dinner tonight", "tell me a story about a prince", "sing a song for me",
+    "what is your name", "are you a boy or a girl", "do you love me", "how old are you",
+    "who made you", "i am bored", "what day is it today", "translate my hindi homework letter",
+    "solve this maths sum 45 times 12", "what is the capital of france", "who was the first prime minister",
+    "write a poem about my mother", "how to make money online", "which is the best youtube channel",
+    "tell me about the new marvel film", "how to hack a game", "what is the latest news",
+    "when is the next holiday", "how do I talk to my crush", "what time is the ipl final",
+    "suggest a birthday gift for my friend", "who is the richest person in the world",
+    "can you do my history homework", "what are the rules of kabaddi", "which car is the fastest brand",
+    "who is your favourite cricketer", "how to download songs", "let us chat about football",
+    "what is the plot of harry potter", "recommend a video game", "write a letter to my principal"
+]
+
+# Science questions about everyday things the off-topic examples also mention (games, phones, sport),
+# always in the science training set so those words alone do not make a question off-topic
+SCIENCE_EXAMPLES = [
+    "how does a video game console work", "how does a mobile phone send a call",
+    "why does a cricket ball swing in the air", "how does a car engine work",
+    "what makes a football curve when it is kicked", "how does a phone screen detect touch",
+    "how does music come out of a speaker", "why does a movie screen look bright in a dark hall",
+    "how does a computer store a game", "how does wifi send data through the air",
+    "why does my phone get hot when I play games", "how does a camera take a photo"
+]
+
+EMPTY_PATTERN = re.compile(r"^[\W_]*$", re.UNICODE)
+LATIN_PATTERN = re.compile(r"[a-zA-Z]")
+# Keeps Indic scripts intact: their vowel signs are not \w and would otherwise be stripped
+PUNCTUATION_PATTERN = re.compile(r"[^\w\s\u0900-\u0D7F]")
+
+REPLIES = {
+    "empty": "🤔 I didn't catch a question there. Try asking something like *\"How do plants make their food?\"*",
+    "greeting": "👋 Hello! I'm ScienceGPT. Ask me anything about {subject} — for example, pick one of the suggested questions above!",
+    "acknowledgement": "😊 Glad to help! When you're ready, ask your next {subject} question.",
+    "duplicate": "🔁 You just asked that one — the answer is right above. Try a follow-up question to dig deeper!",
+    "off_topic": "🔬 That sounds interesting, but I'm your science buddy! Try asking me something about {subject}, like one of the suggested questions above."
+}
+
+
+class NaiveBayes:
+    """Tiny multinomial naive Bayes over the retrieval tokenizer's stems"""
+
+    def __init__(self, documents: Dict[str, List[str]], alpha: float = 1.0):
+        """Train on ``{label: [text, ...]}``"""
+        self.alpha = alpha
+        self.counts = {label: Counter(t for text in texts for t in tokenize(text)) for label, texts in documents.items()}
+        self.totals = {label: sum(c.values()) for label, c in self.counts.items()}
+        self.vocabulary = set().union(*self.counts.values())
+        total_docs = sum(len(texts) for texts in documents.values())
+        self.priors = {label: math.log(len(texts) / total_docs) for label, texts in documents.items()}
+
+    def log_odds(self, text: str, label: str, other: str) -> Optional[float]:
+        """Log P(label | text) - log P(other | text), or None if no token is known"""
+        tokens = [t for t in tokenize(text) if t in self.vocabulary]
+        if not tokens:
+            return None
+        size = len(self.vocabulary)
+        score = self.priors[label] - self.priors[other]
+        for token in tokens:
+            score += math.log((self.counts[label][token] + self.alpha) / (self.totals[label] + self.alpha * size))
+            score -= math.log((self.counts[other][token] + self.alpha) / (self.totals[other] + self.alpha * size))
+        return score
+
+
+def _science_documents() -> List[str]:
+    """NCERT passages split into sentences, plus curriculum subject and topic names"""
+    documents = []
+    for passage in NCERT_PASSAGES:
+        documents.append(passage["title"])
+        documents.extend(s for s in re.split(r"(?<=[.!?])\s+", passage["text"]) if s)
+    curriculum = CurriculumData()
+    for subject, topics in curriculum.topics.items():
+        documents.append(subject)
+        documents.extend(topics)
+    return documents
+
+
+class PreFilter:
+    """Classifies chat input before it reaches the LLM
+
+    Rules catch empty input, greetings, acknowledgements and repeats of the previous
+    question; a naive Bayes model trained on the bundled NCERT text flags clearly
+    off-topic English questions. Anything else is passed through as ``science``.
+    """
+
+    def __init__(self, off_topic_threshold: float = 2.0, duplicate_window_seconds: float = 120.0):
+        """Train the off-topic model and set thresholds"""
+        science = _science_documents()
+        # Balance the classes so the prior does not decide on its own
+        self.model = NaiveBayes({
+            "science": SCIENCE_EXAMPLES + random.Random(0).sample(science, min(len(science), len(OFF_TOPIC_EXAMPLES) * 4)),
+            "off_topic": OFF_TOPIC_EXAMPLES
+        })
+        self.off_topic_threshold = off_topic_threshold
+        self.duplicate_window_seconds = duplicate_window_seconds
+        self._lock = threading.Lock()
+        self._daily: Dict[str, Dict[str, int]] = {}
+        self.stats = {"classified": 0, "total_us": 0.0, "max_us": 0.0}
+
+    def classify(self, text: str, previous_question: Optional[str] = None,
+                 previous_at: Optional[float] = None) -> str:
+        """Label input as empty, greeting, acknowledgement, duplicate, off_topic or science"""
+        stripped = text.strip()
+        if EMPTY_PATTERN.match(stripped):
+            return "empty"
+
+        normalized = normalize_question(stripped)
+        phrase = PUNCTUATION_PATTERN.sub("", normalized).strip()
+        words = phrase.split()
+        # Short messages that open with a greeting ("hi there bot") count as greetings too,
+        # unless they ask something ("great, how do magnets work?")
+        short = 0 < len(words) <= 3 and "?" not in stripped and not QUESTION_WORDS.intersection(words)
+        if phrase in GREETINGS or (short and (words[0] in GREETINGS or " ".join(words[:2]) in GREETINGS)):
+            return "greeting"
+        if phrase in ACKNOWLEDGEMENTS or (short and words[0] in ACKNOWLEDGEMENT_OPENERS):
+            return "acknowledgement"
+
+        if (previous_question is not None and normalize_question(previous_question) == normalized
+                and (previous_at is None or time.time() - previous_at <= self.duplicate_window_seconds)):
+            return "duplicate"
+
+        # The model only knows English; other scripts always go to the LLM
+        if LATIN_PATTERN.search(stripped):
+            odds = self.model.log_odds(stripped, "off_topic", "science")
+            if odds is not None and odds > self.off_topic_threshold:
+                return "off_topic"
+        return "science"
+
+    def check(self, text: str, subject: str, previous_question: Optional[str] = None,
+              previous_at: Optional[float] = None) -> Dict[str, Any]:
+        """Classify input and, unless it is a science question, return a local reply
+
+        Returns ``{"label", "reply"}``; ``reply`` is None when the LLM should answer.
+        """
+        start = time.perf_counter()
+        label = self.classify(text, previous_question, previous_at)
+        elapsed_us = (time.perf_counter() - start) * 1e6
+
+        with self._lock:
+            self.stats["classified"] += 1
+            self.stats["total_us"] += elapsed_us
+            self.stats["max_us"] = max(self.stats["max_us"], elapsed_us)
+            if label != "science":
+                today = date.today().isoformat()
+                if today not in self._daily:
+                    self._daily[today] = {}
+                    for old in sorted(self._daily)[:-30]:
+                        del self._daily[old]
+                self._daily[today][label] = self._daily[today].get(label, 0) + 1
+
+        reply = None if label == "science" else REPLIES[label].format(subject=subject)
+        return {"label": label, "reply": reply}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get LLM calls avoided per day (by label) and classifier latency"""
+        with self._lock:
+            classified = self.stats["classified"]
+            return {
+                "classified": classified,
+                "avg_us": round(self.stats["total_us"] / classified, 2) if classified else 0.0,
+                "max_us": round(self.stats["max_us"], 2),
+                "avoided_per_day": {
+                    day: {**labels, "total": sum(labels.values())} for day, labels in self._daily.items()
+                }
+            }
+
+
+_prefilter: Optional[PreFilter] = None
+_prefilter_lock = threading.Lock()
+
+
+def get_prefilter() -> PreFilter:
+    """Get the process-wide pre-filter"""
+    global _prefilter
+    if _prefilter is None:
+        with _prefilter_lock:
+            if _prefilter is None:
+                _prefilter = PreFilter()
+    return _prefilter
@@ -0,0 +1,302 @@
+"""
+Rerun Profiling for ScienceGPT
+Per-session or sampled profiles of single Streamlit reruns as collapsed stacks
+"""
+
+import cProfile
+import hashlib
+import io
+import json
+import os
+import pstats
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+DEFAULT_PROFILE_DIR = os.path.join(tempfile.gettempdir(), "sciencegpt_profiles")
+
+PROFILE_SUFFIXES = (".collapsed", ".prof", ".json")
+
+# The output directory is pruned on the first profile written and every this many after
+PRUNE_EVERY = 20
+
+# Deepest call chain written when rebuilding stacks from a cProfile call graph
+MAX_PSTATS_DEPTH = 64
+
+# Frames matching these are broken out in each profile's component summary
+COMPONENT_PATTERN = re.compile(r"(draw_\w+|LLMHandler\.\w+|GamificationManager\.\w+|StudentProgress\.\w+)$")
+
+
+# Classes to qualify method names with where the interpreter cannot (pstats, Python < 3.11)
+CLASS_FILES = {
+    "llm_handler.py": "LLMHandler",
+    "gamification.py": "GamificationManager",
+    "student_progress.py": "StudentProgress"
+}
+
+
+def _qualify(filename: str, name: str) -> str:
+    owner = CLASS_FILES.get(os.path.basename(filename))
+    return f"{owner}.{name}" if owner and "." not in name and not name.startswith("<") else name
+
+
+def _frame_name(frame: Any) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", "?")
+    qualname = getattr(code, "co_qualname", None) or _qualify(code.co_filename, code.co_name)
+    return f"{module}:{qualname}"
+
+
+class StackSampler:
+    """Samples one thread's Python stack at a fixed wall-clock interval
+
+    Collects stacks as root-first ``frame;frame;frame`` strings with counts, the
+    collapsed format flamegraph.pl and speedscope read directly.
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rerun-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                names.append(_frame_name(frame))
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+
+class RerunProfiler:
+    """Profiles whole reruns on request or for a small random sample of them
+
+    ``mode`` is ``"sample"`` (wall-clock stack sampling, written as ``.collapsed``)
+    or ``"cprofile"`` (deterministic, written as a ``.prof`` pstats file plus a
+    ``.collapsed`` file rebuilt from its call graph). When a rerun is not profiled
+    the only cost is one random number. Only the newest ``max_profiles`` profiles
+    younger than ``max_age_days`` are kept.
+    """
+
+    def __init__(self, output_dir: str = DEFAULT_PROFILE_DIR, sample_rate: float = 0.0, mode: str = "sample",
+                 interval: float = 0.005, allow_requests: bool = False, max_profiles: int = 200,
+                 max_age_days: float = 7.0):
+        """Initialize where profiles go and how often reruns are sampled"""
+        self.output_dir = output_dir
+        self.allow_requests = allow_requests
+        self.max_profiles = max_profiles
+        self.max_age_days = max_age_days
+        self.sample_rate = sample_rate
+        self.mode = mode
+        self.interval = interval
+        self._lock = threading.Lock()
+        self.stats = {"profiled": 0, "requested": 0, "sampled": 0, "pruned": 0, "last_file": None}
+
+    def should_profile(self, requested: bool = False) -> bool:
+        """Profile if the session asked for it, otherwise with probability ``sample_rate``"""
+        return (requested and self.allow_requests) or (self.sample_rate > 0 and random.random() < self.sample_rate)
+
+    @contextmanager
+    def rerun(self, session_id: str, requested: bool = False) -> Iterator[None]:
+        """Profile the enclosed block if requested or sampled
+
+        The profile is written even if the block exits through ``st.rerun()`` or
+        ``st.stop()``, which Streamlit implements as exceptions.
+        """
+        if not self.should_profile(requested):
+            yield
+            return
+
+        start = time.perf_counter()
+        profiler: Optional[cProfile.Profile] = None
+        sampler: Optional[StackSampler] = None
+        if self.mode == "cprofile":
+            profiler = cProfile.Profile()
+            profiler.enable()
+        else:
+            sampler = StackSampler(threading.get_ident(), self.interval)
+            sampler.start()
+        requested = requested and self.allow_requests
+        try:
+            yield
+        finally:
+            wall_ms = (time.perf_counter() - start) * 1000
+            if profiler is not None:
+                profiler.disable()
+            if sampler is not None:
+                sampler.stop()
+            try:
+                if self._write(session_id, requested, wall_ms, profiler, sampler) % PRUNE_EVERY == 1:
+                    self._prune()
+            except OSError:
+                pass
+
+    def _write(self, session_id: str, requested: bool, wall_ms: float, profiler: Optional[cProfile.Profile],
+               sampler: Optional[StackSampler]) -> int:
+        """Write the profile and a JSON summary with time per app component; returns the profile count"""
+        os.makedirs(self.output_dir, mode=0o700, exist_ok=True)
+        # The session id restores a session from ?sid=, so profiles only carry a hash of it
+        session = hashlib.blake2b((session_id or "anon").encode("utf-8"), digest_size=8).hexdigest()
+        base = os.path.join(self.output_dir, f"{datetime.now():%Y%m%d-%H%M%S-%f}_{session[:8]}")
+        summary: Dict[str, Any] = {
+            "session": session,
+            "requested": requested,
+            "mode": self.mode,
+            "wall_ms": round(wall_ms, 2)
+        }
+
+        if sampler is not None:
+            path = base + ".collapsed"
+            self._write_collapsed(path, sampler.stacks)
+            summary["samples"] = sum(sampler.stacks.values())
+            summary["components_ms"] = self._components_from_samples(sampler.stacks)
+        else:
+            path = base + ".prof"
+            profiler.dump_stats(path)
+            self._write_collapsed(base + ".collapsed", self._stacks_from_pstats(profiler))
+            summary["collapsed_unit"] = "us"
+            summary["components_ms"] = self._components_from_pstats(profiler)
+
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+
+        with self._lock:
+            self.stats["profiled"] += 1
+            self.stats["requested" if requested else "sampled"] += 1
+            self.stats["last_file"] = path
+            return self.stats["profiled"]
+
+    @staticmethod
+    def _write_collapsed(path: str, stacks: Counter):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def _prune(self):
+        """Delete profiles beyond the newest ``max_profiles`` and those older than ``max_age_days``"""
+        names = [name for name in os.listdir(self.output_dir) if name.endswith(PROFILE_SUFFIXES)]
+        # Names start with a timestamp, so sorting them sorts the profiles by age
+        bases = sorted({name.rsplit(".", 1)[0] for name in names})
+        expired = set(bases[:-self.max_profiles]) if self.max_profiles > 0 else set()
+        cutoff = time.time() - self.max_age_days * 86400
+        removed = 0
+        for name in names:
+            path = os.path.join(self.output_dir, name)
+            try:
+                if name.rsplit(".", 1)[0] in expired or os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                continue
+        if removed:
+            with self._lock:
+                self.stats["pruned"] += removed
+
+    @staticmethod
+    def _stacks_from_pstats(profiler: cProfile.Profile) -> Counter:
+        """Collapsed stacks (in microseconds) rebuilt from a deterministic profile's call graph
+
+        cProfile keeps only caller/callee edges, so each function's own time is split
+        across its call paths in proportion to the time each caller spent in it. Cycles
+        are cut where a function reappears on its own path.
+        """
+        stats = pstats.Stats(profiler, stream=io.StringIO()).stats
+        names = {func: f"{os.path.basename(func[0]).rsplit('.', 1)[0]}:{_qualify(func[0], func[2])}"
+                 for func in stats}
+        children: Dict[Any, List[Any]] = {}
+        for func, (_, _, _, _, callers) in stats.items():
+            for caller, (_, _, _, cumulative) in callers.items():
+                children.setdefault(caller, []).append((func, cumulative))
+
+        stacks: Counter = Counter()
+
+        def walk(func: Any, share: float, path: List[Any]):
+            _, _, own, cumulative, _ = stats[func]
+            fraction = min(1.0, share / cumulative) if cumulative else 0.0
+            path = path + [func]
+            own_us = int(own * fraction * 1e6)
+            if own_us:
+                stacks[";".join(names[f] for f in path)] += own_us
+            if len(path) >= MAX_PSTATS_DEPTH:
+                return
+            for child, child_cumulative in children.get(func, []):
+                if child not in path and child_cumulative * fraction * 1e6 >= 1:
+                    walk(child, child_cumulative * fraction, path)
+
+        for func, (_, _, _, cumulative, callers) in stats.items():
+            if not callers:
+                walk(func, cumulative, [])
+        return stacks
+
+    def _components_from_samples(self, stacks: Counter) -> Dict[str, float]:
+        """Inclusive time per component, counting each sample once per component"""
+        totals: Counter = Counter()
+        for stack, count in stacks.items():
+            seen = set()
+            for frame in stack.split(";"):
+                match = COMPONENT_PATTERN.search(frame)
+                if match and match.group(1) not in seen:
+                    seen.add(match.group(1))
+                    totals[match.group(1)] += count
+        return {name: round(count * self.interval * 1000, 2) for name, count in totals.most_common()}
+
+    @staticmethod
+    def _components_from_pstats(profiler: cProfile.Profile) -> Dict[str, float]:
+        """Cumulative time per component function from a deterministic profile"""
+        stats = pstats.Stats(profiler, stream=io.StringIO())
+        totals: Dict[str, float] = {}
+        for (filename, _, name), (_, _, _, cumulative, _) in stats.stats.items():
+            match = COMPONENT_PATTERN.search(_qualify(filename, name))
+            if match:
+                totals[match.group(1)] = max(totals.get(match.group(1), 0.0), cumulative * 1000)
+        return {name: round(ms, 2) for name, ms in sorted(totals.items(), key=lambda kv: kv[1], reverse=True)}
+
+    def list_profiles(self, limit: int = 20) -> List[str]:
+        """Most recent profile summaries in the output directory"""
+        if not os.path.isdir(self.output_dir):
+            return []
+        files = sorted(f for f in os.listdir(self.output_dir) if f.endswith(".json"))
+        return [os.path.join(self.output_dir, f) for f in files[-limit:]]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.stats, "sample_rate": self.sample_rate, "mode": self.mode}
+
+
+_profiler: Optional[RerunProfiler] = None
+_profiler_lock = threading.Lock()
+
+
+def get_rerun_profiler() -> RerunProfiler:
+    """Get the process-wide rerun profiler, configured from the environment"""
+    global _profiler
+    if _profiler is None:
+        with _profiler_lock:
+            if _profiler is None:
+                _profiler = RerunProfiler(
+                    output_dir=os.getenv("SCIENCEGPT_PROFILE_DIR", DEFAULT_PROFILE_DIR),
+                    sample_rate=float(os.getenv("PROFILE_SAMPLE_RATE", "0")),
+                    mode=os.getenv("PROFILE_MODE", "sample"),
+                    allow_requests=os.getenv("PROFILE_ALLOW_REQUESTS", "0") == "1",
+                    max_profiles=int(os.getenv("PROFILE_MAX_FILES", "200")),
+                    max_age_days=float(os.getenv("PROFILE_MAX_AGE_DAYS", "7"))
+                )
+    return _profiler
@@ -0,0 +1,313 @@
+"""
+Quiz Bank for ScienceGPT
+Pre-generated quiz items per curriculum topic, indexed for instant selection and local grading
+"""
+
+import json
+import os
+import random
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+ITEM_KINDS = ["mcq", "true_false", "numeric"]
+
+DIFFICULTIES = {1: "Easy", 2: "Medium", 3: "Hard"}
+
+DEFAULT_QUIZ_PATH = os.path.join(tempfile.gettempdir(), "sciencegpt_quiz_bank.sqlite3")
+
+# (grade, subject, topic, difficulty); topic "All Topics" indexes every item of the subject
+IndexKey = Tuple[int, str, str, int]
+
+JSON_ARRAY_PATTERN = re.compile(r"\[.*\]", re.DOTALL)
+
+
+class QuizItem:
+    """One quiz question with everything needed to grade it locally"""
+
+    __slots__ = ("id", "grade", "subject", "topic", "difficulty", "kind", "question", "options", "answer",
+                 "tolerance", "explanation")
+
+    def __init__(self, grade: int, subject: str, topic: str, difficulty: int, kind: str, question: str,
+                 answer: Any, options: Optional[List[str]] = None, tolerance: float = 0.0,
+                 explanation: str = "", item_id: Optional[int] = None):
+        self.id = item_id
+        self.grade = grade
+        self.subject = subject
+        self.topic = topic
+        self.difficulty = difficulty
+        self.kind = kind
+        self.question = question
+        self.options = options or []
+        self.answer = answer
+        self.tolerance = tolerance
+        self.explanation = explanation
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict for session state"""
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, value: Dict[str, Any]) -> "QuizItem":
+        return cls(value["grade"], value["subject"], value["topic"], value["difficulty"], value["kind"],
+                   value["question"], value["answer"], value.get("options"), value.get("tolerance", 0.0),
+                   value.get("explanation", ""), value.get("id"))
+
+    def is_correct(self, response: Any) -> bool:
+        """Grade a response: option index for MCQ, bool for true/false, a number for numeric"""
+        if response is None or response == "":
+            return False
+        try:
+            if self.kind == "mcq":
+                return int(response) == int(self.answer)
+            if self.kind == "true_false":
+                if isinstance(response, str):
+                    response = response.strip().lower() in ("true", "t", "yes", "1")
+                return bool(response) == bool(self.answer)
+            value = float(str(response).replace(",", "").strip())
+            return abs(value - float(self.answer)) <= max(self.tolerance, 1e-9)
+        except (TypeError, ValueError):
+            return False
+
+    def correct_text(self) -> str:
+        """The correct answer as shown to the student"""
+        if self.kind == "mcq":
+            return self.options[int(self.answer)]
+        if self.kind == "true_false":
+            return "True" if self.answer else "False"
+        return f"{float(self.answer):g}"
+
+
+def parse_items(text: str, grade: int, subject: str, topic: str) -> List[QuizItem]:
+    """Parse generated quiz items from a JSON array, dropping malformed ones"""
+    match = JSON_ARRAY_PATTERN.search(text or "")
+    if not match:
+        return []
+    try:
+        raw_items = json.loads(match.group(0))
+    except json.JSONDecodeError:
+        return []
+
+    items = []
+    for raw in raw_items:
+        if not isinstance(raw, dict):
+            continue
+        kind = str(raw.get("type", "")).lower().replace("/", "_").replace("-", "_")
+        question = str(raw.get("question", "")).strip()
+        if kind not in ITEM_KINDS or not question:
+            continue
+        try:
+            difficulty = min(3, max(1, int(raw.get("difficulty", 2))))
+            options: List[str] = []
+            tolerance = 0.0
+            if kind == "mcq":
+                options = [str(option).strip() for option in raw.get("options", [])]
+                answer = int(raw["answer"])
+                if len(options) < 2 or not 0 <= answer < len(options):
+                    continue
+            elif kind == "true_false":
+                answer = raw["answer"]
+                answer = answer.strip().lower() == "true" if isinstance(answer, str) else bool(answer)
+            else:
+                answer = float(raw["answer"])
+                # Default to 1% either way so rounding in the student's working still counts
+                tolerance = float(raw.get("tolerance", abs(answer) * 0.01))
+        except (KeyError, TypeError, ValueError):
+            continue
+        items.append(QuizItem(grade, subject, topic, difficulty, kind, question, answer, options, tolerance,
+                              str(raw.get("explanation", "")).strip()))
+    return items
+
+
+class QuizBank:
+    """Quiz items in SQLite with an in-memory index by grade, subject, topic and difficulty
+
+    Every item is held in memory and listed under its own topic and under "All
+    Topics", so selecting a quiz is a dictionary lookup plus a few random picks
+    however large the bank grows. Items written by other processes are picked up
+    by ``refresh``.
+    """
+
+    def __init__(self, path: str = DEFAULT_QUIZ_PATH, min_per_difficulty: int = 5, batch_size: int = 12):
+        """Open (or create) the bank and load every item into the index"""
+        self.path = path
+        self.min_per_difficulty = min_per_difficulty
+        self.batch_size = batch_size
+        self._local = threading.local()
+        self._items: Dict[int, QuizItem] = {}
+        self._index: Dict[IndexKey, List[int]] = {}
+        self._max_id = 0
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Tuple[int, str, str], threading.Lock] = {}
+        self.stats = {"selections": 0, "select_us": 0.0, "generations": 0, "generated_items": 0, "graded": 0}
+
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS quiz_items ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, grade INTEGER NOT NULL, subject TEXT NOT NULL, "
+            "topic TEXT NOT NULL, difficulty INTEGER NOT NULL, kind TEXT NOT NULL, question TEXT NOT NULL, "
+            "payload TEXT NOT NULL, created_at REAL NOT NULL, UNIQUE (grade, subject, topic, question))"
+        )
+        conn.commit()
+        self.refresh()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _index_item(self, item: QuizItem):
+        """Add an item to the index; call with the lock held"""
+        self._items[item.id] = item
+        self._index.setdefault((item.grade, item.subject, item.topic, item.difficulty), []).append(item.id)
+        if item.topic != "All Topics":
+            self._index.setdefault((item.grade, item.subject, "All Topics", item.difficulty), []).append(item.id)
+
+    def refresh(self) -> int:
+        """Load items added since the last load (by any process); returns how many"""
+        rows = self._connection().execute(
+            "SELECT id, grade, subject, topic, difficulty, kind, question, payload FROM quiz_items "
+            "WHERE id > ? ORDER BY id", (self._max_id,)
+        ).fetchall()
+        with self._lock:
+            for item_id, grade, subject, topic, difficulty, kind, question, payload in rows:
+                if item_id in self._items:
+                    continue
+                extra = json.loads(payload)
+                self._index_item(QuizItem(grade, subject, topic, difficulty, kind, question, extra["answer"],
+                                          extra.get("options"), extra.get("tolerance", 0.0),
+                                          extra.get("explanation", ""), item_id))
+                self._max_id = max(self._max_id, item_id)
+        return len(rows)
+
+    def add_items(self, items: Iterable[QuizItem]) -> int:
+        """Store new items, skipping questions already in the bank; returns how many were added"""
+        conn = self._connection()
+        added = []
+        now = time.time()
+        for item in items:
+            payload = json.dumps({"answer": item.answer, "options": item.options, "tolerance": item.tolerance,
+                                  "explanation": item.explanation})
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO quiz_items (grade, subject, topic, difficulty, kind, question, payload, "
+                "created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (item.grade, item.subject, item.topic, item.difficulty, item.kind, item.question, payload, now)
+            )
+            if cursor.rowcount:
+                item.id = cursor.lastrowid
+                added.append(item)
+        conn.commit()
+        with self._lock:
+            for item in added:
+                self._index_item(item)
+        return len(added)
+
+    def count(self, grade: int, subject: str, topic: str, difficulty: Optional[int] = None) -> int:
+        """Items available for a combination (all difficulties unless one is given)"""
+        levels = [difficulty] if difficulty else list(DIFFICULTIES)
+        with self._lock:
+            return sum(len(self._index.get((grade, subject, topic, level), ())) for level in levels)
+
+    def short_levels(self, grade: int, subject: str, topic: str, difficulty: Optional[int] = None) -> List[int]:
+        """Difficulties with fewer than ``min_per_difficulty`` items: the requested one, or any for a mixed quiz"""
+        levels = [difficulty] if difficulty else list(DIFFICULTIES)
+        with self._lock:
+            return [level for level in levels
+                    if len(self._index.get((grade, subject, topic, level), ())) < self.min_per_difficulty]
+
+    def select(self, grade: int, subject: str, topic: str, difficulty: Optional[int] = None, count: int = 5,
+               exclude: Optional[Set[int]] = None, rng: Optional[random.Random] = None) -> List[QuizItem]:
+        """Pick up to ``count`` random items, avoiding ``exclude`` while enough others remain
+
+        With no ``difficulty`` the quiz mixes levels. Cost depends on ``count``, not
+        on the size of the bank.
+        """
+        start = time.perf_counter()
+        rng = rng or random
+        exclude = exclude or set()
+        levels = [difficulty] if difficulty else list(DIFFICULTIES)
+        with self._lock:
+            buckets = [self._index.get((grade, subject, topic, level), []) for level in levels]
+            total = sum(len(bucket) for bucket in buckets)
+            chosen: List[int] = []
+            picked: Set[int] = set()
+            # Rejection sampling over the buckets; falls back to seen items if too few are new
+            for attempt in range(count * 8):
+                if len(chosen) >= count or len(picked) >= total:
+                    break
+                offset = rng.randrange(total)
+                for bucket in buckets:
+                    if offset < len(bucket):
+                        item_id = bucket[offset]
+                        break
+                    offset -= len(bucket)
+                if item_id in picked or (item_id in exclude and attempt < count * 6):
+                    continue
+                picked.add(item_id)
+                chosen.append(item_id)
+            items = [self._items[item_id] for item_id in chosen]
+            self.stats["selections"] += 1
+            self.stats["select_us"] += (time.perf_counter() - start) * 1e6
+        return items
+
+    def ensure(self, grade: int, subject: str, topic: str, generate: Callable[[int, List[int]], List[QuizItem]],
+               difficulty: Optional[int] = None) -> int:
+        """Generate a batch if a quiz at ``difficulty`` (mixed if None) would run short; returns items added
+
+        ``generate(count, levels)`` is asked for items at the short levels only, so
+        a bank full of easy items still gets hard ones. A per-key lock makes
+        concurrent sessions wait for one generation.
+        """
+        if not self.short_levels(grade, subject, topic, difficulty):
+            return 0
+        key = (grade, subject, topic)
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            self.refresh()
+            levels = self.short_levels(grade, subject, topic, difficulty)
+            if not levels:
+                return 0
+            added = self.add_items(generate(self.batch_size, levels))
+            with self._lock:
+                self.stats["generations"] += 1
+                self.stats["generated_items"] += added
+            return added
+
+    def grade(self, items: List[QuizItem], responses: List[Any]) -> List[bool]:
+        """Grade responses against items, in order"""
+        results = [item.is_correct(response) for item, response in zip(items, responses)]
+        with self._lock:
+            self.stats["graded"] += len(results)
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get bank size, selection latency and generation counts"""
+        with self._lock:
+            selections = self.stats["selections"]
+            return {
+                **self.stats,
+                "items": len(self._items),
+                "combinations": len({key[:3] for key in self._index if key[2] != "All Topics"}),
+                "avg_select_us": round(self.stats["select_us"] / selections, 2) if selections else 0.0
+            }
+
+
+_quiz_bank: Optional[QuizBank] = None
+_quiz_bank_lock = threading.Lock()
+
+
+def get_quiz_bank() -> QuizBank:
+    """Get the process-wide quiz bank, stored at ``SCIENCEGPT_QUIZ_PATH`` if set"""
+    global _quiz_bank
+    if _quiz_bank is None:
+        with _quiz_bank_lock:
+            if _quiz_bank is None:
+                _quiz_bank = QuizBank(os.getenv("SCIENCEGPT_QUIZ_PATH", DEFAULT_QUIZ_PATH))
+    return _quiz_bank
@@ -0,0 +1,253 @@
+"""
+Local Retrieval Engine for ScienceGPT
+BM25 index over the bundled NCERT content, partitioned by grade and subject
+"""
+
+import math
+import re
+import threading
+import time
+from collections import Counter
+from typing import List, Dict, Any, Optional, Tuple
+
+from backend_code.curriculum_data import CurriculumData
+from backend_code.ncert_content import NCERT_PASSAGES
+
+STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "were", "be", "been", "of", "in", "on", "at", "to",
+    "for", "and", "or", "but", "it", "its", "this", "that", "these", "those", "do", "does", "did",
+    "what", "why", "how", "when", "where", "which", "who", "whom", "can", "could", "we", "you", "i",
+    "me", "my", "our", "your", "they", "them", "their", "with", "from", "by", "as", "about", "into",
+    "so", "if", "than", "then", "there", "has", "have", "had", "will", "would", "should", "please",
+    "tell", "explain", "define", "meant", "mean", "meaning", "called", "some", "any", "all"
+}
+
+# Questions that ask "what is X" style definitions are the only ones answered straight
+# from the textbook; everything else is still sent to the LLM with passages as context.
+DEFINITION_PATTERN = re.compile(
+    r"^\s*(what\s+(is|are)|define|definition\s+of|meaning\s+of|what\s+do\s+you\s+mean\s+by|"
+    r"what\s+does\s+.+\s+mean)\b",
+    re.IGNORECASE
+)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, split on non-alphanumerics, drop stopwords and apply light stemming"""
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token in STOPWORDS or len(token) < 2:
+            continue
+        tokens.append(_stem(token))
+    return tokens
+
+
+def _stem(token: str) -> str:
+    """Very small suffix stripper so 'plants'/'plant' and 'reflected'/'reflect' match"""
+    for suffix in ("ing", "ed", "es", "s"):
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            if suffix == "s" and token.endswith("ss"):
+                return token
+            return token[:-len(suffix)]
+    return token
+
+
+class BM25Index:
+    """Okapi BM25 index over a list of passages"""
+
+    def __init__(self, passages: List[Dict[str, Any]], k1: float = 1.5, b: float = 0.75):
+        """Build postings lists and document statistics for the given passages"""
+        self.passages = passages
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        self.doc_lengths: List[int] = []
+        self.doc_terms: List[set] = []
+
+        for doc_id, passage in enumerate(passages):
+            # Titles are short and precise, so they are weighted twice
+            tokens = tokenize(passage["title"]) * 2 + tokenize(passage["text"])
+            self.doc_lengths.append(len(tokens))
+            self.doc_terms.append(set(tokens))
+            for term, freq in Counter(tokens).items():
+                self.postings.setdefault(term, []).append((doc_id, freq))
+
+        self.doc_count = len(passages)
+        self.avg_doc_length = (sum(self.doc_lengths) / self.doc_count) if self.doc_count else 0.0
+        self.idf = {
+            term: math.log(1 + (self.doc_count - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self.postings.items()
+        }
+        # A term no passage contains is as specific as a term can be
+        self.unseen_idf = math.log(1 + (self.doc_count + 0.5) / 0.5)
+
+    def search(self, query_terms: List[str], top_k: int = 3) -> List[Tuple[int, float]]:
+        """Return (doc_id, score) pairs for the best matching passages"""
+        scores: Dict[int, float] = {}
+        for term in set(query_terms):
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = self.idf[term]
+            for doc_id, freq in docs:
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / self.avg_doc_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * freq * (self.k1 + 1) / (freq + norm)
+
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+
+    def max_score(self, query_terms: List[str]) -> float:
+        """Upper bound of the BM25 score for a query, used to normalize confidence
+
+        Terms missing from the index count at ``unseen_idf``, so a question that is
+        mostly about something the passages never mention gets a low confidence.
+        """
+        return sum(self.idf.get(term, self.unseen_idf) * (self.k1 + 1) for term in set(query_terms))
+
+    def coverage(self, doc_id: int, query_terms: List[str]) -> float:
+        """Fraction of the distinct query terms that occur in a passage"""
+        terms = set(query_terms)
+        return len(terms & self.doc_terms[doc_id]) / len(terms) if terms else 0.0
+
+
+class RetrievalEngine:
+    """Answers or grounds student questions from the bundled NCERT content"""
+
+    def __init__(self, passages: Optional[List[Dict[str, Any]]] = None,
+                 confidence_threshold: float = 0.45, margin: float = 1.25,
+                 grounding_threshold: float = 0.15, min_coverage: float = 0.75):
+        """Build one BM25 index per (grade, subject) partition of the curriculum
+
+        A direct answer also needs ``min_coverage`` of the question's terms in the passage.
+        """
+        self.passages = passages if passages is not None else NCERT_PASSAGES
+        self.confidence_threshold = confidence_threshold
+        self.min_coverage = min_coverage
+        self.margin = margin
+        self.grounding_threshold = grounding_threshold
+        self.curriculum = CurriculumData()
+        self.partitions: Dict[Tuple[int, str], BM25Index] = {}
+
+        start = time.perf_counter()
+        for grade in self.curriculum.get_all_grades():
+            for subject in self.curriculum.get_subjects_for_grade(grade):
+                docs = [
+                    p for p in self.passages
+                    if subject in p["subjects"] and p["grades"][0] <= grade <= p["grades"][1]
+                ]
+                self.partitions[(grade, subject)] = BM25Index(docs)
+        self.build_time_ms = (time.perf_counter() - start) * 1000
+
+        self._lock = threading.Lock()
+        self.stats = {
+            "queries": 0,
+            "answered_locally": 0,
+            "grounded": 0,
+            "no_match": 0,
+            "total_query_ms": 0.0
+        }
+
+    def search(self, question: str, grade: int, subject: str, top_k: int = 3) -> List[Dict[str, Any]]:
+        """Return the top passages for a question with their scores and confidence"""
+        index = self.partitions.get((grade, subject))
+        if index is None or index.doc_count == 0:
+            return []
+
+        query_terms = tokenize(question)
+        if not query_terms:
+            return []
+
+        upper_bound = index.max_score(query_terms) or 1.0
+        return [
+            {
+                "passage": index.passages[doc_id],
+                "score": score,
+                "confidence": min(score / upper_bound, 1.0),
+                "coverage": index.coverage(doc_id, query_terms)
+            }
+            for doc_id, score in index.search(query_terms, top_k)
+        ]
+
+    def retrieve(self, question: str, grade: int, subject: str, language: str, top_k: int = 3) -> Dict[str, Any]:
+        """Decide whether a question can be answered locally or should be grounded
+
+        Returns a dict with ``mode`` set to ``"direct"`` (``answer`` holds the matching
+        passage), ``"grounded"`` (``passages`` holds the top passages) or ``"none"``.
+        """
+        start = time.perf_counter()
+        # Weak matches would only add noise to the prompt, so they are dropped
+        results = [
+            r for r in self.search(question, grade, subject, top_k)
+            if r["confidence"] >= self.grounding_threshold
+        ]
+
+        mode = "none"
+        answer = None
+        if results:
+            top = results[0]
+            runner_up = results[1]["score"] if len(results) > 1 else 0.0
+            # The corpus is English, so only English questions are answered verbatim
+            if (language == "English" and DEFINITION_PATTERN.match(question)
+                    and top["confidence"] >= self.confidence_threshold
+                    and top["coverage"] >= self.min_coverage
+                    and top["score"] >= runner_up * self.margin):
+                mode = "direct"
+                answer = top["passage"]
+            else:
+                mode = "grounded"
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self.stats["queries"] += 1
+            self.stats["total_query_ms"] += elapsed_ms
+            if mode == "direct":
+                self.stats["answered_locally"] += 1
+            elif mode == "grounded":
+                self.stats["grounded"] += 1
+            else:
+                self.stats["no_match"] += 1
+
+        return {
+            "mode": mode,
+            "answer": answer,
+            "passages": [r["passage"] for r in results],
+            "latency_ms": elapsed_ms
+        }
+
+    def format_direct_answer(self, passage: Dict[str, Any]) -> str:
+        """Format a textbook passage as a chat answer"""
+        return f"{passage['text']}\n\n📘 *From your NCERT textbook: {passage['title']}*"
+
+    def format_context(self, passages: List[Dict[str, Any]]) -> str:
+        """Format the top passages as reference material for an LLM prompt"""
+        return "\n".join(f"- {p['title']}: {p['text']}" for p in passages)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get build time, query latency and LLM-call avoidance statistics"""
+        with self._lock:
+            queries = self.stats["queries"]
+            return {
+                "build_time_ms": round(self.build_time_ms, 3),
+                "partitions": len(self.partitions),
+                "passages": len(self.passages),
+                "queries": queries,
+                "answered_locally": self.stats["answered_locally"],
+                "grounded": self.stats["grounded"],
+                "no_match": self.stats["no_match"],
+                "avg_query_ms": round(self.stats["total_query_ms"] / queries, 4) if queries else 0.0,
+                "llm_avoidance_rate": round(self.stats["answered_locally"] / queries, 4) if queries else 0.0
+            }
+
+
+_engine: Optional[RetrievalEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_retrieval_engine() -> RetrievalEngine:
+    """Get the process-wide retrieval engine, building the index on first use"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = RetrievalEngine()
+    return _engine
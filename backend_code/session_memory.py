@@ -0,0 +1,263 @@
+"""
+Session Memory Management for ScienceGPT
+Compact records, disk-spilled chat history and per-session memory accounting
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional
+
+# Per-session limits; a single Streamlit server hosts thousands of sessions, so
+# every structure kept in st.session_state must stay bounded.
+MAX_MESSAGES_IN_MEMORY = 40
+MAX_DAILY_VISITS = 400
+MAX_PROGRESS_SESSIONS = 200
+SESSION_MEMORY_LIMIT_BYTES = 512 * 1024
+
+SPILL_DIR = os.getenv("SCIENCEGPT_SPILL_DIR", os.path.join(tempfile.gettempdir(), "sciencegpt_history"))
+# Spill files untouched this long belong to abandoned sessions; swept at most hourly
+SPILL_MAX_AGE_SECONDS = float(os.getenv("SPILL_MAX_AGE_DAYS", "30")) * 86400
+SPILL_PURGE_INTERVAL = 3600.0
+
+# Session keys whose size is broken out individually in the memory report
+TRACKED_KEYS = [
+    "messages", "fact_index", "cached_suggestions",
+    "gamification_data", "progress_data"
+]
+
+
+class ChatMessage:
+    """Single chat turn stored with __slots__ instead of a per-message dict"""
+
+    __slots__ = ("role", "content", "video_url")
+
+    def __init__(self, role: str, content: str, video_url: Optional[str] = None):
+        self.role = role
+        self.content = content
+        self.video_url = video_url
+
+    @classmethod
+    def from_value(cls, value: Any) -> "ChatMessage":
+        """Build a message from a ChatMessage or a legacy message dict"""
+        if isinstance(value, ChatMessage):
+            return value
+        return cls(value["role"], value["content"], value.get("video_url"))
+
+    def __getitem__(self, key: str) -> Any:
+        """Allow dict-style access used by the chat components"""
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__slots__
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default) if key in self.__slots__ else default
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"role": self.role, "content": self.content, "video_url": self.video_url}
+
+
+class ChatHistory:
+    """Chat history that keeps recent turns in memory and spills older ones to disk"""
+
+    def __init__(self, max_in_memory: int = MAX_MESSAGES_IN_MEMORY, session_id: Optional[str] = None,
+                 spill_dir: str = SPILL_DIR):
+        self.max_in_memory = max_in_memory
+        self.session_id = session_id or uuid.uuid4().hex
+        self.spill_dir = spill_dir
+        self.spilled_count = 0
+        self.user_count = 0
+        self._messages: deque = deque()
+
+    @classmethod
+    def restore(cls, session_id: str, messages: List[Any], spilled_count: int = 0, user_count: int = 0,
+                max_in_memory: int = MAX_MESSAGES_IN_MEMORY, spill_dir: str = SPILL_DIR) -> "ChatHistory":
+        """Rebuild a history from a snapshot without re-spilling or recounting turns"""
+        history = cls(max_in_memory, session_id, spill_dir)
+        history._messages.extend(ChatMessage.from_value(m) for m in messages)
+        history.spilled_count = spilled_count
+        history.user_count = user_count
+        return history
+
+    @property
+    def spill_path(self) -> str:
+        return os.path.join(self.spill_dir, f"{self.session_id}.jsonl")
+
+    def append(self, message: Any, counted: bool = True):
+        """Add a message (ChatMessage or legacy dict), spilling old turns if over the cap
+
+        ``counted=False`` adds a turn from an earlier visit without counting it as a question asked now.
+        """
+        message = ChatMessage.from_value(message)
+        self._messages.append(message)
+        if message.role == "user" and counted:
+            self.user_count += 1
+        if len(self._messages) > self.max_in_memory:
+            self.spill(len(self._messages) - self.max_in_memory)
+
+    def extend(self, messages: List[Any], counted: bool = True):
+        for message in messages:
+            self.append(message, counted)
+
+    def spill(self, count: int):
+        """Move the ``count`` oldest in-memory messages to the session's spill file"""
+        count = min(count, len(self._messages))
+        if count <= 0:
+            return
+        evicted = [self._messages.popleft() for _ in range(count)]
+        try:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            with open(self.spill_path, "a", encoding="utf-8") as f:
+                for message in evicted:
+                    f.write(json.dumps(message.to_dict(), ensure_ascii=False) + "\n")
+        except OSError:
+            # Spilling is best-effort; evicted turns are simply dropped if the disk fails
+            pass
+        self.spilled_count += count
+        purge_spill_files_if_due(self.spill_dir)
+
+    def load_spilled(self, limit: Optional[int] = None) -> List[ChatMessage]:
+        """Read spilled messages back from disk, newest ``limit`` turns if given"""
+        if not self.spilled_count or not os.path.exists(self.spill_path):
+            return []
+        if limit is not None and limit <= 0:
+            return []
+        with open(self.spill_path, encoding="utf-8") as f:
+            # A bounded deque keeps only the tail, so old turns are never all held at once
+            lines = deque(f, maxlen=limit)
+        return [ChatMessage.from_value(json.loads(line)) for line in lines]
+
+    def clear(self):
+        """Forget all messages, including the spill file"""
+        self._messages.clear()
+        self.spilled_count = 0
+        self.user_count = 0
+        if os.path.exists(self.spill_path):
+            os.remove(self.spill_path)
+
+    def total_count(self) -> int:
+        return self.spilled_count + len(self._messages)
+
+    def __iter__(self) -> Iterator[ChatMessage]:
+        return iter(self._messages)
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self._messages)[index]
+        return self._messages[index]
+
+
+def purge_spill_files(max_age_seconds: float = SPILL_MAX_AGE_SECONDS, spill_dir: str = SPILL_DIR) -> int:
+    """Delete spill files not written for ``max_age_seconds``; returns how many"""
+    cutoff = time.time() - max_age_seconds
+    removed = 0
+    try:
+        entries = list(os.scandir(spill_dir))
+    except OSError:
+        return 0
+    for entry in entries:
+        try:
+            if entry.name.endswith(".jsonl") and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except OSError:
+            continue
+    return removed
+
+
+_next_spill_purge: Dict[str, float] = {}
+_spill_purge_lock = threading.Lock()
+
+
+def purge_spill_files_if_due(spill_dir: str = SPILL_DIR):
+    """Run ``purge_spill_files`` for a directory at most once per ``SPILL_PURGE_INTERVAL``"""
+    now = time.time()
+    with _spill_purge_lock:
+        if now < _next_spill_purge.get(spill_dir, 0.0):
+            return
+        _next_spill_purge[spill_dir] = now + SPILL_PURGE_INTERVAL
+    purge_spill_files(SPILL_MAX_AGE_SECONDS, spill_dir)
+
+
+def deep_sizeof(obj: Any, seen: Optional[set] = None) -> int:
+    """Approximate the memory held by an object graph in bytes"""
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, bytearray, int, float, bool, type(None))):
+        return size
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif isinstance(obj, ChatHistory):
+        size += deep_sizeof(obj._messages, seen)
+    else:
+        for slot in getattr(type(obj), "__slots__", ()):
+            if hasattr(obj, slot):
+                size += deep_sizeof(getattr(obj, slot), seen)
+    return size
+
+
+def ensure_compact_state(state: Any):
+    """Convert legacy session structures into their bounded counterparts"""
+    messages = state.get("messages")
+    if not isinstance(messages, ChatHistory):
+        history = ChatHistory(session_id=state.get("session_id"))
+        history.extend(messages or [])
+        state["messages"] = history
+        state["session_id"] = history.session_id
+
+
+def enforce_session_limits(state: Any, limit_bytes: int = SESSION_MEMORY_LIMIT_BYTES) -> Dict[str, Any]:
+    """Trim unbounded session structures and shed memory if over the session cap
+
+    Returns the memory report after enforcement.
+    """
+    ensure_compact_state(state)
+
+    gamification_data = state.get("gamification_data")
+    if gamification_data and len(gamification_data.get("daily_visits", [])) > MAX_DAILY_VISITS:
+        visits = sorted(gamification_data["daily_visits"])
+        gamification_data["daily_visits"] = visits[-MAX_DAILY_VISITS:]
+
+    progress_data = state.get("progress_data")
+    if progress_data and len(progress_data.get("sessions", [])) > MAX_PROGRESS_SESSIONS:
+        progress_data["sessions"] = progress_data["sessions"][-MAX_PROGRESS_SESSIONS:]
+
+    report = session_memory_report(state)
+    if report["total_bytes"] > limit_bytes:
+        # Shed older chat turns; they stay readable from the spill file
+        history = state["messages"]
+        history.spill(len(history) // 2)
+        report = session_memory_report(state)
+    return report
+
+
+def session_memory_report(state: Any) -> Dict[str, Any]:
+    """Report the approximate memory held by one session, broken down by key"""
+    breakdown = {key: deep_sizeof(state[key]) for key in TRACKED_KEYS if key in state}
+    messages = state.get("messages")
+    return {
+        "session_id": state.get("session_id"),
+        "total_bytes": sum(breakdown.values()),
+        "limit_bytes": SESSION_MEMORY_LIMIT_BYTES,
+        "breakdown": breakdown,
+        "messages_in_memory": len(messages) if messages is not None else 0,
+        "messages_spilled": messages.spilled_count if isinstance(messages, ChatHistory) else 0
+    }
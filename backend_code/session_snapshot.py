@@ -0,0 +1,317 @@
+"""
+Session Snapshots for ScienceGPT
+Compact msgpack + zlib checkpoints of session state that survive server restarts
+"""
+
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+import msgpack
+
+from backend_code.session_memory import ChatHistory, ChatMessage
+
+# Bump when the encoding of any snapshot key changes; older rows are ignored on restore
+SNAPSHOT_VERSION = 1
+
+SNAPSHOT_KEYS = [
+    "messages", "gamification_data", "progress_data", "fact_index",
+    "cached_suggestions", "last_settings_hash",
+    "grade", "language", "subject", "topic",
+    "student_id", "student_name", "class_id", "school_id", "district_id"
+]
+
+DEFAULT_SNAPSHOT_PATH = os.path.join(tempfile.gettempdir(), "sciencegpt_snapshots.sqlite3")
+
+_EXT_SET = 1
+_EXT_DATETIME = 2
+_EXT_DATE = 3
+_EXT_TUPLE = 4
+_EXT_CHAT_HISTORY = 5
+_EXT_CHAT_MESSAGE = 6
+# 7 and 8 encoded the removed per-session LLM and fact caches; never reuse them
+
+
+def _default(obj: Any) -> Any:
+    """Encode types msgpack does not know as extension types"""
+    if isinstance(obj, datetime):
+        return msgpack.ExtType(_EXT_DATETIME, obj.isoformat().encode("utf-8"))
+    if isinstance(obj, date):
+        return msgpack.ExtType(_EXT_DATE, obj.isoformat().encode("utf-8"))
+    if isinstance(obj, (set, frozenset)):
+        return msgpack.ExtType(_EXT_SET, _pack(list(obj)))
+    if isinstance(obj, tuple):
+        return msgpack.ExtType(_EXT_TUPLE, _pack(list(obj)))
+    if isinstance(obj, ChatMessage):
+        return msgpack.ExtType(_EXT_CHAT_MESSAGE, _pack([obj.role, obj.content, obj.video_url]))
+    if isinstance(obj, ChatHistory):
+        return msgpack.ExtType(_EXT_CHAT_HISTORY, _pack([
+            obj.session_id, obj.spilled_count, obj.user_count, obj.max_in_memory, list(obj)
+        ]))
+    if isinstance(obj, dict):
+        return dict(obj)
+    if isinstance(obj, list):
+        return list(obj)
+    raise TypeError(f"Cannot snapshot {type(obj).__name__}")
+
+
+def _ext_hook(code: int, data: bytes) -> Any:
+    """Decode the extension types written by ``_default``"""
+    if code == _EXT_DATETIME:
+        return datetime.fromisoformat(data.decode("utf-8"))
+    if code == _EXT_DATE:
+        return date.fromisoformat(data.decode("utf-8"))
+    if code == _EXT_SET:
+        return set(_unpack(data))
+    if code == _EXT_TUPLE:
+        return tuple(_unpack(data))
+    if code == _EXT_CHAT_MESSAGE:
+        return ChatMessage(*_unpack(data))
+    if code == _EXT_CHAT_HISTORY:
+        session_id, spilled_count, user_count, max_in_memory, messages = _unpack(data)
+        return ChatHistory.restore(session_id, messages, spilled_count, user_count, max_in_memory)
+    return msgpack.ExtType(code, data)
+
+
+def _pack(value: Any) -> bytes:
+    # strict_types sends tuples and dict/list subclasses through _default so they round-trip
+    return msgpack.packb(value, default=_default, strict_types=True, use_bin_type=True)
+
+
+def _unpack(data: bytes) -> Any:
+    return msgpack.unpackb(data, ext_hook=_ext_hook, raw=False, strict_map_key=False)
+
+
+def encode(value: Any, level: int = 3) -> bytes:
+    """Encode a session value as compressed msgpack"""
+    return zlib.compress(_pack(value), level)
+
+
+def decode(data: bytes) -> Any:
+    """Decode bytes produced by ``encode``"""
+    return _unpack(zlib.decompress(data))
+
+
+class SnapshotStore:
+    """Per-key session snapshots in a SQLite file shared by processes on the same host"""
+
+    def __init__(self, path: str = DEFAULT_SNAPSHOT_PATH):
+        self.path = path
+        self._local = threading.local()
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS snapshots ("
+            "session_id TEXT NOT NULL, key TEXT NOT NULL, version INTEGER NOT NULL, "
+            "data BLOB NOT NULL, updated_at REAL NOT NULL, PRIMARY KEY (session_id, key))"
+        )
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def write(self, session_id: str, blobs: Dict[str, bytes]):
+        now = time.time()
+        conn = self._connection()
+        conn.executemany(
+            "INSERT OR REPLACE INTO snapshots (session_id, key, version, data, updated_at) VALUES (?, ?, ?, ?, ?)",
+            [(session_id, key, SNAPSHOT_VERSION, data, now) for key, data in blobs.items()]
+        )
+        conn.commit()
+
+    def read(self, session_id: str) -> Dict[str, bytes]:
+        rows = self._connection().execute(
+            "SELECT key, data FROM snapshots WHERE session_id = ? AND version = ?", (session_id, SNAPSHOT_VERSION)
+        ).fetchall()
+        return dict(rows)
+
+    def delete(self, session_id: str):
+        conn = self._connection()
+        conn.execute("DELETE FROM snapshots WHERE session_id = ?", (session_id,))
+        conn.commit()
+
+    def purge_older_than(self, seconds: float) -> int:
+        """Remove snapshots not updated for ``seconds`` and return how many rows were deleted"""
+        conn = self._connection()
+        cursor = conn.execute("DELETE FROM snapshots WHERE updated_at < ?", (time.time() - seconds,))
+        conn.commit()
+        return cursor.rowcount
+
+
+class SessionSnapshotter:
+    """Checkpoints changed session keys and restores them when a student reconnects
+
+    Each key is encoded on the calling thread and compared with the checksum of its
+    last write; only changed keys are handed to a single background writer. A
+    checkpoint throttled by ``min_interval`` keeps the session's values and a
+    maintenance thread writes them once the interval has passed, so the last change
+    before a student leaves is not lost. The same thread drops snapshots not
+    updated for ``max_age_seconds``.
+    """
+
+    def __init__(self, store: Optional[SnapshotStore] = None, keys: Optional[List[str]] = None,
+                 min_interval: float = 2.0, max_sessions: int = 10_000, max_age_seconds: float = 30 * 86400,
+                 purge_interval: float = 3600.0):
+        """Initialize with a store (a local SQLite file by default)"""
+        self.store = store if store is not None else SnapshotStore()
+        self.keys = keys or SNAPSHOT_KEYS
+        self.min_interval = min_interval
+        self.max_sessions = max_sessions
+        self.max_age_seconds = max_age_seconds
+        self.purge_interval = purge_interval
+        self._checksums: "OrderedDict[str, Dict[str, int]]" = OrderedDict()
+        self._last_checkpoint: Dict[str, float] = {}
+        # Throttled sessions and the values their trailing checkpoint will encode
+        self._dirty: Dict[str, Dict[str, Any]] = {}
+        self._maintenance: Optional[threading.Thread] = None
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="snapshot")
+        self._lock = threading.Lock()
+        self.stats = {"checkpoints": 0, "trailing_checkpoints": 0, "keys_written": 0, "bytes_written": 0,
+                      "restores": 0, "last_restore_ms": 0.0, "write_errors": 0, "purged": 0}
+
+    def checkpoint(self, session_id: str, state: Any, force: bool = False) -> int:
+        """Queue a write of the keys that changed since the last checkpoint; returns how many"""
+        now = time.time()
+        values = {key: state[key] for key in self.keys if key in state}
+        with self._lock:
+            self._start_maintenance()
+            if not force and now - self._last_checkpoint.get(session_id, 0.0) < self.min_interval:
+                # Objects are kept by reference, so later changes to them are written too
+                self._dirty[session_id] = values
+                return 0
+            self._dirty.pop(session_id, None)
+            self._last_checkpoint[session_id] = now
+        return self._queue_changed(session_id, values)
+
+    def _queue_changed(self, session_id: str, values: Dict[str, Any]) -> int:
+        with self._lock:
+            checksums = self._checksums.setdefault(session_id, {})
+            self._checksums.move_to_end(session_id)
+            while len(self._checksums) > self.max_sessions:
+                evicted, _ = self._checksums.popitem(last=False)
+                self._last_checkpoint.pop(evicted, None)
+                self._dirty.pop(evicted, None)
+
+        changed: Dict[str, bytes] = {}
+        for key, value in values.items():
+            try:
+                packed = _pack(value)
+            except RuntimeError:
+                # Mutated by a background thread mid-encode (e.g. progress_data); retry next time
+                continue
+            checksum = zlib.crc32(packed)
+            if checksums.get(key) != checksum:
+                changed[key] = zlib.compress(packed, 3)
+                checksums[key] = checksum
+
+        if changed:
+            self._writer.submit(self._write, session_id, changed)
+            with self._lock:
+                self.stats["checkpoints"] += 1
+                self.stats["keys_written"] += len(changed)
+                self.stats["bytes_written"] += sum(len(data) for data in changed.values())
+        return len(changed)
+
+    def _start_maintenance(self):
+        """Start the trailing-checkpoint and purge thread; call with the lock held"""
+        if self._maintenance is None:
+            self._maintenance = threading.Thread(target=self._maintain, name="snapshot-maintenance", daemon=True)
+            self._maintenance.start()
+
+    def _maintain(self):
+        next_purge = 0.0
+        while True:
+            time.sleep(self.min_interval)
+            now = time.time()
+            with self._lock:
+                due = [session_id for session_id in self._dirty
+                       if now - self._last_checkpoint.get(session_id, 0.0) >= self.min_interval]
+                flushes = [(session_id, self._dirty.pop(session_id)) for session_id in due]
+                for session_id in due:
+                    self._last_checkpoint[session_id] = now
+            for session_id, values in flushes:
+                if self._queue_changed(session_id, values):
+                    with self._lock:
+                        self.stats["trailing_checkpoints"] += 1
+            if now >= next_purge:
+                next_purge = now + self.purge_interval
+                self._writer.submit(self._purge)
+
+    def _purge(self):
+        try:
+            purged = self.store.purge_older_than(self.max_age_seconds)
+        except Exception:
+            return
+        with self._lock:
+            self.stats["purged"] += purged
+
+    def _write(self, session_id: str, blobs: Dict[str, bytes]):
+        try:
+            self.store.write(session_id, blobs)
+        except Exception:
+            with self._lock:
+                self.stats["write_errors"] += 1
+
+    def restore(self, session_id: str, state: Any) -> List[str]:
+        """Load a session's snapshot into ``state``; returns the keys restored"""
+        start = time.perf_counter()
+        restored = []
+        for key, data in self.store.read(session_id).items():
+            if key not in self.keys:
+                # Written by an older version that snapshotted more keys
+                continue
+            try:
+                state[key] = decode(data)
+                restored.append(key)
+            except Exception:
+                continue
+        with self._lock:
+            # What was just loaded is what is on disk, so unchanged keys are not rewritten
+            self._checksums[session_id] = {key: zlib.crc32(_pack(state[key])) for key in restored}
+            self.stats["restores"] += 1
+            self.stats["last_restore_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        return restored
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._checksums.pop(session_id, None)
+            self._last_checkpoint.pop(session_id, None)
+            self._dirty.pop(session_id, None)
+        self._writer.submit(self.store.delete, session_id)
+
+    def flush(self):
+        """Wait for queued writes to finish"""
+        self._writer.submit(lambda: None).result()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.stats, "tracked_sessions": len(self._checksums)}
+
+
+_snapshotter: Optional[SessionSnapshotter] = None
+_snapshotter_lock = threading.Lock()
+
+
+def get_snapshotter() -> SessionSnapshotter:
+    """Get the process-wide snapshotter, writing to ``SCIENCEGPT_SNAPSHOT_PATH`` if set"""
+    global _snapshotter
+    if _snapshotter is None:
+        with _snapshotter_lock:
+            if _snapshotter is None:
+                _snapshotter = SessionSnapshotter(
+                    SnapshotStore(os.getenv("SCIENCEGPT_SNAPSHOT_PATH", DEFAULT_SNAPSHOT_PATH)),
+                    max_age_seconds=float(os.getenv("SNAPSHOT_MAX_AGE_DAYS", "30")) * 86400
+                )
+    return _snapshotter
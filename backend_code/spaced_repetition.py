@@ -0,0 +1,410 @@
+"""
+Spaced Repetition for ScienceGPT
+SM-2 topic mastery per student, a due-time heap for reviews and vectorized class summaries
+"""
+
+import heapq
+import itertools
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_REVIEW_PATH = os.path.join(tempfile.gettempdir(), "sciencegpt_reviews.sqlite3")
+
+DAY_SECONDS = 86400.0
+
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+FIRST_INTERVALS = (1.0, 6.0)
+
+# Recall quality on the SM-2 scale (0-5) for each kind of evidence
+QUALITY_QUESTION = 3
+QUALITY_REVIEW = 4
+QUALITY_FORGOTTEN = 2
+
+# Expected recall when a review falls due; mastery decays towards it over one interval
+RETENTION_AT_DUE = 0.9
+
+# (subject, topic)
+TopicKey = Tuple[str, str]
+
+
+def quiz_quality(correct: int, total: int) -> int:
+    """SM-2 quality for a quiz score: 5 for a perfect quiz down to 1 below 40%"""
+    if total <= 0:
+        return QUALITY_QUESTION
+    fraction = correct / total
+    for threshold, quality in ((1.0, 5), (0.8, 4), (0.6, 3), (0.4, 2)):
+        if fraction >= threshold:
+            return quality
+    return 1
+
+
+class ReviewCard:
+    """SM-2 state of one topic for one student"""
+
+    __slots__ = ("subject", "topic", "ease", "interval", "repetitions", "due", "last_review", "reviews", "lapses")
+
+    def __init__(self, subject: str, topic: str):
+        self.subject = subject
+        self.topic = topic
+        self.ease = DEFAULT_EASE
+        self.interval = 0.0
+        self.repetitions = 0
+        self.due = 0.0
+        self.last_review = 0.0
+        self.reviews = 0
+        self.lapses = 0
+
+    def review(self, quality: int, now: float) -> bool:
+        """Apply one SM-2 review of ``quality`` (0-5) at ``now``; returns whether the card changed
+
+        Passing evidence before the card is due (another question on a topic just
+        studied) leaves the schedule alone, so only spaced recall lengthens the
+        interval. Forgetting counts whenever it happens.
+        """
+        quality = min(5, max(0, int(quality)))
+        if self.reviews and quality >= 3 and now < self.due:
+            return False
+        if quality < 3:
+            # Forgotten: start the interval sequence again
+            self.repetitions = 0
+            self.interval = FIRST_INTERVALS[0]
+            self.lapses += 1
+        else:
+            if self.repetitions < len(FIRST_INTERVALS):
+                self.interval = FIRST_INTERVALS[self.repetitions]
+            else:
+                self.interval = round(self.interval * self.ease, 2)
+            self.repetitions += 1
+        self.ease = max(MIN_EASE, self.ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+        self.reviews += 1
+        self.last_review = now
+        self.due = now + self.interval * DAY_SECONDS
+        return True
+
+    def mastery(self, now: float) -> float:
+        """Estimated recall now: 1 right after a review, RETENTION_AT_DUE when due"""
+        if not self.reviews:
+            return 0.0
+        elapsed = max(0.0, now - self.last_review) / (self.interval * DAY_SECONDS)
+        return RETENTION_AT_DUE ** elapsed
+
+    def to_dict(self, now: float) -> Dict[str, Any]:
+        return {
+            "subject": self.subject,
+            "topic": self.topic,
+            "mastery": round(self.mastery(now), 3),
+            "interval_days": self.interval,
+            "due": self.due,
+            "overdue_days": round(max(0.0, now - self.due) / DAY_SECONDS, 2),
+            "reviews": self.reviews,
+            "lapses": self.lapses
+        }
+
+    def to_row(self) -> Tuple:
+        return (self.subject, self.topic, self.ease, self.interval, self.repetitions, self.due, self.last_review,
+                self.reviews, self.lapses)
+
+    @classmethod
+    def from_row(cls, row: Tuple) -> "ReviewCard":
+        card = cls(row[0], row[1])
+        card.ease, card.interval, card.repetitions, card.due, card.last_review, card.reviews, card.lapses = row[2:]
+        return card
+
+
+class _StudentDeck:
+    """A student's cards and a heap of (due, sequence, topic key)
+
+    Heap entries are never updated in place: a review pushes a fresh entry and the
+    old one is dropped when it surfaces with a due time that no longer matches.
+    """
+
+    __slots__ = ("cards", "heap", "class_id")
+
+    def __init__(self):
+        self.cards: Dict[TopicKey, ReviewCard] = {}
+        self.heap: List[Tuple[float, int, TopicKey]] = []
+        self.class_id = ""
+
+    def compact(self):
+        """Rebuild the heap without stale entries once they outnumber live ones"""
+        if len(self.heap) > 2 * len(self.cards) + 16:
+            self.heap = [entry for entry in self.heap if self.cards[entry[2]].due == entry[0]]
+            heapq.heapify(self.heap)
+
+
+class _ClassTable:
+    """Column arrays of every (student, topic) card in a class for vectorized passes"""
+
+    def __init__(self, capacity: int = 64):
+        self.size = 0
+        self.due = np.full(capacity, np.inf)
+        self.last_review = np.zeros(capacity)
+        self.interval = np.ones(capacity)
+        self.topic_code = np.zeros(capacity, dtype=np.int32)
+        self.student_code = np.zeros(capacity, dtype=np.int32)
+        self.rows: Dict[Tuple[str, TopicKey], int] = {}
+        self.topics: List[TopicKey] = []
+        self.topic_codes: Dict[TopicKey, int] = {}
+        self.students: List[str] = []
+        self.student_codes: Dict[str, int] = {}
+
+    def _grow(self):
+        capacity = len(self.due) * 2
+        for name, fill in (("due", np.inf), ("last_review", 0.0), ("interval", 1.0), ("topic_code", 0),
+                           ("student_code", 0)):
+            old = getattr(self, name)
+            new = np.full(capacity, fill, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def upsert(self, student_id: str, card: ReviewCard):
+        key = (card.subject, card.topic)
+        row = self.rows.get((student_id, key))
+        if row is None:
+            if self.size == len(self.due):
+                self._grow()
+            row = self.rows[(student_id, key)] = self.size
+            self.size += 1
+            if key not in self.topic_codes:
+                self.topic_codes[key] = len(self.topics)
+                self.topics.append(key)
+            if student_id not in self.student_codes:
+                self.student_codes[student_id] = len(self.students)
+                self.students.append(student_id)
+            self.topic_code[row] = self.topic_codes[key]
+            self.student_code[row] = self.student_codes[student_id]
+        self.due[row] = card.due
+        self.last_review[row] = card.last_review
+        self.interval[row] = card.interval
+
+    def drop_student(self, student_id: str):
+        """Retire a student's rows (after a class change); they stay allocated but never fall due"""
+        for (row_student, _), row in self.rows.items():
+            if row_student == student_id:
+                self.due[row] = np.inf
+
+    def summary(self, now: float, limit: int) -> Dict[str, Any]:
+        n = self.size
+        live = np.isfinite(self.due[:n])
+        due_mask = self.due[:n] <= now
+        topic_codes = self.topic_code[:n]
+        elapsed = np.maximum(0.0, now - self.last_review[:n]) / (self.interval[:n] * DAY_SECONDS)
+        mastery = np.where(live, RETENTION_AT_DUE ** elapsed, 0.0)
+
+        topics = len(self.topics)
+        due_counts = np.bincount(topic_codes[due_mask], minlength=topics)
+        learners = np.bincount(topic_codes[live], minlength=topics)
+        mastery_sums = np.bincount(topic_codes, weights=mastery, minlength=topics)
+        order = np.argsort(-due_counts, kind="stable")[:limit]
+        return {
+            "students": int(np.unique(self.student_code[:n][live]).size),
+            "students_with_reviews_due": int(np.unique(self.student_code[:n][due_mask]).size),
+            "reviews_due": int(due_mask.sum()),
+            "topics": [
+                {
+                    "subject": self.topics[code][0],
+                    "topic": self.topics[code][1],
+                    "students_due": int(due_counts[code]),
+                    "learners": int(learners[code]),
+                    "mean_mastery": round(float(mastery_sums[code] / learners[code]), 3)
+                }
+                for code in order if due_counts[code]
+            ]
+        }
+
+
+CARD_COLUMNS = "subject, topic, ease, interval, repetitions, due, last_review, reviews, lapses"
+
+
+class ReviewScheduler:
+    """Per-student SM-2 topic mastery with O(log n) due-review lookups
+
+    Each student has a heap of cards ordered by due time, so "what should I review
+    now?" pops only the due entries. Each class also keeps its cards as column
+    arrays, so the reviews due across a whole class are counted in one numpy pass.
+    Cards are written through to SQLite and loaded at start, so schedules survive
+    restarts; a student first seen by this process is read from the store, which
+    picks up cards written by other processes.
+    """
+
+    def __init__(self, path: str = DEFAULT_REVIEW_PATH):
+        """Open (or create) the card store and load every stored card"""
+        self.path = path
+        self._local = threading.local()
+        self._decks: Dict[str, _StudentDeck] = {}
+        self._classes: Dict[str, _ClassTable] = {}
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self.stats = {"reviews": 0, "early": 0, "due_lookups": 0, "class_summaries": 0, "write_errors": 0}
+
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS review_cards (student TEXT NOT NULL, class_id TEXT NOT NULL, "
+            "subject TEXT NOT NULL, topic TEXT NOT NULL, ease REAL NOT NULL, interval REAL NOT NULL, "
+            "repetitions INTEGER NOT NULL, due REAL NOT NULL, last_review REAL NOT NULL, "
+            "reviews INTEGER NOT NULL, lapses INTEGER NOT NULL, PRIMARY KEY (student, subject, topic))"
+        )
+        conn.commit()
+        rows = conn.execute(f"SELECT student, class_id, {CARD_COLUMNS} FROM review_cards").fetchall()
+        with self._lock:
+            for row in rows:
+                self._load_card(row)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _load_card(self, row: Tuple):
+        """Add a stored (student, class_id, *card) row; call with the lock held"""
+        student_id, class_id = row[0], row[1]
+        deck = self._decks.setdefault(student_id, _StudentDeck())
+        card = ReviewCard.from_row(row[2:])
+        deck.cards[(card.subject, card.topic)] = card
+        deck.class_id = class_id
+        heapq.heappush(deck.heap, (card.due, next(self._sequence), (card.subject, card.topic)))
+        if class_id:
+            self._classes.setdefault(class_id, _ClassTable()).upsert(student_id, card)
+
+    def _deck(self, student_id: str) -> _StudentDeck:
+        """A student's deck, read from the store the first time this process sees them"""
+        with self._lock:
+            deck = self._decks.get(student_id)
+        if deck is not None:
+            return deck
+        rows = self._connection().execute(
+            f"SELECT student, class_id, {CARD_COLUMNS} FROM review_cards WHERE student = ?", (student_id,)
+        ).fetchall()
+        with self._lock:
+            if student_id not in self._decks:
+                self._decks[student_id] = _StudentDeck()
+                for row in rows:
+                    self._load_card(row)
+            return self._decks[student_id]
+
+    def _save(self, student_id: str, class_id: str, card: ReviewCard, moved_class: bool):
+        try:
+            conn = self._connection()
+            conn.execute(
+                f"INSERT OR REPLACE INTO review_cards (student, class_id, {CARD_COLUMNS}) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", (student_id, class_id, *card.to_row())
+            )
+            if moved_class:
+                conn.execute("UPDATE review_cards SET class_id = ? WHERE student = ?", (class_id, student_id))
+            conn.commit()
+        except sqlite3.Error:
+            # The in-memory schedule stays correct for this process
+            with self._lock:
+                self.stats["write_errors"] += 1
+
+    def record(self, student_id: str, subject: str, topic: str, quality: int, class_id: str = "",
+               now: Optional[float] = None) -> ReviewCard:
+        """Record evidence of recall for a topic and reschedule its next review if it counts"""
+        now = time.time() if now is None else now
+        key = (subject, topic)
+        deck = self._deck(student_id)
+        with self._lock:
+            card = deck.cards.get(key)
+            if card is None:
+                card = deck.cards[key] = ReviewCard(subject, topic)
+            reviewed = card.review(quality, now)
+            moved_class = class_id != deck.class_id
+            if reviewed:
+                heapq.heappush(deck.heap, (card.due, next(self._sequence), key))
+                deck.compact()
+                self.stats["reviews"] += 1
+            else:
+                self.stats["early"] += 1
+                if not moved_class:
+                    return card
+
+            if moved_class:
+                if deck.class_id in self._classes:
+                    self._classes[deck.class_id].drop_student(student_id)
+                deck.class_id = class_id
+                if class_id:
+                    table = self._classes.setdefault(class_id, _ClassTable())
+                    for other in deck.cards.values():
+                        table.upsert(student_id, other)
+            elif class_id:
+                self._classes.setdefault(class_id, _ClassTable()).upsert(student_id, card)
+        self._save(student_id, class_id, card, moved_class)
+        return card
+
+    def due(self, student_id: str, limit: int = 3, subject: Optional[str] = None,
+            now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """The most overdue cards (optionally of one subject), without consuming them
+
+        Pops only entries that are due (dropping stale ones) and pushes the live ones
+        back, so the cost is O(k log n) for k due entries.
+        """
+        now = time.time() if now is None else now
+        deck = self._deck(student_id)
+        with self._lock:
+            self.stats["due_lookups"] += 1
+            popped = []
+            found = []
+            while deck.heap and deck.heap[0][0] <= now and len(found) < limit:
+                entry = heapq.heappop(deck.heap)
+                card = deck.cards[entry[2]]
+                if card.due != entry[0]:
+                    continue
+                popped.append(entry)
+                if subject is None or card.subject == subject:
+                    found.append(card.to_dict(now))
+            for entry in popped:
+                heapq.heappush(deck.heap, entry)
+            return found
+
+    def mastery(self, student_id: str, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Every topic the student has studied with its current mastery, weakest first"""
+        now = time.time() if now is None else now
+        deck = self._deck(student_id)
+        with self._lock:
+            cards = [card.to_dict(now) for card in deck.cards.values()]
+        return sorted(cards, key=lambda card: card["mastery"])
+
+    def class_summary(self, class_id: str, limit: int = 5, now: Optional[float] = None) -> Dict[str, Any]:
+        """Reviews due across a class and the topics most students need to revisit"""
+        now = time.time() if now is None else now
+        with self._lock:
+            self.stats["class_summaries"] += 1
+            table = self._classes.get(class_id)
+            if table is None or not table.size:
+                return {"students": 0, "students_with_reviews_due": 0, "reviews_due": 0, "topics": []}
+            return table.summary(now, limit)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get review and lookup counts and the number of tracked cards"""
+        with self._lock:
+            return {
+                **self.stats,
+                "students": sum(1 for deck in self._decks.values() if deck.cards),
+                "cards": sum(len(deck.cards) for deck in self._decks.values()),
+                "classes": len(self._classes)
+            }
+
+
+_scheduler: Optional[ReviewScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_review_scheduler() -> ReviewScheduler:
+    """Get the process-wide review scheduler, stored at ``SCIENCEGPT_REVIEW_PATH`` if set"""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = ReviewScheduler(os.getenv("SCIENCEGPT_REVIEW_PATH", DEFAULT_REVIEW_PATH))
+    return _scheduler
@@ -0,0 +1,94 @@
+"""
+Startup Profile for ScienceGPT
+Records import-time breakdowns and time to first render for cold starts
+"""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+# Reference point for every milestone; this module is the first thing frontend.py imports
+PROCESS_START = time.perf_counter()
+
+PROFILE_PATH = os.getenv("SCIENCEGPT_STARTUP_PROFILE")
+
+_milestones: Dict[str, float] = {}
+_first_render_ms: Optional[float] = None
+_lock = threading.Lock()
+
+
+def mark(name: str):
+    """Record the first time a named startup milestone is reached"""
+    with _lock:
+        if name not in _milestones:
+            _milestones[name] = (time.perf_counter() - PROCESS_START) * 1000
+
+
+def record_first_render():
+    """Record time to first render once per process and write the profile if configured"""
+    global _first_render_ms
+    with _lock:
+        if _first_render_ms is not None:
+            return
+        _first_render_ms = (time.perf_counter() - PROCESS_START) * 1000
+
+    if PROFILE_PATH:
+        try:
+            with open(PROFILE_PATH, "w", encoding="utf-8") as f:
+                json.dump(get_startup_profile(), f, indent=2)
+        except OSError:
+            pass
+
+
+def get_startup_profile() -> Dict[str, Any]:
+    """Get the milestones and time to first render recorded in this process"""
+    with _lock:
+        return {
+            "milestones_ms": {name: round(ms, 2) for name, ms in _milestones.items()},
+            "time_to_first_render_ms": round(_first_render_ms, 2) if _first_render_ms is not None else None,
+            "loaded_modules": len(sys.modules)
+        }
+
+
+def import_time_breakdown(module: str, top: int = 20, python: str = sys.executable,
+                          cwd: Optional[str] = None) -> Dict[str, Any]:
+    """Import a module in a fresh interpreter with ``-X importtime`` and parse the report
+
+    Returns the total cumulative import time and the ``top`` slowest imports by
+    cumulative time. Lines are parsed even if the import fails part way.
+    """
+    start = time.perf_counter()
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=cwd
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    entries: List[Dict[str, Any]] = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            entries.append({
+                "module": name.strip(),
+                "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000
+            })
+        except ValueError:
+            continue
+
+    top_level = [e for e in entries if e["depth"] == 0]
+    return {
+        "module": module,
+        "ok": result.returncode == 0,
+        "error": result.stderr.strip().splitlines()[-1] if result.returncode else None,
+        "interpreter_wall_ms": round(wall_ms, 2),
+        "total_import_ms": round(sum(e["cumulative_ms"] for e in top_level), 2),
+        "slowest": sorted(entries, key=lambda e: e["cumulative_ms"], reverse=True)[:top]
+    }
@@ -0,0 +1,90 @@
+"""
+State Store for ScienceGPT
+Version counters for session-state dicts and derived views memoized on them
+"""
+
+from typing import Any, Callable, Dict, Hashable, MutableMapping, Optional, Tuple
+
+# Session key holding the bookkeeping; it is not snapshotted, so it starts empty after a restore
+STORE_KEY = "state_store"
+
+
+def _new_bookkeeping() -> Dict[str, Any]:
+    return {"versions": {}, "views": {}, "marks": {}, "hits": 0, "misses": 0}
+
+
+class StateStore:
+    """Change tracking over a session's raw state dicts
+
+    Writers call ``touch`` after changing a key (``GamificationManager`` for
+    ``gamification_data``, the chat for ``messages``). A view records the versions
+    of its inputs and is recomputed only when one of them moved, so unchanged
+    reruns reuse the last result. A version is the key's counter together with the
+    identity of the object stored under it, so replacing a dict outright (a reset
+    or a snapshot restore) also invalidates its views.
+
+    The wrapper itself holds no data and is cheap to create on every call.
+    """
+
+    def __init__(self, state: MutableMapping):
+        self._state = state
+        books = state.get(STORE_KEY)
+        if books is None:
+            books = state[STORE_KEY] = _new_bookkeeping()
+        self._books: Dict[str, Any] = books
+        self._versions: Dict[str, int] = books["versions"]
+
+    def version(self, key: str) -> Tuple[int, int]:
+        return id(self._state.get(key)), self._versions.get(key, 0)
+
+    def touch(self, *keys: str):
+        """Record that the values under ``keys`` changed"""
+        for key in keys:
+            self._versions[key] = self._versions.get(key, 0) + 1
+
+    def view(self, name: str, inputs: Tuple[str, ...], compute: Callable[[], Any], *extra: Hashable) -> Any:
+        """Result of ``compute``, reused while ``inputs`` and ``extra`` are unchanged
+
+        ``extra`` carries anything else the view depends on (a date, a setting, a
+        version kept outside session state). Results are shared between calls, so
+        callers must treat them as read-only.
+        """
+        token = (tuple(self.version(key) for key in inputs), extra)
+        cached = self._books["views"].get(name)
+        if cached is not None and cached[0] == token:
+            self._books["hits"] += 1
+            return cached[1]
+        self._books["misses"] += 1
+        value = compute()
+        self._books["views"][name] = (token, value)
+        return value
+
+    def changed(self, name: str, *token: Hashable) -> bool:
+        """True (and remember ``token``) the first time ``name`` is seen with this token
+
+        Lets side effects such as a leaderboard sync run only when their inputs move.
+        """
+        if self._books["marks"].get(name) == token:
+            return False
+        self._books["marks"][name] = token
+        return True
+
+    def invalidate(self, name: Optional[str] = None):
+        """Drop one view and mark (every one if ``name`` is None), keeping the versions"""
+        if name is None:
+            self._books["views"].clear()
+            self._books["marks"].clear()
+            return
+        self._books["views"].pop(name, None)
+        self._books["marks"].pop(name, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get view hits and recomputations for this session"""
+        hits, misses = self._books["hits"], self._books["misses"]
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+            "views": len(self._books["views"]),
+            "versions": dict(self._versions)
+        }
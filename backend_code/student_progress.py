@@ -8,106 +8,107 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Any
 import json
 
+from backend_code.activity_tracker import (
+    apply_question, close_session, get_activity_tracker, new_progress_data, open_session
+)
+from backend_code.state_store import StateStore
+
 class StudentProgress:
-    """Tracks and analyzes student learning progress"""
+    """Tracks and analyzes student learning progress
+
+    The app feeds progress through the background ActivityTracker (``track_rerun``
+    and ``track_question``); the synchronous session methods remain for direct use.
+    Summaries are memoized on the tracker's data version, so they are rebuilt only
+    after a flush or a direct update changed the progress data.
+    """
 
     def __init__(self):
         """Initialize student progress tracker"""
         if 'progress_data' not in st.session_state:
-            st.session_state.progress_data = {
-                "sessions": [],
-                "questions_by_subject": {},
-                "questions_by_grade": {},
-                "learning_time": {},
-                "topic_coverage": {},
-                "performance_metrics": {
-                    "total_questions": 0,
-                    "total_time_spent": 0,
-                    "favorite_subjects": [],
-                    "learning_patterns": {}
-                }
-            }
+            st.session_state.progress_data = new_progress_data()
+
+    def _store(self) -> StateStore:
+        return StateStore(st.session_state)
+
+    def _data_version(self):
+        return get_activity_tracker().data_version(st.session_state.get('session_id'))
+
+    def _lock(self):
+        """Lock held while reading progress data the background tracker may be updating"""
+        return get_activity_tracker().session_lock(st.session_state.get('session_id'))
+
+    def track_rerun(self):
+        """Queue a heartbeat for this session; sessions open and close automatically"""
+        get_activity_tracker().heartbeat(
+            st.session_state.get('session_id', 'anonymous'),
+            st.session_state.progress_data,
+            st.session_state.get('grade', 3),
+            st.session_state.get('language', 'English')
+        )
+
+    def track_question(self, subject: str, grade: int, topic: str = None):
+        """Queue a question event to be recorded in the background"""
+        get_activity_tracker().question(st.session_state.get('session_id', 'anonymous'), subject, grade, topic)
+        review = st.session_state.get('pending_review')
+        # A review question is graded by the student's own check after the answer instead
+        if topic and topic != "All Topics" and not (review and review["topic"] == topic):
+            from backend_code.spaced_repetition import QUALITY_QUESTION
+            self.track_review(subject, topic, QUALITY_QUESTION)
+
+    def track_review(self, subject: str, topic: str, quality: int):
+        """Record recall of a topic (SM-2 quality 0-5) and reschedule its next review"""
+        from backend_code.spaced_repetition import get_review_scheduler
+        get_review_scheduler().record(self._student_id(), subject, topic, quality,
+                                      st.session_state.get('class_id', ''))
+
+    def get_due_reviews(self, subject: str = None, limit: int = 2) -> List[Dict[str, Any]]:
+        """Topics the student should revisit now, most overdue first"""
+        from backend_code.spaced_repetition import get_review_scheduler
+        return get_review_scheduler().due(self._student_id(), limit, subject)
+
+    def _student_id(self) -> str:
+        return st.session_state.get('student_id') or st.session_state.get('session_id', 'anonymous')
 
     def start_session(self):
         """Start a new learning session"""
-        session_data = {
-            "start_time": datetime.now().isoformat(),
-            "end_time": None,
-            "questions_asked": 0,
-            "subjects_covered": set(),
-            "grade": st.session_state.get('grade', 3),
-            "language": st.session_state.get('language', 'English')
-        }
-
-        st.session_state.current_session = session_data
+        st.session_state.current_session = open_session(
+            st.session_state.get('grade', 3),
+            st.session_state.get('language', 'English')
+        )
 
     def end_session(self):
         """End the current learning session"""
         if 'current_session' in st.session_state:
-            session = st.session_state.current_session
-            session['end_time'] = datetime.now().isoformat()
-            session['subjects_covered'] = list(session['subjects_covered'])
-
-            # Add to sessions history
-            st.session_state.progress_data['sessions'].append(session)
-
-            # Update metrics
-            self._update_metrics(session)
-
+            with self._lock():
+                close_session(st.session_state.progress_data, st.session_state.current_session)
             del st.session_state.current_session
+            self._store().touch("progress_data")
 
     def record_question(self, question: str, subject: str, grade: int, topic: str = None):
         """Record a question asked by the student"""
-        # Update current session
-        if 'current_session' in st.session_state:
-            st.session_state.current_session['questions_asked'] += 1
-            st.session_state.current_session['subjects_covered'].add(subject)
-
-        # Update subject tracking
-        if subject not in st.session_state.progress_data['questions_by_subject']:
-            st.session_state.progress_data['questions_by_subject'][subject] = 0
-        st.session_state.progress_data['questions_by_subject'][subject] += 1
-
-        # Update grade tracking
-        grade_key = f"Grade {grade}"
-        if grade_key not in st.session_state.progress_data['questions_by_grade']:
-            st.session_state.progress_data['questions_by_grade'][grade_key] = 0
-        st.session_state.progress_data['questions_by_grade'][grade_key] += 1
-
-        # Update topic coverage
-        if topic and topic != "All Topics":
-            if subject not in st.session_state.progress_data['topic_coverage']:
-                st.session_state.progress_data['topic_coverage'][subject] = set()
-            st.session_state.progress_data['topic_coverage'][subject].add(topic)
-
-        # Update total questions
-        st.session_state.progress_data['performance_metrics']['total_questions'] += 1
-
-    def _update_metrics(self, session: Dict):
-        """Update performance metrics based on completed session"""
-        # Calculate session duration
-        if session['end_time'] and session['start_time']:
-            start = datetime.fromisoformat(session['start_time'])
-            end = datetime.fromisoformat(session['end_time'])
-            duration = (end - start).total_seconds() / 60  # minutes
-
-            st.session_state.progress_data['performance_metrics']['total_time_spent'] += duration
-
-        # Update favorite subjects
-        questions_by_subject = st.session_state.progress_data['questions_by_subject']
-        if questions_by_subject:
-            favorite_subjects = sorted(
-                questions_by_subject.items(), 
-                key=lambda x: x[1], 
-                reverse=True
-            )[:3]
-            st.session_state.progress_data['performance_metrics']['favorite_subjects'] = [
-                {"subject": subj, "count": count} for subj, count in favorite_subjects
-            ]
+        with self._lock():
+            apply_question(
+                st.session_state.progress_data,
+                st.session_state.get('current_session'),
+                subject, grade, topic
+            )
+        self._store().touch("progress_data")
 
     def get_progress_summary(self) -> Dict[str, Any]:
         """Get comprehensive progress summary"""
-        data = st.session_state.progress_data
+        from backend_code.spaced_repetition import get_review_scheduler
+
+        def build():
+            with self._lock():
+                return self._progress_summary(st.session_state.progress_data)
+
+        summary = dict(self._store().view("progress_summary", ("progress_data",), build, self._data_version()))
+        # Mastery decays with time, so it is never memoized
+        summary["topic_mastery"] = get_review_scheduler().mastery(self._student_id())
+        return summary
+
+    def _progress_summary(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the progress summary from a progress record"""
         metrics = data['performance_metrics']
 
         # Calculate learning consistency
@@ -138,15 +139,20 @@ class StudentProgress:
             "consistency_score": consistency_score,
             "diversity_score": diversity_score,
             "overall_score": consistency_score + diversity_score + metrics.get('total_questions', 0),
-            "questions_by_subject": data.get('questions_by_subject', {}),
+            "questions_by_subject": dict(data.get('questions_by_subject', {})),
             "topic_coverage": {
                 subj: list(topics) for subj, topics in data.get('topic_coverage', {}).items()
             }
         }
 
     def get_weekly_progress(self) -> List[Dict[str, Any]]:
-        """Get progress for the last 7 days"""
-        sessions = st.session_state.progress_data.get('sessions', [])
+        """Get progress for the last 7 days (memoized per day; read-only)"""
+        return self._store().view("weekly_progress", ("progress_data",), self._weekly_progress,
+                                  self._data_version(), datetime.now().date())
+
+    def _weekly_progress(self) -> List[Dict[str, Any]]:
+        with self._lock():
+            sessions = list(st.session_state.progress_data.get('sessions', []))
 
         # Get last 7 days
         today = datetime.now().date()
@@ -176,29 +182,19 @@ class StudentProgress:
 
     def export_progress_data(self) -> str:
         """Export progress data as JSON string"""
-        # Convert sets to lists for JSON serialization
-        export_data = st.session_state.progress_data.copy()
-
-        # Convert topic_coverage sets to lists
-        if 'topic_coverage' in export_data:
-            export_data['topic_coverage'] = {
-                subj: list(topics) for subj, topics in export_data['topic_coverage'].items()
-            }
+        with self._lock():
+            # Convert sets to lists for JSON serialization
+            export_data = st.session_state.progress_data.copy()
+
+            # Convert topic_coverage sets to lists
+            if 'topic_coverage' in export_data:
+                export_data['topic_coverage'] = {
+                    subj: list(topics) for subj, topics in export_data['topic_coverage'].items()
+                }
 
-        return json.dumps(export_data, indent=2, default=str)
+            return json.dumps(export_data, indent=2, default=str)
 
     def clear_progress_data(self):
         """Clear all progress data"""
-        st.session_state.progress_data = {
-            "sessions": [],
-            "questions_by_subject": {},
-            "questions_by_grade": {},
-            "learning_time": {},
-            "topic_coverage": {},
-            "performance_metrics": {
-                "total_questions": 0,
-                "total_time_spent": 0,
-                "favorite_subjects": [],
-                "learning_patterns": {}
-            }
-        }
+        st.session_state.progress_data = new_progress_data()
+        self._store().touch("progress_data")
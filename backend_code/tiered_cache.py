@@ -0,0 +1,351 @@
+"""
+Tiered Cache for ScienceGPT
+In-process LRU (L1) in front of a store shared by all server processes (L2)
+"""
+
+import itertools
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Dict, Optional, Tuple
+
+# Bump CACHE_VERSION to invalidate everything, or a namespace version when the
+# prompt or data shape behind that namespace changes.
+CACHE_VERSION = 1
+NAMESPACE_VERSIONS = {
+    "suggestions": 1,
+    "fact": 1,
+    "answer": 1,
+    "translation": 1,
+    "video": 1
+}
+
+DEFAULT_SQLITE_PATH = os.path.join(tempfile.gettempdir(), "sciencegpt_cache.sqlite3")
+
+
+def _encode(value: Any) -> Any:
+    """Convert a value into JSON-safe data, tagging types JSON cannot represent"""
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, date):
+        return {"__date__": value.isoformat()}
+    if isinstance(value, (set, frozenset)):
+        return {"__set__": [_encode(v) for v in value]}
+    if isinstance(value, tuple):
+        return {"__tuple__": [_encode(v) for v in value]}
+    if isinstance(value, list):
+        return [_encode(v) for v in value]
+    if isinstance(value, dict):
+        if all(isinstance(k, str) for k in value):
+            return {k: _encode(v) for k, v in value.items()}
+        return {"__dict__": [[_encode(k), _encode(v)] for k, v in value.items()]}
+    return value
+
+
+def _decode(value: Any) -> Any:
+    """Reverse of ``_encode``"""
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    if isinstance(value, dict):
+        if len(value) == 1:
+            tag, payload = next(iter(value.items()))
+            if tag == "__datetime__":
+                return datetime.fromisoformat(payload)
+            if tag == "__date__":
+                return date.fromisoformat(payload)
+            if tag == "__set__":
+                return {_decode(v) for v in payload}
+            if tag == "__tuple__":
+                return tuple(_decode(v) for v in payload)
+            if tag == "__dict__":
+                return {_decode(k): _decode(v) for k, v in payload}
+        return {k: _decode(v) for k, v in value.items()}
+    return value
+
+
+def serialize(value: Any) -> bytes:
+    """Serialize a value so that sets, tuples, dates and non-string keys round-trip"""
+    return json.dumps(_encode(value), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def deserialize(data: bytes) -> Any:
+    """Deserialize bytes produced by ``serialize``"""
+    return _decode(json.loads(data.decode("utf-8")))
+
+
+class LRUCache:
+    """Thread-safe in-process LRU with per-entry expiry (the L1 tier)"""
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return (found, value)"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return False, None
+            expires_at, value = entry
+            if expires_at and expires_at <= time.time():
+                del self._data[key]
+                return False, None
+            self._data.move_to_end(key)
+            return True, value
+
+    def set(self, key: str, value: Any, expires_at: float):
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteStore:
+    """L2 store in a local SQLite file shared by processes on the same host
+
+    Expired rows are never read, and every ``purge_every`` writes they are deleted
+    so the file does not keep growing.
+    """
+
+    def __init__(self, path: str = DEFAULT_SQLITE_PATH, purge_every: int = 500):
+        self.path = path
+        self.purge_every = purge_every
+        self._local = threading.local()
+        self._writes = itertools.count(1)
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS cache_expires_at ON cache (expires_at)")
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread; WAL lets readers proceed during writes"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Tuple[Optional[bytes], float]:
+        """Return (value, expires_at), or (None, 0) if missing or expired"""
+        row = self._connection().execute(
+            "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or (row[1] and row[1] <= time.time()):
+            return None, 0.0
+        return row[0], row[1]
+
+    def set(self, key: str, value: bytes, expires_at: float):
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, value, expires_at)
+        )
+        conn.commit()
+        if self.purge_every and next(self._writes) % self.purge_every == 0:
+            self.purge_expired()
+
+    def delete(self, key: str):
+        conn = self._connection()
+        conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+        conn.commit()
+
+    def purge_expired(self) -> int:
+        """Remove expired rows and return how many were deleted"""
+        conn = self._connection()
+        cursor = conn.execute("DELETE FROM cache WHERE expires_at > 0 AND expires_at <= ?", (time.time(),))
+        conn.commit()
+        return cursor.rowcount
+
+
+class RedisStore:
+    """L2 store on a Redis-compatible server (or any client with the same methods)"""
+
+    def __init__(self, client: Any):
+        self.client = client
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisStore":
+        import redis
+        return cls(redis.Redis.from_url(url))
+
+    def get(self, key: str) -> Tuple[Optional[bytes], float]:
+        value = self.client.get(key)
+        if value is None:
+            return None, 0.0
+        ttl = self.client.ttl(key)
+        return value, (time.time() + ttl) if ttl and ttl > 0 else 0.0
+
+    def set(self, key: str, value: bytes, expires_at: float):
+        ttl = int(expires_at - time.time()) if expires_at else None
+        if ttl is not None and ttl <= 0:
+            return
+        self.client.set(key, value, ex=ttl)
+
+    def delete(self, key: str):
+        self.client.delete(key)
+
+
+class InMemoryRedis:
+    """Minimal stand-in for a Redis client (get/set/ttl/delete) for local runs and tests"""
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[bytes, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[1] and entry[1] <= time.time():
+                del self._data[key]
+                return None
+            return entry[0]
+
+    def set(self, key: str, value: bytes, ex: Optional[int] = None):
+        with self._lock:
+            self._data[key] = (value, time.time() + ex if ex else 0.0)
+        return True
+
+    def ttl(self, key: str) -> int:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return -2
+            return int(entry[1] - time.time()) if entry[1] else -1
+
+    def delete(self, key: str) -> int:
+        with self._lock:
+            return 1 if self._data.pop(key, None) is not None else 0
+
+
+class TieredCache:
+    """Two-tier cache: a process-local LRU in front of a shared store"""
+
+    def __init__(self, l2: Any, l1_max_entries: int = 2048, l1_ttl_seconds: float = 60.0):
+        """Initialize with an L2 store (SQLiteStore, RedisStore or compatible)
+
+        L1 entries live at most ``l1_ttl_seconds``, which bounds how long a process
+        can serve a value that another process has deleted or replaced in L2.
+        """
+        self.l1 = LRUCache(l1_max_entries)
+        self.l2 = l2
+        self.l1_ttl_seconds = l1_ttl_seconds
+        self._lock = threading.Lock()
+        self.stats = {"l1_hits": 0, "l2_hits": 0, "misses": 0, "sets": 0, "l2_errors": 0}
+
+    def _full_key(self, namespace: str, key: Any) -> str:
+        """Build the versioned storage key for a namespace and key"""
+        version = NAMESPACE_VERSIONS.get(namespace, 1)
+        return f"sgpt:v{CACHE_VERSION}:{namespace}:v{version}:{serialize(key).decode('utf-8')}"
+
+    def _l1_expiry(self, expires_at: float) -> float:
+        """Clamp an L2 expiry to the L1 lifetime"""
+        l1_expires_at = time.time() + self.l1_ttl_seconds
+        return min(expires_at, l1_expires_at) if expires_at else l1_expires_at
+
+    def _count(self, stat: str):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def get(self, namespace: str, key: Any, default: Any = None) -> Any:
+        """Get a value from L1, falling back to L2 and promoting hits into L1"""
+        full_key = self._full_key(namespace, key)
+        found, value = self.l1.get(full_key)
+        if found:
+            self._count("l1_hits")
+            return value
+
+        try:
+            data, expires_at = self.l2.get(full_key)
+        except Exception:
+            self._count("l2_errors")
+            data, expires_at = None, 0.0
+
+        if data is None:
+            self._count("misses")
+            return default
+
+        value = deserialize(data)
+        self.l1.set(full_key, value, self._l1_expiry(expires_at))
+        self._count("l2_hits")
+        return value
+
+    def contains(self, namespace: str, key: Any) -> bool:
+        """Check whether a key is cached in either tier"""
+        sentinel = object()
+        return self.get(namespace, key, sentinel) is not sentinel
+
+    def set(self, namespace: str, key: Any, value: Any, ttl_seconds: Optional[float] = None):
+        """Store a value in both tiers; ``ttl_seconds=None`` means no expiry"""
+        full_key = self._full_key(namespace, key)
+        expires_at = time.time() + ttl_seconds if ttl_seconds else 0.0
+        self.l1.set(full_key, value, self._l1_expiry(expires_at))
+        try:
+            self.l2.set(full_key, serialize(value), expires_at)
+        except Exception:
+            self._count("l2_errors")
+        self._count("sets")
+
+    def delete(self, namespace: str, key: Any):
+        """Remove a key from both tiers"""
+        full_key = self._full_key(namespace, key)
+        self.l1.delete(full_key)
+        try:
+            self.l2.delete(full_key)
+        except Exception:
+            self._count("l2_errors")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit counts per tier"""
+        with self._lock:
+            lookups = self.stats["l1_hits"] + self.stats["l2_hits"] + self.stats["misses"]
+            hits = self.stats["l1_hits"] + self.stats["l2_hits"]
+            return {
+                **self.stats,
+                "l1_entries": len(self.l1),
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0
+            }
+
+
+def create_store(url: Optional[str]) -> Any:
+    """Create an L2 store from a URL: ``redis://...``, ``memory://`` or ``sqlite:///path``"""
+    if url and url.startswith(("redis://", "rediss://")):
+        return RedisStore.from_url(url)
+    if url == "memory://":
+        return RedisStore(InMemoryRedis())
+    if url and url.startswith("sqlite:///"):
+        return SQLiteStore(url[len("sqlite:///"):])
+    return SQLiteStore()
+
+
+_shared_cache: Optional[TieredCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_shared_cache() -> TieredCache:
+    """Get the process-wide tiered cache, with L2 chosen by ``SCIENCEGPT_CACHE_URL``"""
+    global _shared_cache
+    if _shared_cache is None:
+        with _shared_cache_lock:
+            if _shared_cache is None:
+                _shared_cache = TieredCache(create_store(os.getenv("SCIENCEGPT_CACHE_URL")))
+    return _shared_cache
@@ -0,0 +1,357 @@
+"""
+Token Ledger for ScienceGPT
+Append-only record of LLM token use with daily budgets per school and student
+"""
+
+import hashlib
+import os
+import struct
+import tempfile
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextvars import ContextVar
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+TASKS = ["suggestions", "fact", "answer", "translation", "quiz", "challenge"]
+
+# USD per million (prompt, completion) tokens on Groq's price list
+MODEL_PRICES = {
+    "llama-3.3-70b-versatile": (0.59, 0.79),
+    "llama-3.1-8b-instant": (0.05, 0.08)
+}
+
+# Budget levels, mildest first
+LEVELS = ["normal", "short", "cache_only"]
+
+# time, task, flags, prompt tokens, completion tokens, model id, student id, school id
+RECORD = struct.Struct("<dBBIIQQQ")
+FLAG_SERVED = 1
+FLAG_FROM_CACHE = 2
+
+DEFAULT_LEDGER_DIR = os.path.join(tempfile.gettempdir(), "sciencegpt_ledger")
+
+# (student_id, school_id) charged for LLM calls made on this thread; background work is unattributed
+_attribution: ContextVar[Tuple[str, str]] = ContextVar("token_attribution", default=("", ""))
+
+
+def set_attribution(student_id: str, school_id: str = ""):
+    """Charge LLM calls made on the current thread to a student and school"""
+    _attribution.set((student_id or "", school_id or ""))
+
+
+def current_attribution() -> Tuple[str, str]:
+    """The (student_id, school_id) LLM calls on this thread are charged to"""
+    return _attribution.get()
+
+
+def name_id(name: str) -> int:
+    """Stable 64-bit id for a name, so processes sharing the ledger agree without coordination"""
+    if not name:
+        return 0
+    return int.from_bytes(hashlib.blake2b(name.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def cost_usd(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Price of one call; models missing from MODEL_PRICES cost nothing"""
+    prompt_price, completion_price = MODEL_PRICES.get(model, (0.0, 0.0))
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+
+class DayTotals:
+    """Aggregates of one day's ledger records"""
+
+    def __init__(self):
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cost = 0.0
+        self.served = 0
+        self.served_from_cache = 0
+        self.by_task: Dict[str, List[int]] = {task: [0, 0] for task in TASKS}
+        self.by_model: Dict[int, List[float]] = {}
+        self.by_student: Counter = Counter()
+        self.by_school: Counter = Counter()
+        self.calls_by_hour = [0] * 24
+        self.tokens_by_hour = [0] * 24
+        self.served_by_hour = [0] * 24
+
+    @property
+    def tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def add(self, record: Tuple, model: str):
+        timestamp, task, flags, prompt, completion, model_id, student, school = record
+        hour = datetime.fromtimestamp(timestamp).hour
+        if flags & FLAG_SERVED:
+            self.served += 1
+            self.served_by_hour[hour] += 1
+            if flags & FLAG_FROM_CACHE:
+                self.served_from_cache += 1
+            return
+
+        tokens = prompt + completion
+        self.calls += 1
+        self.prompt_tokens += prompt
+        self.completion_tokens += completion
+        self.cost += cost_usd(model, prompt, completion)
+        if task < len(TASKS):
+            totals = self.by_task[TASKS[task]]
+            totals[0] += 1
+            totals[1] += tokens
+        per_model = self.by_model.setdefault(model_id, [0, 0, 0])
+        per_model[0] += 1
+        per_model[1] += prompt
+        per_model[2] += completion
+        self.by_student[student] += tokens
+        self.by_school[school] += tokens
+        self.calls_by_hour[hour] += 1
+        self.tokens_by_hour[hour] += tokens
+
+
+class TokenLedger:
+    """Per-call token use in daily append-only binary files, with budgets on top
+
+    Each call is one fixed-size record (``RECORD.size`` bytes) appended to
+    ``ledger-YYYY-MM-DD.bin``; the names its 64-bit hashes stand for are written
+    once per day to ``names-YYYY-MM-DD.tsv``. Aggregates are built by tailing the
+    day's file, so every process writing to the same directory sees, and is
+    budgeted against, the same totals. When the day rolls over, files older than
+    ``retention_days`` are deleted.
+    """
+
+    def __init__(self, directory: str = DEFAULT_LEDGER_DIR, global_daily: int = 0, school_daily: int = 0,
+                 student_daily: int = 0, soft_fraction: float = 0.8, retention_days: int = 31):
+        """Initialize with daily token budgets; 0 means unlimited"""
+        self.directory = directory
+        self.global_daily = global_daily
+        self.school_daily = school_daily
+        self.student_daily = student_daily
+        self.soft_fraction = soft_fraction
+        self.retention_days = retention_days
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._days: "OrderedDict[str, DayTotals]" = OrderedDict()
+        self._offsets: Dict[str, int] = {}
+        self._names: Dict[int, str] = {0: ""}
+        self._names_offsets: Dict[str, int] = {}
+        # Names already in today's name file, from this process or read back from others
+        self._day_names: set = set()
+        self._file = None
+        self._file_day: Optional[str] = None
+        self.stats = {"records": 0, "write_errors": 0, "short": 0, "cache_only": 0}
+
+    def _path(self, day: str) -> str:
+        return os.path.join(self.directory, f"ledger-{day}.bin")
+
+    def _names_path(self, day: str) -> str:
+        return os.path.join(self.directory, f"names-{day}.tsv")
+
+    def _intern(self, day: str, *names: str):
+        """Append names not yet in the day's name table; call with the lock held"""
+        self._load_names(day)
+        new = {name_id(name): name for name in names if name and name_id(name) not in self._day_names}
+        if new:
+            with open(self._names_path(day), "a", encoding="utf-8") as f:
+                f.write("".join(f"{nid}\t{name.replace(chr(10), ' ')}\n" for nid, name in new.items()))
+            self._names.update(new)
+            self._day_names.update(new)
+
+    def _load_names(self, day: str):
+        """Read names other writers added to a day's name table; call with the lock held"""
+        path = self._names_path(day)
+        offset = self._names_offsets.get(day, 0)
+        if not os.path.exists(path) or os.path.getsize(path) == offset:
+            return
+        with open(path, "rb") as f:
+            f.seek(offset)
+            data = f.read()
+        complete = data[:data.rfind(b"\n") + 1]
+        self._names_offsets[day] = offset + len(complete)
+        for line in complete.decode("utf-8").splitlines():
+            nid, _, name = line.partition("\t")
+            self._names[int(nid)] = name
+            if day == self._file_day:
+                self._day_names.add(int(nid))
+
+    def _expire(self, today: date):
+        """Delete day files older than ``retention_days`` and forget their names; call with the lock held"""
+        cutoff = (today - timedelta(days=self.retention_days)).isoformat()
+        for filename in os.listdir(self.directory):
+            prefix, _, rest = filename.partition("-")
+            if prefix in ("ledger", "names") and rest[:10] < cutoff:
+                try:
+                    os.remove(os.path.join(self.directory, filename))
+                except OSError:
+                    continue
+        # Names are reloaded per day as aggregates read them, so expired ones drop out of memory
+        self._names = {0: ""}
+        self._names_offsets.clear()
+        self._day_names = set()
+
+    def record(self, task: str, model: str, prompt_tokens: int = 0, completion_tokens: int = 0,
+               attribution: Optional[Tuple[str, str]] = None):
+        """Append one LLM call, charged to the current thread's attribution unless given"""
+        self._append(task, 0, prompt_tokens, completion_tokens, model, attribution)
+
+    def record_usage(self, task: str, model: str, usage: Any, attribution: Optional[Tuple[str, str]] = None):
+        """Append one LLM call from a response's ``usage`` object (prompt and completion tokens)"""
+        self.record(task, model, getattr(usage, "prompt_tokens", 0) or 0,
+                    getattr(usage, "completion_tokens", 0) or 0, attribution)
+
+    def record_served(self, task: str = "answer", from_cache: bool = False):
+        """Append a zero-token record for a response delivered to a student"""
+        self._append(task, FLAG_SERVED | (FLAG_FROM_CACHE if from_cache else 0), 0, 0, "", None)
+
+    def _append(self, task: str, flags: int, prompt: int, completion: int, model: str,
+                attribution: Optional[Tuple[str, str]]):
+        student, school = attribution or _attribution.get()
+        now = time.time()
+        today = date.fromtimestamp(now)
+        day = today.isoformat()
+        data = RECORD.pack(now, TASKS.index(task) if task in TASKS else 255, flags, prompt, completion,
+                           name_id(model), name_id(student), name_id(school))
+        with self._lock:
+            try:
+                if self._file_day != day:
+                    if self._file is not None:
+                        self._file.close()
+                    self._expire(today)
+                    self._file = open(self._path(day), "ab")
+                    self._file_day = day
+                self._intern(day, model, student, school)
+                # One write of a whole record per call keeps appends from other processes intact
+                self._file.write(data)
+                self._file.flush()
+                self.stats["records"] += 1
+            except OSError:
+                self.stats["write_errors"] += 1
+
+    def _totals(self, day: str) -> DayTotals:
+        """Bring a day's aggregates up to date with its file; call with the lock held"""
+        totals = self._days.get(day)
+        if totals is None:
+            totals = self._days[day] = DayTotals()
+            self._offsets[day] = 0
+            while len(self._days) > self.retention_days:
+                old, _ = self._days.popitem(last=False)
+                self._offsets.pop(old, None)
+        self._days.move_to_end(day)
+
+        path = self._path(day)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return totals
+        # Only whole records; a concurrent writer's partial record is picked up next time
+        end = size - (size - self._offsets[day]) % RECORD.size
+        self._load_names(day)
+        if end > self._offsets[day]:
+            with open(path, "rb") as f:
+                f.seek(self._offsets[day])
+                data = f.read(end - self._offsets[day])
+            for record in RECORD.iter_unpack(data):
+                totals.add(record, self._names.get(record[5], ""))
+            self._offsets[day] = end
+        return totals
+
+    def budget_level(self, student_id: str = "", school_id: str = "") -> str:
+        """``normal``, ``short`` past ``soft_fraction`` of any budget, or ``cache_only`` once one is spent"""
+        today = date.today().isoformat()
+        with self._lock:
+            totals = self._totals(today)
+            usage = [(self.global_daily, totals.tokens)]
+            if school_id:
+                usage.append((self.school_daily, totals.by_school[name_id(school_id)]))
+            if student_id:
+                usage.append((self.student_daily, totals.by_student[name_id(student_id)]))
+
+            level = 0
+            for limit, used in usage:
+                if limit <= 0:
+                    continue
+                if used >= limit:
+                    level = 2
+                elif used >= limit * self.soft_fraction:
+                    level = max(level, 1)
+            if level:
+                self.stats[LEVELS[level]] += 1
+            return LEVELS[level]
+
+    def aggregates(self, day: Optional[str] = None, top: int = 10) -> Dict[str, Any]:
+        """Totals for one day (today by default): by task, model, hour, top students and schools"""
+        day = day or date.today().isoformat()
+        with self._lock:
+            totals = self._totals(day)
+            tokens = totals.tokens
+            return {
+                "day": day,
+                "calls": totals.calls,
+                "prompt_tokens": totals.prompt_tokens,
+                "completion_tokens": totals.completion_tokens,
+                "tokens": tokens,
+                "cost_usd": round(totals.cost, 4),
+                "served": totals.served,
+                "served_from_cache": totals.served_from_cache,
+                "tokens_per_served": round(tokens / totals.served, 1) if totals.served else 0.0,
+                "cost_per_1k_served_usd": round(totals.cost / totals.served * 1000, 4) if totals.served else 0.0,
+                "by_task": {task: {"calls": c, "tokens": t} for task, (c, t) in totals.by_task.items()},
+                "by_model": {
+                    self._names.get(mid, str(mid)): {"calls": c, "prompt_tokens": p, "completion_tokens": o}
+                    for mid, (c, p, o) in totals.by_model.items()
+                },
+                "top_students": [(self._names.get(sid, str(sid)), t) for sid, t in totals.by_student.most_common(top)
+                                 if sid],
+                "top_schools": [(self._names.get(sid, str(sid)), t) for sid, t in totals.by_school.most_common(top)
+                                if sid],
+                "unattributed_tokens": totals.by_student[0],
+                "calls_by_hour": list(totals.calls_by_hour),
+                "tokens_by_hour": list(totals.tokens_by_hour),
+                "served_by_hour": list(totals.served_by_hour)
+            }
+
+    def daily(self, days: int = 7) -> List[Dict[str, Any]]:
+        """Headline totals for each of the last ``days`` days, oldest first"""
+        today = date.today()
+        summary = []
+        for offset in range(days - 1, -1, -1):
+            aggregates = self.aggregates((today - timedelta(days=offset)).isoformat())
+            summary.append({key: aggregates[key] for key in
+                            ("day", "calls", "tokens", "cost_usd", "served", "served_from_cache", "tokens_per_served")})
+        return summary
+
+    def get_student_usage(self, student_id: str) -> Dict[str, Any]:
+        """Tokens a student has used today against their budget"""
+        with self._lock:
+            used = self._totals(date.today().isoformat()).by_student[name_id(student_id)]
+        return {"tokens_today": used, "daily_budget": self.student_daily}
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats,
+                "record_bytes": RECORD.size,
+                "budgets": {"global": self.global_daily, "school": self.school_daily, "student": self.student_daily}
+            }
+
+
+_ledger: Optional[TokenLedger] = None
+_ledger_lock = threading.Lock()
+
+
+def get_token_ledger() -> TokenLedger:
+    """Get the process-wide token ledger, configured from the environment"""
+    global _ledger
+    if _ledger is None:
+        with _ledger_lock:
+            if _ledger is None:
+                _ledger = TokenLedger(
+                    directory=os.getenv("SCIENCEGPT_LEDGER_DIR", DEFAULT_LEDGER_DIR),
+                    global_daily=int(os.getenv("TOKEN_BUDGET_GLOBAL_DAILY", "0")),
+                    school_daily=int(os.getenv("TOKEN_BUDGET_SCHOOL_DAILY", "0")),
+                    student_daily=int(os.getenv("TOKEN_BUDGET_STUDENT_DAILY", "0")),
+                    soft_fraction=float(os.getenv("TOKEN_BUDGET_SOFT_FRACTION", "0.8")),
+                    retention_days=int(os.getenv("TOKEN_LEDGER_RETENTION_DAYS", "31"))
+                )
+    return _ledger
@@ -0,0 +1,106 @@
+"""
+Pivot Translation Support for ScienceGPT
+Translation cache and token accounting for English-pivot answers
+"""
+
+import hashlib
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from backend_code.tiered_cache import TieredCache, get_shared_cache
+
+TRANSLATION_TTL_SECONDS = 7 * 24 * 3600
+
+
+class TranslationCache:
+    """Caches translations by content hash and language pair in the tiered cache"""
+
+    def __init__(self, cache: Optional[TieredCache] = None, ttl_seconds: float = TRANSLATION_TTL_SECONDS):
+        self.cache = cache if cache is not None else get_shared_cache()
+        self.ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def _key(text: str, source: str, target: str) -> Tuple[str, str, str]:
+        return (hashlib.sha256(text.encode("utf-8")).hexdigest(), source, target)
+
+    def get(self, text: str, source: str, target: str) -> Optional[str]:
+        return self.cache.get("translation", self._key(text, source, target))
+
+    def put(self, text: str, source: str, target: str, translation: str):
+        self.cache.set("translation", self._key(text, source, target), translation, self.ttl_seconds)
+
+
+class PivotStats:
+    """Per-language answer cache hit rates and tokens saved per language pair"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._lookups: Dict[str, Dict[str, int]] = {}
+        self._pairs: Dict[str, Dict[str, int]] = {}
+
+    def record_lookup(self, language: str, hit: bool):
+        """Record an answer cache lookup for a language"""
+        with self._lock:
+            counts = self._lookups.setdefault(language, {"hits": 0, "misses": 0})
+            counts["hits" if hit else "misses"] += 1
+
+    def record_pivot(self, source: str, target: str, canonical_reused: bool, canonical_tokens: int,
+                     translation_tokens: int):
+        """Record one pivoted answer
+
+        ``canonical_tokens`` is what the English answer cost to generate; when it was
+        reused from cache, those tokens count as saved for this language pair.
+        """
+        with self._lock:
+            pair = self._pairs.setdefault(f"{source}->{target}", {
+                "answers": 0,
+                "canonical_reused": 0,
+                "translation_tokens": 0,
+                "tokens_avoided": 0
+            })
+            pair["answers"] += 1
+            pair["translation_tokens"] += translation_tokens
+            if canonical_reused:
+                pair["canonical_reused"] += 1
+                pair["tokens_avoided"] += canonical_tokens
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit rates per language and net tokens saved per language pair"""
+        with self._lock:
+            languages = {
+                language: {
+                    **counts,
+                    "hit_rate": round(counts["hits"] / (counts["hits"] + counts["misses"]), 4)
+                }
+                for language, counts in self._lookups.items()
+            }
+            pairs = {
+                pair: {**counts, "net_tokens_saved": counts["tokens_avoided"] - counts["translation_tokens"]}
+                for pair, counts in self._pairs.items()
+            }
+            return {"languages": languages, "pairs": pairs}
+
+
+_translation_cache: Optional[TranslationCache] = None
+_pivot_stats: Optional[PivotStats] = None
+_lock = threading.Lock()
+
+
+def get_translation_cache() -> TranslationCache:
+    """Get the process-wide translation cache"""
+    global _translation_cache
+    if _translation_cache is None:
+        with _lock:
+            if _translation_cache is None:
+                _translation_cache = TranslationCache()
+    return _translation_cache
+
+
+def get_pivot_stats() -> PivotStats:
+    """Get the process-wide pivot statistics"""
+    global _pivot_stats
+    if _pivot_stats is None:
+        with _lock:
+            if _pivot_stats is None:
+                _pivot_stats = PivotStats()
+    return _pivot_stats
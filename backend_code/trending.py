@@ -0,0 +1,159 @@
+"""
+Trending Questions for ScienceGPT
+Time-decayed top questions per grade, subject and language from live chat traffic
+"""
+
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend_code.answer_cache import AnswerKey, get_answer_cache, make_answer_key, normalize_question
+from backend_code.cache_warmer import SpaceSaving
+from backend_code.prefilter import get_prefilter
+from backend_code.token_ledger import name_id
+
+PartitionKey = Tuple[int, str, str]
+
+# Rescale counts before the growing decay weights lose float precision
+_MAX_WEIGHT = 1e12
+
+# Distinct askers remembered per question; enough to tell a trend from one keen student
+_MAX_ASKERS = 16
+
+
+class DecayedTopK:
+    """Space-saving sketch whose counts halve every ``half_life_seconds``
+
+    Uses forward decay: each new occurrence is weighted ``2 ** (age / half_life)``
+    relative to a reference time, so old counts never need touching except for an
+    occasional rescale. Memory is fixed at ``capacity`` items.
+    """
+
+    def __init__(self, capacity: int = 64, half_life_seconds: float = 6 * 3600):
+        self.sketch = SpaceSaving(capacity)
+        self.half_life_seconds = half_life_seconds
+        self._epoch = time.time()
+
+    def _weight(self, now: float) -> float:
+        return 2.0 ** ((now - self._epoch) / self.half_life_seconds)
+
+    def offer(self, item: Any, payload: Any = None, now: Optional[float] = None):
+        now = now if now is not None else time.time()
+        weight = self._weight(now)
+        if weight > _MAX_WEIGHT:
+            self.sketch.decay(1.0 / weight)
+            self._epoch = now
+            weight = 1.0
+        self.sketch.offer(item, weight, payload)
+
+    def top(self, k: int, now: Optional[float] = None) -> List[Tuple[Any, float, Any]]:
+        """Get the ``k`` hottest items as (item, decayed count, payload)"""
+        scale = 1.0 / self._weight(now if now is not None else time.time())
+        return [(item, count * scale, payload) for item, count, _, payload in self.sketch.top(k)]
+
+    def payload(self, item: Any) -> Any:
+        return self.sketch.payload(item)
+
+
+class TrendingQuestions:
+    """Most asked questions per (grade, subject, language), cached for instant reads
+
+    Only answered science questions (as the pre-filter classifies them) are
+    recorded, each student counts once per question, and a question is shown only
+    once ``min_students`` different students asked it and its decayed count
+    reaches ``min_count``. One student's questions stay private however often they
+    are repeated, and every trending question has a cached answer.
+    """
+
+    def __init__(self, capacity: int = 64, half_life_seconds: float = 6 * 3600, min_count: float = 1.5,
+                 min_students: int = 3, refresh_seconds: float = 10.0):
+        """Initialize empty partitions"""
+        self.capacity = capacity
+        self.half_life_seconds = half_life_seconds
+        self.min_count = min_count
+        self.min_students = min_students
+        self.refresh_seconds = refresh_seconds
+        self._partitions: Dict[PartitionKey, DecayedTopK] = {}
+        self._snapshots: Dict[PartitionKey, Tuple[float, List[Dict[str, Any]]]] = {}
+        self._lock = threading.Lock()
+        self.stats = {"recorded": 0, "repeats": 0, "filtered": 0, "clicks": 0, "click_cache_hits": 0}
+
+    def record(self, question: str, grade: int, subject: str, language: str, answer_key: AnswerKey,
+               student_id: str):
+        """Count an answered question towards its partition's trend, once per student"""
+        if not student_id or get_prefilter().classify(question) != "science":
+            with self._lock:
+                self.stats["filtered"] += 1
+            return
+        partition = (grade, subject, language)
+        item = normalize_question(question)
+        asker = name_id(student_id)
+        with self._lock:
+            sketch = self._partitions.get(partition)
+            if sketch is None:
+                sketch = self._partitions[partition] = DecayedTopK(self.capacity, self.half_life_seconds)
+            previous = sketch.payload(item)
+            askers = set(previous["askers"]) if previous else set()
+            if asker in askers:
+                self.stats["repeats"] += 1
+                return
+            if len(askers) < _MAX_ASKERS:
+                askers.add(asker)
+            sketch.offer(item, {"question": question.strip(), "answer_key": answer_key, "askers": askers})
+            self.stats["recorded"] += 1
+
+    def top(self, grade: int, subject: str, language: str, k: int = 5) -> List[Dict[str, Any]]:
+        """Get the trending questions for a partition from a snapshot refreshed every few seconds"""
+        partition = (grade, subject, language)
+        now = time.time()
+        with self._lock:
+            snapshot = self._snapshots.get(partition)
+            if snapshot is None or now - snapshot[0] >= self.refresh_seconds:
+                sketch = self._partitions.get(partition)
+                entries = [] if sketch is None else [
+                    {"question": payload["question"], "answer_key": payload["answer_key"], "score": round(score, 2)}
+                    for _, score, payload in sketch.top(self.capacity, now)
+                    if score >= self.min_count and len(payload["askers"]) >= self.min_students
+                ]
+                snapshot = self._snapshots[partition] = (now, entries)
+            return snapshot[1][:k]
+
+    def prepare_click(self, entry: Dict[str, Any], grade: int, subject: str, language: str, topic: str) -> bool:
+        """Make sure a clicked trending question is answered from cache under the current topic
+
+        The trend may have been answered under another topic; that answer is copied
+        to the current key so the click does not call the LLM. Returns True if a
+        cached answer is available.
+        """
+        answer_cache = get_answer_cache()
+        current_key = make_answer_key(entry["question"], grade, subject, language, topic)
+        available = answer_cache.contains(current_key)
+        if not available:
+            cached = answer_cache.get(tuple(entry["answer_key"]))
+            if cached is not None:
+                answer_cache.put(current_key, cached)
+                available = True
+        with self._lock:
+            self.stats["clicks"] += 1
+            if available:
+                self.stats["click_cache_hits"] += 1
+        return available
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get record and click counts"""
+        with self._lock:
+            return {**self.stats, "partitions": len(self._partitions)}
+
+
+_trending: Optional[TrendingQuestions] = None
+_trending_lock = threading.Lock()
+
+
+def get_trending() -> TrendingQuestions:
+    """Get the process-wide trending questions tracker"""
+    global _trending
+    if _trending is None:
+        with _trending_lock:
+            if _trending is None:
+                _trending = TrendingQuestions()
+    return _trending
@@ -0,0 +1,441 @@
+"""
+Video Search for ScienceGPT
+Batched YouTube candidate retrieval, grade-aware ranking and quota accounting
+"""
+
+import asyncio
+import math
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from backend_code.answer_cache import normalize_question
+from backend_code.retrieval_engine import tokenize
+from backend_code.tiered_cache import get_shared_cache
+
+# YouTube Data API quota units per call
+SEARCH_COST = 100
+VIDEOS_LIST_COST = 1
+VIDEOS_LIST_MAX_IDS = 50
+
+POOL_TTL_SECONDS = 7 * 24 * 3600
+
+# REST endpoints used by the async lookups, which call the API over httpx instead of googleapiclient
+YOUTUBE_SEARCH_URL = "https://www.googleapis.com/youtube/v3/search"
+YOUTUBE_VIDEOS_URL = "https://www.googleapis.com/youtube/v3/videos"
+
+# How long a lookup waits on another thread's videos.list batch before giving up
+BATCH_WAIT_SECONDS = 10.0
+
+LANGUAGE_CODES = {
+    "English": "en", "Hindi": "hi", "Marathi": "mr", "Gujarati": "gu", "Tamil": "ta",
+    "Kannada": "kn", "Telugu": "te", "Malayalam": "ml", "Bengali": "bn", "Punjabi": "pa"
+}
+
+# Comfortable video lengths in seconds for each grade band
+GRADE_DURATIONS = [
+    (2, (90, 300)),
+    (5, (120, 480)),
+    (12, (180, 720))
+]
+
+# Channel titles (or channel IDs) ranked above the rest; extend with VIDEO_CHANNEL_ALLOWLIST
+DEFAULT_CHANNEL_ALLOWLIST = {
+    "ncert official", "ciet ncert", "khan academy", "khan academy india", "khan academy hindi",
+    "crashcourse kids", "scishow kids", "peekaboo kidz", "diksha", "national geographic kids"
+}
+
+DURATION_PATTERN = re.compile(r"P(?:(\d+)D)?T?(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?")
+
+
+def parse_duration(value: str) -> int:
+    """Seconds in an ISO 8601 duration such as ``PT4M13S``"""
+    match = DURATION_PATTERN.fullmatch(value or "")
+    if not match:
+        return 0
+    days, hours, minutes, seconds = (int(part or 0) for part in match.groups())
+    return ((days * 24 + hours) * 60 + minutes) * 60 + seconds
+
+
+def duration_fit(seconds: int, grade: int) -> float:
+    """1.0 inside the grade's comfortable length, falling to 0 at twice or half of it; Shorts score 0"""
+    if seconds < 60:
+        return 0.0
+    low, high = next(band for max_grade, band in GRADE_DURATIONS if grade <= max_grade or max_grade == 12)
+    if seconds < low:
+        return max(0.0, 1 - (low - seconds) / (low / 2))
+    if seconds > high:
+        return max(0.0, 1 - (seconds - high) / high)
+    return 1.0
+
+
+def _candidate(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten a ``videos.list`` item into the fields ranking needs"""
+    snippet = item.get("snippet", {})
+    statistics = item.get("statistics", {})
+    return {
+        "id": item["id"],
+        "title": snippet.get("title", ""),
+        "description": snippet.get("description", "")[:300],
+        "channel_id": snippet.get("channelId", ""),
+        "channel_title": snippet.get("channelTitle", ""),
+        "language": (snippet.get("defaultAudioLanguage") or snippet.get("defaultLanguage") or "").lower(),
+        "duration": parse_duration(item.get("contentDetails", {}).get("duration", "")),
+        "views": int(statistics.get("viewCount", 0) or 0),
+        "likes": int(statistics.get("likeCount", 0) or 0)
+    }
+
+
+class _DetailsBatch:
+    """IDs collected for one videos.list flush, and how it ended
+
+    ``done`` is a threading.Event for blocking lookups and an asyncio.Event for
+    lookups on the event loop.
+    """
+
+    __slots__ = ("ids", "done", "error")
+
+    def __init__(self, done: Any = None):
+        self.ids: set = set()
+        self.done = done if done is not None else threading.Event()
+        self.error: Optional[BaseException] = None
+
+
+class VideoSearcher:
+    """Finds a grade-appropriate video per question with as few quota units as possible
+
+    One ``search.list`` per (subject, topic, language) fetches a pool of candidates
+    that is cached and shared by every question on that topic in any grade; a
+    question-specific search only runs when nothing in the pool matches it. Details
+    for all new candidates come from ``videos.list`` calls that are batched across
+    concurrent lookups, up to 50 IDs per call.
+
+    ``find`` uses the blocking googleapiclient service; ``afind`` does the same on
+    the event loop against the REST API with an httpx.AsyncClient and ``api_key``.
+    """
+
+    def __init__(self, service_factory: Callable[[], Any], cache: Any = None, pool_size: int = 25,
+                 question_results: int = 8, min_relevance: float = 0.5, batch_window: float = 0.02,
+                 allow_list: Optional[Iterable[str]] = None, max_details: int = 20_000,
+                 api_key: Optional[str] = None, http: Any = None):
+        """Initialize with a factory for a YouTube Data API client
+
+        ``http`` can be injected in place of the lazily created httpx.AsyncClient.
+        """
+        self.service_factory = service_factory
+        self.api_key = api_key
+        self._http = http
+        self._cache = cache
+        self.pool_size = pool_size
+        self.question_results = question_results
+        self.min_relevance = min_relevance
+        self.batch_window = batch_window
+        self.allow_list = {name.strip().lower() for name in (allow_list or DEFAULT_CHANNEL_ALLOWLIST) if name.strip()}
+        self.max_details = max_details
+        self._details: "OrderedDict[str, Optional[Dict[str, Any]]]" = OrderedDict()
+        self._batch: Optional[_DetailsBatch] = None
+        self._async_batch: Optional[_DetailsBatch] = None
+        self._lock = threading.Lock()
+        self._quota_today = (date.today().isoformat(), 0)
+        self.stats = {
+            "questions": 0, "search_calls": 0, "videos_calls": 0, "video_ids_fetched": 0,
+            "quota_units": 0, "pool_hits": 0, "question_searches": 0, "no_video": 0
+        }
+
+    @property
+    def cache(self):
+        return self._cache if self._cache is not None else get_shared_cache()
+
+    @property
+    def http(self):
+        if self._http is None:
+            import httpx
+            self._http = httpx.AsyncClient(timeout=10.0)
+        return self._http
+
+    def _spend(self, units: int, stat: str):
+        with self._lock:
+            self.stats[stat] += 1
+            self.stats["quota_units"] += units
+            day, used = self._quota_today
+            today = date.today().isoformat()
+            self._quota_today = (today, (used if day == today else 0) + units)
+
+    @staticmethod
+    def _search_params(query: str, language: str, max_results: int) -> Dict[str, Any]:
+        return {
+            "q": query,
+            "part": "id",
+            "maxResults": max_results,
+            "type": "video",
+            "videoCategoryId": "27",  # Category for Education
+            "relevanceLanguage": LANGUAGE_CODES.get(language, "en"),
+            "safeSearch": "strict"
+        }
+
+    def _search_ids(self, response: Dict[str, Any]) -> List[str]:
+        self._spend(SEARCH_COST, "search_calls")
+        return [item["id"]["videoId"] for item in response.get("items", []) if item.get("id", {}).get("videoId")]
+
+    @staticmethod
+    def _details_params(chunk: List[str]) -> Dict[str, Any]:
+        return {"id": ",".join(chunk), "part": "snippet,contentDetails,statistics", "maxResults": len(chunk)}
+
+    def _store_details(self, chunk: List[str], response: Dict[str, Any]):
+        """Keep a videos.list response (None for unavailable videos)"""
+        self._spend(VIDEOS_LIST_COST, "videos_calls")
+        found = {item["id"]: _candidate(item) for item in response.get("items", [])}
+        with self._lock:
+            self.stats["video_ids_fetched"] += len(chunk)
+            for video_id in chunk:
+                self._details[video_id] = found.get(video_id)
+            while len(self._details) > self.max_details:
+                self._details.popitem(last=False)
+
+    def _search(self, query: str, language: str, max_results: int) -> List[str]:
+        """One search.list call returning video IDs"""
+        response = self.service_factory().search().list(**self._search_params(query, language, max_results)).execute()
+        return self._search_ids(response)
+
+    def _fetch_details(self, video_ids: List[str]):
+        """videos.list in chunks of 50 IDs"""
+        for start in range(0, len(video_ids), VIDEOS_LIST_MAX_IDS):
+            chunk = video_ids[start:start + VIDEOS_LIST_MAX_IDS]
+            self._store_details(chunk, self.service_factory().videos().list(**self._details_params(chunk)).execute())
+
+    async def _get(self, url: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        response = await self.http.get(url, params={**params, "key": self.api_key})
+        response.raise_for_status()
+        return response.json()
+
+    async def _asearch(self, query: str, language: str, max_results: int) -> List[str]:
+        """``_search`` over the REST API"""
+        return self._search_ids(await self._get(YOUTUBE_SEARCH_URL, self._search_params(query, language, max_results)))
+
+    async def _afetch_details(self, video_ids: List[str]):
+        """``_fetch_details`` over the REST API"""
+        for start in range(0, len(video_ids), VIDEOS_LIST_MAX_IDS):
+            chunk = video_ids[start:start + VIDEOS_LIST_MAX_IDS]
+            self._store_details(chunk, await self._get(YOUTUBE_VIDEOS_URL, self._details_params(chunk)))
+
+    def _missing(self, video_ids: List[str], batch_attr: str, new_batch: Callable[[], _DetailsBatch]
+                 ) -> Tuple[Optional[_DetailsBatch], bool]:
+        """(batch the IDs without details joined, whether this caller leads it); (None, False) if none are missing"""
+        with self._lock:
+            missing = [video_id for video_id in video_ids if video_id not in self._details]
+            if not missing:
+                return None, False
+            batch = getattr(self, batch_attr)
+            leader = batch is None
+            if leader:
+                batch = new_batch()
+                setattr(self, batch_attr, batch)
+            batch.ids.update(missing)
+            return batch, leader
+
+    def _resolved(self, video_ids: List[str]) -> Tuple[List[Dict[str, Any]], bool]:
+        with self._lock:
+            complete = all(video_id in self._details for video_id in video_ids)
+            return [self._details[video_id] for video_id in video_ids if self._details.get(video_id)], complete
+
+    def _resolve(self, video_ids: List[str]) -> Tuple[List[Dict[str, Any]], bool]:
+        """(details of available videos, whether every ID was resolved), batching concurrent lookups
+
+        Threads arriving within ``batch_window`` share one flush; its leader's API
+        error is raised in every thread waiting on it.
+        """
+        batch, leader = self._missing(video_ids, "_batch", _DetailsBatch)
+        if batch is not None:
+            if leader:
+                time.sleep(self.batch_window)
+                with self._lock:
+                    self._batch = None
+                try:
+                    self._fetch_details(list(batch.ids))
+                except BaseException as e:
+                    batch.error = e
+                    raise
+                finally:
+                    batch.done.set()
+            elif not batch.done.wait(BATCH_WAIT_SECONDS):
+                raise TimeoutError("Timed out waiting for a videos.list batch")
+            elif batch.error is not None:
+                raise batch.error
+        return self._resolved(video_ids)
+
+    async def _aresolve(self, video_ids: List[str]) -> Tuple[List[Dict[str, Any]], bool]:
+        """``_resolve`` for coroutines on one event loop, batching them separately from threads"""
+        batch, leader = self._missing(video_ids, "_async_batch", lambda: _DetailsBatch(asyncio.Event()))
+        if batch is not None:
+            if leader:
+                await asyncio.sleep(self.batch_window)
+                with self._lock:
+                    self._async_batch = None
+                try:
+                    await self._afetch_details(list(batch.ids))
+                except BaseException as e:
+                    batch.error = e
+                    raise
+                finally:
+                    batch.done.set()
+            else:
+                try:
+                    await asyncio.wait_for(batch.done.wait(), BATCH_WAIT_SECONDS)
+                except asyncio.TimeoutError:
+                    raise TimeoutError("Timed out waiting for a videos.list batch") from None
+                if batch.error is not None:
+                    raise batch.error
+        return self._resolved(video_ids)
+
+    def details(self, video_ids: List[str]) -> List[Dict[str, Any]]:
+        """Details for the available videos among ``video_ids``; raises on API errors"""
+        return self._resolve(video_ids)[0]
+
+    def _cached_pool(self, subject: str, topic: str, language: str) -> Tuple[Tuple, Optional[List[Dict[str, Any]]]]:
+        key = ("pool", subject, topic, language)
+        pool = self.cache.get("video", key)
+        if pool is not None:
+            with self._lock:
+                self.stats["pool_hits"] += 1
+        return key, pool
+
+    def _keep(self, key: Tuple, candidates: List[Dict[str, Any]], complete: bool) -> List[Dict[str, Any]]:
+        # Candidates missing details would be served for the whole TTL, so only complete ones are kept
+        if complete:
+            self.cache.set("video", key, candidates, POOL_TTL_SECONDS)
+        return candidates
+
+    def _pool(self, subject: str, topic: str, language: str) -> List[Dict[str, Any]]:
+        """Cached candidate pool for a topic, searched once per TTL; grade only matters when ranking"""
+        key, pool = self._cached_pool(subject, topic, language)
+        if pool is not None:
+            return pool
+        topic_text = subject if topic == "All Topics" else f"{subject} {topic}"
+        return self._keep(key, *self._resolve(self._search(topic_text, language, self.pool_size)))
+
+    async def _apool(self, subject: str, topic: str, language: str) -> List[Dict[str, Any]]:
+        """``_pool`` on the event loop"""
+        key, pool = self._cached_pool(subject, topic, language)
+        if pool is not None:
+            return pool
+        topic_text = subject if topic == "All Topics" else f"{subject} {topic}"
+        return self._keep(key, *await self._aresolve(await self._asearch(topic_text, language, self.pool_size)))
+
+    def score(self, candidate: Dict[str, Any], question_tokens: set, grade: int, language: str) -> Tuple[float, float]:
+        """(score, relevance) of a candidate for a question"""
+        text_tokens = set(tokenize(f"{candidate['title']} {candidate['description']}"))
+        relevance = len(question_tokens & text_tokens) / len(question_tokens) if question_tokens else 0.0
+
+        code = LANGUAGE_CODES.get(language, "en")
+        if not candidate["language"]:
+            language_match = 0.5
+        else:
+            language_match = 1.0 if candidate["language"].startswith(code) else 0.0
+
+        allowed = (candidate["channel_title"].lower() in self.allow_list
+                   or candidate["channel_id"].lower() in self.allow_list)
+        popularity = min(1.0, math.log10(candidate["views"] + 1) / 7)
+        score = (3.0 * relevance + 1.5 * duration_fit(candidate["duration"], grade) + 1.0 * language_match
+                 + (1.0 if allowed else 0.0) + 0.3 * popularity)
+        return score, relevance
+
+    def rank(self, candidates: List[Dict[str, Any]], question: str, grade: int,
+             language: str) -> List[Tuple[float, float, Dict[str, Any]]]:
+        """Candidates as (score, relevance, candidate), best first"""
+        question_tokens = set(tokenize(question))
+        ranked = [(*self.score(candidate, question_tokens, grade, language), candidate) for candidate in candidates]
+        ranked.sort(key=lambda entry: entry[0], reverse=True)
+        return ranked
+
+    def _question_candidates(self, ranked: List[Tuple[float, float, Dict[str, Any]]], question: str, subject: str,
+                             language: str) -> Tuple[Optional[Tuple], Optional[List[Dict[str, Any]]]]:
+        """(cache key, cached candidates) of a question search, or (None, None) when the pool matches well enough"""
+        if ranked and ranked[0][1] >= self.min_relevance:
+            return None, None
+        # Nothing on the topic matches this question well enough: search for it directly
+        query_key = ("question", normalize_question(question), subject, language)
+        candidates = self.cache.get("video", query_key)
+        if candidates is None:
+            with self._lock:
+                self.stats["question_searches"] += 1
+        return query_key, candidates
+
+    def _best(self, ranked: List[Tuple[float, float, Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        if not ranked:
+            with self._lock:
+                self.stats["no_video"] += 1
+            return None
+        return ranked[0][2]
+
+    def _count_question(self):
+        with self._lock:
+            self.stats["questions"] += 1
+
+    def find(self, question: str, grade: int, subject: str, topic: str,
+             language: str = "English") -> Optional[Dict[str, Any]]:
+        """Best video for a question, or None; raises on API errors"""
+        self._count_question()
+        ranked = self.rank(self._pool(subject, topic, language), question, grade, language)
+        query_key, candidates = self._question_candidates(ranked, question, subject, language)
+        if query_key is not None:
+            if candidates is None:
+                candidates = self._keep(query_key, *self._resolve(
+                    self._search(f"{question} {subject}", language, self.question_results)))
+            ranked = self.rank(candidates + [entry[2] for entry in ranked], question, grade, language)
+        return self._best(ranked)
+
+    async def afind(self, question: str, grade: int, subject: str, topic: str,
+                    language: str = "English") -> Optional[Dict[str, Any]]:
+        """``find`` on the event loop over the REST API; raises on API errors"""
+        self._count_question()
+        ranked = self.rank(await self._apool(subject, topic, language), question, grade, language)
+        query_key, candidates = self._question_candidates(ranked, question, subject, language)
+        if query_key is not None:
+            if candidates is None:
+                candidates = self._keep(query_key, *await self._aresolve(
+                    await self._asearch(f"{question} {subject}", language, self.question_results)))
+            ranked = self.rank(candidates + [entry[2] for entry in ranked], question, grade, language)
+        return self._best(ranked)
+
+    def find_url(self, question: str, grade: int, subject: str, topic: str, language: str = "English") -> Optional[str]:
+        """Watch URL of the best video for a question, or None"""
+        best = self.find(question, grade, subject, topic, language)
+        return f"https://www.youtube.com/watch?v={best['id']}" if best else None
+
+    async def afind_url(self, question: str, grade: int, subject: str, topic: str,
+                        language: str = "English") -> Optional[str]:
+        """``find_url`` on the event loop"""
+        best = await self.afind(question, grade, subject, topic, language)
+        return f"https://www.youtube.com/watch?v={best['id']}" if best else None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get quota spent overall, today and per answered question"""
+        with self._lock:
+            questions = self.stats["questions"]
+            return {
+                **self.stats,
+                "quota_units_today": self._quota_today[1] if self._quota_today[0] == date.today().isoformat() else 0,
+                "units_per_question": round(self.stats["quota_units"] / questions, 2) if questions else 0.0,
+                "ids_per_videos_call": (round(self.stats["video_ids_fetched"] / self.stats["videos_calls"], 1)
+                                        if self.stats["videos_calls"] else 0.0),
+                "cached_details": len(self._details)
+            }
+
+
+_searchers: Dict[str, VideoSearcher] = {}
+_searchers_lock = threading.Lock()
+
+
+def get_video_searcher(api_key: str, service_factory: Callable[[], Any]) -> VideoSearcher:
+    """Get the process-wide video searcher for a YouTube API key"""
+    if api_key not in _searchers:
+        with _searchers_lock:
+            if api_key not in _searchers:
+                allow_list = set(DEFAULT_CHANNEL_ALLOWLIST)
+                allow_list.update(os.getenv("VIDEO_CHANNEL_ALLOWLIST", "").split(","))
+                _searchers[api_key] = VideoSearcher(service_factory, allow_list=allow_list, api_key=api_key)
+    return _searchers[api_key]
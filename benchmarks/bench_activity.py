@@ -0,0 +1,76 @@
+"""
+Activity Tracker Benchmark for ScienceGPT
+Per-rerun enqueue overhead and background flush throughput under concurrent sessions
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend_code.activity_tracker import ActivityTracker, new_progress_data
+
+
+def session_worker(tracker: ActivityTracker, session_id: str, reruns: int, latencies: list,
+                   records: list):
+    """Simulate one browser session: a heartbeat per rerun and a question every third rerun"""
+    data = new_progress_data()
+    records.append(data)
+    local = []
+    for i in range(reruns):
+        start = time.perf_counter_ns()
+        tracker.heartbeat(session_id, data, 6, "English")
+        if i % 3 == 0:
+            tracker.question(session_id, "Physics", 6, "Light")
+        local.append(time.perf_counter_ns() - start)
+    latencies.extend(local)
+
+
+def main(sessions: int = 2000, reruns: int = 50, threads: int = 16):
+    tracker = ActivityTracker(flush_interval=0.05, start_thread=True)
+    latencies: list = []
+    records: list = []
+    per_thread = sessions // threads
+
+    def run(offset: int):
+        for s in range(offset, offset + per_thread):
+            session_worker(tracker, f"session-{s}", reruns, latencies, records)
+
+    start = time.perf_counter()
+    workers = [threading.Thread(target=run, args=(t * per_thread,)) for t in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    produce_s = time.perf_counter() - start
+
+    while tracker.get_stats()["queued"]:
+        time.sleep(0.01)
+    tracker.flush()
+    total_s = time.perf_counter() - start
+
+    latencies.sort()
+    stats = tracker.get_stats()
+    print(f"{sessions:,} sessions x {reruns} reruns on {threads} threads: {stats['enqueued']:,} events "
+          f"queued, {stats['coalesced']:,} heartbeats coalesced")
+    print(f"Per-rerun tracking cost: p50 {latencies[len(latencies) // 2] / 1000:.2f} us, "
+          f"p99 {latencies[int(len(latencies) * 0.99)] / 1000:.2f} us")
+    print(f"Produced in {produce_s:.2f} s, all applied after {total_s:.2f} s "
+          f"({stats['applied'] / total_s:,.0f} events/s), {stats['batches']} batches, "
+          f"max lag {stats['max_lag_ms']:.0f} ms, dropped {stats['dropped']} "
+          f"(+{stats['dropped_heartbeats']} heartbeats)")
+    print(f"Sessions started: {stats['sessions_started']:,}, tracked: {stats['tracked_sessions']:,}")
+
+    # Every question must reach progress data; a lossy tracker fails the benchmark
+    expected = sessions // threads * threads * ((reruns + 2) // 3)
+    counted = sum(data["performance_metrics"]["total_questions"] for data in records)
+    if stats["dropped"] or stats["dropped_heartbeats"] or counted != expected:
+        raise SystemExit(f"FAIL: {counted:,} of {expected:,} questions counted, "
+                         f"{stats['dropped'] + stats['dropped_heartbeats']} events dropped")
+    print(f"All {counted:,} questions counted")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Async Benchmark for ScienceGPT
+Compares the provider router and video search on threads with their async paths at 200 concurrent chats
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend_code.async_llm import get_event_loop
+from backend_code.llm_providers import FakeProvider, ProviderRouter
+from backend_code.video_search import YOUTUBE_SEARCH_URL, VideoSearcher
+
+CONCURRENT_CHATS = 200
+LLM_LATENCY = 0.8      # seconds to the first token of a completion
+YOUTUBE_LATENCY = 0.25  # seconds per YouTube Data API call
+
+MESSAGES = [{"role": "user", "content": "Why is the sky blue?"}]
+QUESTION = "Why is the sky blue?"
+
+
+def _youtube_response(url: str, params: dict) -> dict:
+    """search.list or videos.list payload for a single matching video"""
+    if url == YOUTUBE_SEARCH_URL:
+        return {"items": [{"id": {"videoId": "abc123"}}]}
+    return {"items": [{
+        "id": video_id,
+        "snippet": {"title": "Why is the sky blue", "description": "Rayleigh scattering", "channelTitle": "Khan Academy"},
+        "contentDetails": {"duration": "PT5M"},
+        "statistics": {"viewCount": "100000"}
+    } for video_id in params["id"].split(",")]}
+
+
+class FakeService:
+    """Stand-in for the blocking googleapiclient YouTube service"""
+
+    def _request(self, url):
+        def list_(**params):
+            def execute():
+                time.sleep(YOUTUBE_LATENCY)
+                return _youtube_response(url, params)
+            return SimpleNamespace(execute=execute)
+        return lambda: SimpleNamespace(list=list_)
+
+    def __getattr__(self, name):
+        return self._request(YOUTUBE_SEARCH_URL if name == "search" else "videos")
+
+
+class FakeAsyncHTTP:
+    """Stand-in for httpx.AsyncClient answering YouTube REST calls"""
+
+    async def get(self, url, params=None):
+        await asyncio.sleep(YOUTUBE_LATENCY)
+        payload = _youtube_response(url, params)
+        return SimpleNamespace(raise_for_status=lambda: None, json=lambda: payload)
+
+
+class NoCache:
+    """Shared cache that never hits, so every chat searches"""
+
+    def get(self, namespace, key):
+        return None
+
+    def set(self, namespace, key, value, ttl):
+        pass
+
+
+def make_router() -> ProviderRouter:
+    provider = FakeProvider(ttft_median=LLM_LATENCY, ttft_sigma=0.0, text="Because of Rayleigh scattering.")
+    return ProviderRouter([provider], hedge=False, max_workers=CONCURRENT_CHATS)
+
+
+def make_searcher() -> VideoSearcher:
+    return VideoSearcher(FakeService, cache=NoCache(), api_key="fake", http=FakeAsyncHTTP())
+
+
+class ThreadSampler:
+    """Samples the process thread count to find how many threads a run added at its peak
+
+    Idle pool threads left over from earlier runs are in the baseline, not the peak.
+    """
+
+    def __init__(self):
+        self.baseline = self.peak = threading.active_count()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, threading.active_count())
+            time.sleep(0.005)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_threads(pool_size: int):
+    """Answer all chats on a thread pool of the given size with the blocking router and video search"""
+    router, searcher = make_router(), make_searcher()
+
+    def chat(_):
+        text = router.create("fake-model", MESSAGES, temperature=0.6, max_tokens=1000).choices[0].message.content
+        return text, searcher.find_url(QUESTION, 6, "Physics", "All Topics")
+
+    with ThreadSampler() as sampler:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=pool_size) as pool:
+            list(pool.map(chat, range(CONCURRENT_CHATS)))
+        elapsed = time.perf_counter() - start
+    return elapsed, sampler.peak - sampler.baseline
+
+
+def run_async():
+    """Answer all chats as coroutines on the shared event loop with acreate and afind"""
+    router, searcher = make_router(), make_searcher()
+
+    async def chat():
+        return await asyncio.gather(
+            router.acreate("fake-model", MESSAGES, temperature=0.6, max_tokens=1000),
+            searcher.afind_url(QUESTION, 6, "Physics", "All Topics")
+        )
+
+    async def all_chats():
+        return await asyncio.gather(*(chat() for _ in range(CONCURRENT_CHATS)))
+
+    loop = get_event_loop()
+    with ThreadSampler() as sampler:
+        start = time.perf_counter()
+        results = asyncio.run_coroutine_threadsafe(all_chats(), loop).result()
+        elapsed = time.perf_counter() - start
+    assert all(url for _, url in results), "every chat should find the video"
+    return elapsed, sampler.peak - sampler.baseline
+
+
+def main():
+    """Print wall time, throughput and threads added at the peak for each mode"""
+    print(f"{CONCURRENT_CHATS} concurrent chats, LLM first token {LLM_LATENCY}s, YouTube calls {YOUTUBE_LATENCY}s\n")
+    print(f"{'mode':<22}{'wall (s)':>10}{'chats/s':>10}{'threads added':>15}")
+    for pool_size in (8, 32, CONCURRENT_CHATS):
+        elapsed, peak = run_threads(pool_size)
+        print(f"{f'threads x{pool_size}':<22}{elapsed:>10.2f}{CONCURRENT_CHATS / elapsed:>10.1f}{peak:>15}")
+    elapsed, peak = run_async()
+    print(f"{'asyncio (1 loop)':<22}{elapsed:>10.2f}{CONCURRENT_CHATS / elapsed:>10.1f}{peak:>15}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Cache Warmer Benchmark for ScienceGPT
+First-request hit rate on a skewed second day of traffic, with and without warming
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend_code.answer_cache import make_answer_key
+from backend_code.cache_warmer import CacheWarmer
+
+COMBINATIONS = [(grade, subject, "English", "All Topics")
+                for grade in range(3, 13) for subject in ("Physics", "Chemistry", "Biology", "General Science")]
+
+
+class FakeHandler:
+    """Stands in for LLMHandler: caches in a dict and charges a fixed token cost"""
+
+    def __init__(self):
+        self.cache = set()
+
+    def warm_suggestions(self, grade, subject, language, topic):
+        return self._fill(("suggestions", grade, subject, language, topic), 600)
+
+    def warm_fact_pool(self, grade, subject, topic):
+        return self._fill(("fact", grade, subject, topic), 1000)
+
+    def warm_answer(self, question, grade, subject, language, topic):
+        return self._fill(make_answer_key(question, grade, subject, language, topic), 900)
+
+    def _fill(self, key, tokens):
+        if key in self.cache:
+            return None
+        self.cache.add(key)
+        return tokens
+
+
+def traffic(rng: random.Random, requests: int, questions: int, skew: float):
+    """Yield (combination, question) pairs with Zipf-like popularity"""
+    weights = [1 / (rank + 1) ** skew for rank in range(questions)]
+    population = [(COMBINATIONS[i % len(COMBINATIONS)], f"question {i}") for i in range(questions)]
+    for _ in range(requests):
+        yield rng.choices(population, weights)[0]
+
+
+def simulate_day(warmer: CacheWarmer, handler: FakeHandler, rng: random.Random, requests: int,
+                 questions: int, skew: float):
+    """Serve a day of answer requests, filling the cache on misses like the app does"""
+    for (grade, subject, language, topic), question in traffic(rng, requests, questions, skew):
+        key = make_answer_key(question, grade, subject, language, topic)
+        warmer.record("answer", key, key in handler.cache, payload=question)
+        handler.cache.add(key)
+
+
+def run(warm: bool, requests: int, questions: int, skew: float, tokens_per_day: int):
+    rng = random.Random(7)
+    handler = FakeHandler()
+    warmer = CacheWarmer(top_n=200, tokens_per_day=tokens_per_day, enabled=warm)
+    warmer.attach(handler)
+
+    simulate_day(warmer, handler, rng, requests, questions, skew)
+    handler.cache.clear()  # answers expire overnight
+
+    start = time.perf_counter()
+    jobs = warmer.run_once(force=True)
+    warm_ms = (time.perf_counter() - start) * 1000
+
+    day_two = CacheWarmer(capacity=questions, enabled=False)
+    simulate_day(day_two, handler, rng, requests, questions, skew)
+    stats = day_two.get_stats()
+    lookups = stats["lookups"]["answer"]
+    hit_rate = lookups["hits"] / (lookups["hits"] + lookups["misses"])
+    return (jobs["answer"], warmer.get_stats()["tokens_spent"], warm_ms,
+            stats["first_request_hit_rate"]["answer"], hit_rate)
+
+
+def main(requests: int = 20_000, questions: int = 5_000, skew: float = 1.1, tokens_per_day: int = 150_000):
+    print(f"{requests:,} requests/day over {questions:,} questions (Zipf s={skew}), "
+          f"warm-up budget {tokens_per_day:,} tokens")
+    for warm in (False, True):
+        jobs, tokens, warm_ms, first_hit_rate, hit_rate = run(warm, requests, questions, skew, tokens_per_day)
+        label = "with warmer" if warm else "no warmer  "
+        print(f"{label}: {jobs:4d} answers warmed, {tokens:7,} tokens, {warm_ms:6.1f} ms pass, "
+              f"day two: first-request hit rate {first_hit_rate:.1%}, overall {hit_rate:.1%}")
+
+
+if __name__ == "__main__":
+    main()
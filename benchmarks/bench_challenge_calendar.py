@@ -0,0 +1,72 @@
+"""
+Challenge Calendar Benchmark for ScienceGPT
+Date lookups across every grade and subject calendar, and completion-history queries on day bitmaps
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend_code.challenge_calendar import (
+    ChallengeCalendar, count_marked, current_streak, mark_day, new_day_bitmap
+)
+from backend_code.curriculum_data import CurriculumData
+
+
+def main(months: int = 12, lookups: int = 200_000, students: int = 10_000):
+    calendar = ChallengeCalendar(os.path.join(tempfile.mkdtemp(), "challenges.sqlite3"))
+    curriculum = CurriculumData()
+    combos = [(grade, subject) for grade, subjects in curriculum.grade_subjects.items() for subject in subjects]
+    first = date.today().replace(day=1)
+    month_starts = [first]
+    for _ in range(months - 1):
+        month_starts.append((month_starts[-1] + timedelta(days=32)).replace(day=1))
+
+    start = time.perf_counter()
+    for grade, subject in combos:
+        for month in month_starts:
+            calendar.ensure_month(grade, subject, month,
+                                  lambda days: [f"Grade {grade} {subject} challenge {i + 1}" for i in range(days)])
+    build_s = time.perf_counter() - start
+
+    rng = random.Random(4)
+    days = [month_starts[0] + timedelta(days=rng.randrange(28 * months)) for _ in range(lookups)]
+    keys = [rng.choice(combos) for _ in range(lookups)]
+    start = time.perf_counter()
+    for (grade, subject), day in zip(keys, days):
+        calendar.lookup(grade, subject, day)
+    lookup_us = (time.perf_counter() - start) / lookups * 1e6
+
+    # A year of completions per student, about 4 days in 5
+    today = date.today()
+    bitmaps = []
+    for _ in range(students):
+        bitmap = new_day_bitmap()
+        for offset in range(365):
+            if rng.random() < 0.8:
+                mark_day(bitmap, today - timedelta(days=offset))
+        bitmaps.append(bitmap)
+
+    start = time.perf_counter()
+    for bitmap in bitmaps:
+        count_marked(bitmap, today - timedelta(days=364), today)
+    year_us = (time.perf_counter() - start) / students * 1e6
+    start = time.perf_counter()
+    for bitmap in bitmaps:
+        current_streak(bitmap, today)
+    streak_us = (time.perf_counter() - start) / students * 1e6
+
+    stats = calendar.get_stats()
+    print(f"{stats['months']} month calendars for {len(combos)} grade/subject pairs built in {build_s:.2f} s")
+    print(f"challenge for a date: {lookup_us:.2f} us")
+    print(f"completion bitmap: {sum(len(b['bits']) for b in bitmaps) / students:.0f} bytes per student-year; "
+          f"days done in a year {year_us:.1f} us, current streak {streak_us:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
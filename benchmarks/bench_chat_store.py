@@ -0,0 +1,98 @@
+"""
+Chat Store Benchmark for ScienceGPT
+Storage per message, first-page load and keyword search latency at 1M stored messages
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend_code.chat_store import ChatStore
+from backend_code.curriculum_data import CurriculumData
+from backend_code.session_memory import ChatMessage
+
+SENTENCES = [
+    "{topic} is an important idea in {subject} that we can see all around us.",
+    "Think about what happens to {word} when you watch it closely at home or at school.",
+    "Scientists explain {topic} by looking at how {word} changes over time.",
+    "A simple experiment: take some {word}, observe it for a few minutes and write down what you notice.",
+    "This is why {word} behaves differently on a hot day than on a cold day.",
+    "Remember, {topic} connects to many other topics in {subject}, like {other}.",
+    "In everyday life you can find examples of {topic} in the kitchen, the garden and the playground.",
+    "Great question! Let's break {topic} down into small steps so it is easy to remember.",
+    "The key idea is that energy and matter are never lost, they only change form.",
+    "Try explaining {topic} to a friend in your own words, it helps you learn!"
+]
+
+WORDS = ["water", "light", "plants", "magnets", "air", "soil", "the sun", "sound", "ice", "seeds", "rocks",
+         "electricity", "friction", "shadows", "animals", "the moon", "clouds", "muscles", "bones", "heat"]
+
+
+def make_turn(rng: random.Random, subject: str, topics: list):
+    topic, other = rng.sample(topics, 2)
+    word = rng.choice(WORDS)
+    question = f"Why does {word} matter for {topic}?"
+    answer = " ".join(rng.choice(SENTENCES).format(topic=topic, subject=subject, word=rng.choice(WORDS), other=other)
+                      for _ in range(rng.randint(5, 9)))
+    return question, answer
+
+
+def main(messages: int = 1_000_000, students: int = 5_000, searches: int = 2_000):
+    path = os.path.join(tempfile.mkdtemp(), "chat.sqlite3")
+    store = ChatStore(path)
+    curriculum = CurriculumData()
+    subjects = [(subject, topics) for subject, topics in curriculum.topics.items() if len(topics) >= 2]
+    rng = random.Random(11)
+
+    start = time.perf_counter()
+    per_student = messages // students // 2
+    for student in range(students):
+        subject, topics = subjects[student % len(subjects)]
+        turns = []
+        for _ in range(per_student):
+            question, answer = make_turn(rng, subject, topics)
+            turns.append((ChatMessage("user", question), subject, None))
+            turns.append((ChatMessage("assistant", answer, "https://www.youtube.com/watch?v=abcdefghijk"),
+                          subject, question))
+        store.append_many(f"student-{student}", turns)
+    insert_s = time.perf_counter() - start
+    store._connection().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    stats = store.get_stats()
+
+    page_latencies = []
+    for _ in range(searches):
+        student_id = f"student-{rng.randrange(students)}"
+        t = time.perf_counter()
+        store.page(student_id, 10)
+        page_latencies.append((time.perf_counter() - t) * 1000)
+
+    search_latencies = []
+    hits = 0
+    for _ in range(searches):
+        student = rng.randrange(students)
+        _, topics = subjects[student % len(subjects)]
+        query = f"{rng.choice(WORDS)} {rng.choice(topics)}"
+        t = time.perf_counter()
+        hits += len(store.search(f"student-{student}", query))
+        search_latencies.append((time.perf_counter() - t) * 1000)
+
+    def pct(values, q):
+        values = sorted(values)
+        return values[int(len(values) * q)]
+
+    print(f"{stats['appended']:,} messages for {students:,} students stored in {insert_s:.0f} s")
+    print(f"text: {stats['raw_bytes'] / stats['appended']:.0f} B/message raw, "
+          f"{stats['stored_bytes'] / stats['appended']:.0f} B/message stored ({stats['compression_ratio']}x)")
+    print(f"database file incl. index: {stats['file_bytes'] / stats['appended']:.0f} B/message "
+          f"({stats['file_bytes'] / 1e6:.0f} MB)")
+    print(f"first page of 10: p50 {pct(page_latencies, 0.5):.2f} ms, p99 {pct(page_latencies, 0.99):.2f} ms")
+    print(f"keyword search: p50 {pct(search_latencies, 0.5):.2f} ms, p99 {pct(search_latencies, 0.99):.2f} ms, "
+          f"{hits / searches:.1f} hits per search")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,81 @@
+"""
+Fair Share Benchmark for ScienceGPT
+One abusive client flooding the server alongside normal students, with and without fair share
+"""
+
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend_code.fair_share import FairShareScheduler
+
+LLM_SECONDS = 0.05
+TOKENS_PER_ANSWER = 800
+
+
+def fake_llm_call():
+    time.sleep(LLM_SECONDS)
+    return TOKENS_PER_ANSWER
+
+
+def ask(scheduler: FairShareScheduler, student_id: str, class_id: str, latencies: dict, outcomes: dict,
+        lock: threading.Lock):
+    """One chat request through the scheduler; records end-to-end latency and outcome"""
+    start = time.perf_counter()
+    admission = scheduler.acquire(student_id, class_id)
+    tokens = 0
+    try:
+        if admission.admitted:
+            tokens = fake_llm_call()
+    finally:
+        scheduler.release(admission, tokens)
+    with lock:
+        outcomes.setdefault(student_id, {}).setdefault(admission.status, 0)
+        outcomes[student_id][admission.status] += 1
+        if admission.admitted:
+            latencies.setdefault(student_id, []).append((time.perf_counter() - start) * 1000)
+
+
+def run(fair: bool, abusive_requests: int = 400, students: int = 20, questions_each: int = 3):
+    """Flood from one client while normal students ask a few questions each"""
+    if fair:
+        scheduler = FairShareScheduler(max_concurrent=4, student_tokens_per_minute=6000, student_burst=8000)
+    else:
+        # Same concurrency limit, but effectively no quotas and plain arrival order
+        scheduler = FairShareScheduler(max_concurrent=4, student_tokens_per_minute=1e12, student_burst=1e12,
+                                       class_tokens_per_minute=1e12, class_burst=1e12)
+        scheduler.request_cost = 0.0
+
+    latencies, outcomes, lock = {}, {}, threading.Lock()
+    with ThreadPoolExecutor(max_workers=64) as pool:
+        for _ in range(abusive_requests):
+            pool.submit(ask, scheduler, "abuser", "6A", latencies, outcomes, lock)
+        time.sleep(0.1)  # the flood is already queued when normal students arrive
+        for q in range(questions_each):
+            for s in range(students):
+                pool.submit(ask, scheduler, f"student-{s}", "6B", latencies, outcomes, lock)
+            time.sleep(0.2)
+
+    normal = sorted(ms for student_id, values in latencies.items() if student_id != "abuser" for ms in values)
+    abuser = outcomes.get("abuser", {})
+    label = "fair share" if fair else "FIFO      "
+    print(f"{label}: normal students p50 {normal[len(normal) // 2]:7.1f} ms, "
+          f"p95 {normal[int(len(normal) * 0.95)]:7.1f} ms | abuser admitted {abuser.get('admitted', 0)}, "
+          f"throttled {abuser.get('throttled', 0)}, timed out {abuser.get('timeout', 0)}")
+    return scheduler
+
+
+def main():
+    print(f"Fake LLM: {LLM_SECONDS * 1000:.0f} ms per answer, 4 concurrent calls; abuser sends 400 requests at once")
+    run(fair=False)
+    scheduler = run(fair=True)
+    print("Abuser stats:", scheduler.get_student_stats("abuser"))
+    print("Typical student stats:", scheduler.get_student_stats("student-0"))
+
+
+if __name__ == "__main__":
+    main()
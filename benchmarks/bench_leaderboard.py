@@ -0,0 +1,53 @@
+"""
+Leaderboard Benchmark for ScienceGPT
+Score updates, top-K and rank lookups on a 1M-student leaderboard
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend_code.leaderboard import Leaderboard
+
+
+def main(students: int = 1_000_000, queries: int = 20_000):
+    """Build a leaderboard, then time updates, rank queries and top-K reads"""
+    rng = random.Random(42)
+    board = Leaderboard()
+
+    start = time.perf_counter()
+    for i in range(students):
+        board.update(f"student-{i}", rng.randint(0, 5000))
+    build_s = time.perf_counter() - start
+    print(f"Built {students:,} students in {build_s:.1f} s ({build_s / students * 1e6:.1f} us/insert)")
+
+    ids = [f"student-{rng.randrange(students)}" for _ in range(queries)]
+
+    start = time.perf_counter()
+    for student_id in ids:
+        board.update(student_id, rng.randint(0, 5000))
+    update_us = (time.perf_counter() - start) / queries * 1e6
+
+    latencies = []
+    for student_id in ids:
+        t = time.perf_counter()
+        board.rank(student_id)
+        latencies.append((time.perf_counter() - t) * 1e6)
+    latencies.sort()
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        board.top(10)
+    top_us = (time.perf_counter() - start) / 1000 * 1e6
+
+    print(f"Score update:   {update_us:.1f} us avg")
+    print(f"Rank query:     p50 {latencies[len(latencies) // 2]:.1f} us, "
+          f"p99 {latencies[int(len(latencies) * 0.99)]:.1f} us, max {latencies[-1]:.1f} us")
+    print(f"Top-10 query:   {top_us:.1f} us avg")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,79 @@
+"""
+Quiz Bank Benchmark for ScienceGPT
+Selection latency with tens of thousands of items and local grading throughput
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend_code.curriculum_data import CurriculumData
+from backend_code.quiz_bank import ITEM_KINDS, QuizBank, QuizItem
+
+
+def synthetic_items(per_combination: int, seed: int = 5):
+    """Items for every grade, subject and topic in the curriculum"""
+    rng = random.Random(seed)
+    curriculum = CurriculumData()
+    for grade, subjects in curriculum.grade_subjects.items():
+        for subject in subjects:
+            for topic in curriculum.topics[subject]:
+                for n in range(per_combination):
+                    kind = ITEM_KINDS[n % 3]
+                    if kind == "mcq":
+                        yield QuizItem(grade, subject, topic, rng.randint(1, 3), kind, f"{topic} question {n}?",
+                                       rng.randrange(4), ["A", "B", "C", "D"])
+                    elif kind == "true_false":
+                        yield QuizItem(grade, subject, topic, rng.randint(1, 3), kind, f"{topic} statement {n}.",
+                                       rng.random() < 0.5)
+                    else:
+                        yield QuizItem(grade, subject, topic, rng.randint(1, 3), kind, f"{topic} number {n}?",
+                                       float(rng.randint(1, 100)), tolerance=0.5)
+
+
+def main(per_combination: int = 120, selections: int = 20_000):
+    path = os.path.join(tempfile.mkdtemp(), "quiz_bank.sqlite3")
+    bank = QuizBank(path)
+    start = time.perf_counter()
+    added = bank.add_items(synthetic_items(per_combination))
+    insert_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    reloaded = QuizBank(path)
+    load_s = time.perf_counter() - start
+
+    curriculum = CurriculumData()
+    combos = [(grade, subject, topic) for grade, subjects in curriculum.grade_subjects.items()
+              for subject in subjects for topic in curriculum.topics[subject] + ["All Topics"]]
+    rng = random.Random(1)
+    latencies = []
+    seen: set = set()
+    for _ in range(selections):
+        grade, subject, topic = rng.choice(combos)
+        difficulty = rng.choice([None, 1, 2, 3])
+        t = time.perf_counter_ns()
+        items = reloaded.select(grade, subject, topic, difficulty, 5, exclude=seen, rng=rng)
+        latencies.append(time.perf_counter_ns() - t)
+        seen.update(item.id for item in items[:2])
+    latencies.sort()
+
+    items = reloaded.select(6, "Physics", "Light", count=5)
+    responses = [item.answer for item in items]
+    start = time.perf_counter()
+    for _ in range(10_000):
+        reloaded.grade(items, responses)
+    grade_us = (time.perf_counter() - start) / 10_000 * 1e6
+
+    print(f"{added:,} items across {reloaded.get_stats()['combinations']} combinations "
+          f"(inserted in {insert_s:.2f} s, loaded in {load_s * 1000:.0f} ms)")
+    print(f"select 5 items: p50 {latencies[len(latencies) // 2] / 1000:.1f} us, "
+          f"p99 {latencies[int(len(latencies) * 0.99)] / 1000:.1f} us")
+    print(f"grade a 5-item quiz: {grade_us:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Retrieval Benchmark for ScienceGPT
+Measures index build time, query latency and LLM-call avoidance offline
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend_code.retrieval_engine import RetrievalEngine
+
+# (question, grade, subject, language) samples mixing definitional and open questions
+SAMPLE_QUESTIONS = [
+    ("What is photosynthesis?", 7, "Biology", "English"),
+    ("What is a habitat?", 4, "Environmental Studies", "English"),
+    ("What is matter?", 6, "Science", "English"),
+    ("Define friction", 7, "Physics", "English"),
+    ("What is the water cycle?", 5, "General Science", "English"),
+    ("What are simple machines?", 4, "General Science", "English"),
+    ("What is rusting?", 8, "Chemistry", "English"),
+    ("What is heredity?", 8, "Biology", "English"),
+    ("What is a shadow?", 3, "General Science", "English"),
+    ("What is biodiversity?", 8, "Biology", "English"),
+    ("Why do we see different shapes of the moon?", 5, "General Science", "English"),
+    ("How do magnets help a compass point north?", 7, "Physics", "English"),
+    ("Why is the sky blue during the day?", 6, "Science", "English"),
+    ("How would life change if there were no friction?", 8, "Physics", "English"),
+    ("What is photosynthesis?", 7, "Biology", "Hindi"),
+    ("Can you compare acids and bases with examples from the kitchen?", 7, "Chemistry", "English"),
+    ("Why do camels have humps?", 4, "Environmental Studies", "English"),
+    ("What causes earthquakes?", 8, "Science", "English"),
+    ("How are dinosaurs related to birds?", 8, "Biology", "English"),
+    ("What is the structure of an atom?", 8, "Chemistry", "English"),
+]
+
+
+def main(rounds: int = 500):
+    """Run the sample questions through a fresh engine and print the statistics"""
+    start = time.perf_counter()
+    engine = RetrievalEngine()
+    print(f"Index build: {(time.perf_counter() - start) * 1000:.2f} ms "
+          f"({len(engine.partitions)} partitions, {len(engine.passages)} passages)")
+
+    latencies = []
+    for _ in range(rounds):
+        for question, grade, subject, language in SAMPLE_QUESTIONS:
+            latencies.append(engine.retrieve(question, grade, subject, language)["latency_ms"])
+
+    latencies.sort()
+    stats = engine.get_stats()
+    print(f"Queries: {stats['queries']}")
+    print(f"Latency p50: {latencies[len(latencies) // 2]:.4f} ms, "
+          f"p99: {latencies[int(len(latencies) * 0.99)]:.4f} ms")
+    print(f"Answered locally: {stats['answered_locally']}, grounded: {stats['grounded']}, "
+          f"no match: {stats['no_match']}")
+    print(f"LLM-call avoidance rate: {stats['llm_avoidance_rate']:.1%}")
+
+    print("\nPer-question decisions:")
+    for question, grade, subject, language in SAMPLE_QUESTIONS:
+        result = engine.retrieve(question, grade, subject, language)
+        title = result["answer"]["title"] if result["answer"] else "-"
+        print(f"  [{result['mode']:>8}] {question} ({language}) -> {title}")
+
+
+if __name__ == "__main__":
+    main()
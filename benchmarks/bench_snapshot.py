@@ -0,0 +1,100 @@
+"""
+Session Snapshot Benchmark for ScienceGPT
+msgpack + zlib snapshots against the JSON path used by export_progress_data
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend_code.activity_tracker import new_progress_data
+from backend_code.session_memory import ChatHistory, ChatMessage
+from backend_code.session_snapshot import SessionSnapshotter, SnapshotStore, decode, encode
+
+SUBJECTS = ["Physics", "Chemistry", "Biology", "General Science"]
+
+
+def build_state(rng: random.Random) -> dict:
+    """A long-lived session: 200 learning sessions, a full chat window and a year of visits"""
+    progress = new_progress_data()
+    start = datetime(2026, 1, 1, 9)
+    for i in range(200):
+        begin = start + timedelta(days=i, minutes=rng.randrange(600))
+        progress["sessions"].append({
+            "start_time": begin.isoformat(),
+            "end_time": (begin + timedelta(minutes=rng.randrange(5, 60))).isoformat(),
+            "questions_asked": rng.randrange(1, 15),
+            "subjects_covered": rng.sample(SUBJECTS, 2),
+            "grade": 6,
+            "language": "English"
+        })
+    for subject in SUBJECTS:
+        progress["questions_by_subject"][subject] = rng.randrange(50, 500)
+        progress["topic_coverage"][subject] = {f"{subject} topic {t}" for t in range(12)}
+
+    history = ChatHistory(spill_dir=tempfile.mkdtemp())
+    for i in range(40):
+        history.append(ChatMessage("user", f"Question {i} about how plants make food using sunlight?"))
+        history.append(ChatMessage("assistant", "Plants make food by photosynthesis. " * 30,
+                                   "https://www.youtube.com/watch?v=abc123"))
+
+    gamification = {
+        "points": 4200, "badges": ["first_question", "curious_mind"], "questions_asked": 420,
+        "subjects_explored": set(SUBJECTS), "facts_generated": 37, "streak_days": 12,
+        "last_visit": datetime.now(), "daily_visits": [date(2026, 1, 1) + timedelta(days=d) for d in range(365)]
+    }
+    return {"progress_data": progress, "messages": history, "gamification_data": gamification, "grade": 6}
+
+
+def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main(repeat: int = 200):
+    state = build_state(random.Random(1))
+    progress = state["progress_data"]
+
+    # The export_progress_data path: copy, sets to lists, indented JSON
+    def json_export():
+        data = dict(progress)
+        data["topic_coverage"] = {s: list(t) for s, t in data["topic_coverage"].items()}
+        return json.dumps(data, indent=2, default=str)
+
+    json_text = json_export()
+    packed = encode(progress)
+    json_ms = timed(json_export, repeat)
+    json_load_ms = timed(lambda: json.loads(json_text), repeat)
+    pack_ms = timed(lambda: encode(progress), repeat)
+    unpack_ms = timed(lambda: decode(packed), repeat)
+
+    print(f"progress_data ({len(progress['sessions'])} sessions):")
+    print(f"  JSON export:    {len(json_text.encode()):8,} bytes, write {json_ms:6.3f} ms, read {json_load_ms:6.3f} ms "
+          f"(sets and dates come back as lists and strings)")
+    print(f"  msgpack + zlib: {len(packed):8,} bytes, write {pack_ms:6.3f} ms, read {unpack_ms:6.3f} ms "
+          f"({len(json_text.encode()) / len(packed):.1f}x smaller, types preserved)")
+
+    snapshotter = SessionSnapshotter(SnapshotStore(os.path.join(tempfile.mkdtemp(), "bench.sqlite3")), min_interval=0)
+    full_ms = timed(lambda: snapshotter.checkpoint("bench", state, force=True), 1)
+    snapshotter.flush()
+    unchanged_ms = timed(lambda: snapshotter.checkpoint("bench", state, force=True), repeat)
+    state["gamification_data"]["points"] += 10
+    one_key = snapshotter.checkpoint("bench", state, force=True)
+    snapshotter.flush()
+
+    restore_ms = timed(lambda: snapshotter.restore("bench", {}), 50)
+    print(f"Full session: first checkpoint {full_ms:.2f} ms, unchanged rerun {unchanged_ms:.2f} ms, "
+          f"{one_key} key rewritten after a points change, {snapshotter.get_stats()['bytes_written']:,} bytes written")
+    print(f"Restore on reconnect: {restore_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Spaced Repetition Benchmark for ScienceGPT
+Per-student due-review lookups and whole-class summaries against a linear scan
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend_code.curriculum_data import CurriculumData
+from backend_code.spaced_repetition import DAY_SECONDS, ReviewScheduler
+
+
+def populate(scheduler: ReviewScheduler, classes: int, students_per_class: int, reviews_per_student: int,
+             seed: int = 3) -> float:
+    """Simulate 60 days of reviews; returns the simulated 'now'"""
+    rng = random.Random(seed)
+    curriculum = CurriculumData()
+    topics = [(subject, topic) for subject, names in curriculum.topics.items() for topic in names]
+    start = time.time() - 60 * DAY_SECONDS
+    for class_index in range(classes):
+        for student in range(students_per_class):
+            student_id = f"c{class_index}-s{student}"
+            studied = rng.sample(topics, 12)
+            for n in range(reviews_per_student):
+                subject, topic = rng.choice(studied)
+                at = start + (n / reviews_per_student) * 60 * DAY_SECONDS
+                scheduler.record(student_id, subject, topic, rng.choice([1, 3, 3, 4, 4, 5]), f"class-{class_index}", at)
+    return start + 60 * DAY_SECONDS
+
+
+def linear_class_summary(scheduler: ReviewScheduler, class_id: str, now: float):
+    """Reference: visit every card of the class's students in Python"""
+    counts = {}
+    for student_id in scheduler._classes[class_id].students:
+        for key, card in scheduler._decks[student_id].cards.items():
+            if card.due <= now:
+                counts[key] = counts.get(key, 0) + 1
+    return sorted(counts.items(), key=lambda entry: -entry[1])[:5]
+
+
+def run(classes: int, students_per_class: int, reviews_per_student: int = 60):
+    scheduler = ReviewScheduler(os.path.join(tempfile.mkdtemp(), "reviews.sqlite3"))
+    start = time.perf_counter()
+    now = populate(scheduler, classes, students_per_class, reviews_per_student)
+    record_us = (time.perf_counter() - start) / (classes * students_per_class * reviews_per_student) * 1e6
+    stats = scheduler.get_stats()
+
+    students = [f"c{c}-s{s}" for c in range(classes) for s in range(students_per_class)]
+    start = time.perf_counter()
+    for student_id in students:
+        scheduler.due(student_id, 3, now=now)
+    due_us = (time.perf_counter() - start) / len(students) * 1e6
+
+    start = time.perf_counter()
+    for class_index in range(classes):
+        summary = scheduler.class_summary(f"class-{class_index}", now=now)
+    vector_ms = (time.perf_counter() - start) / classes * 1000
+
+    start = time.perf_counter()
+    for class_index in range(classes):
+        reference = linear_class_summary(scheduler, f"class-{class_index}", now)
+    linear_ms = (time.perf_counter() - start) / classes * 1000
+
+    assert summary["topics"][0]["students_due"] == reference[0][1]
+    print(f"{stats['cards']:,} cards for {stats['students']:,} students in {stats['classes']} classes of "
+          f"{students_per_class}")
+    print(f"  record a review (written through to SQLite): {record_us:.1f} us; "
+          f"{stats['early']:,} early touches left the schedule alone")
+    start = time.perf_counter()
+    reloaded = ReviewScheduler(scheduler.path)
+    print(f"  reload {reloaded.get_stats()['cards']:,} cards after a restart: {(time.perf_counter() - start) * 1000:.0f} ms")
+    print(f"  due reviews for one student: {due_us:.1f} us")
+    print(f"  class summary: vectorized {vector_ms:.2f} ms, Python loop {linear_ms:.2f} ms")
+    print(f"  last class: {summary['students_with_reviews_due']} of {summary['students']} students have "
+          f"{summary['reviews_due']} reviews due")
+
+
+def main():
+    run(classes=40, students_per_class=50)
+    run(classes=2, students_per_class=2000)
+
+
+if __name__ == "__main__":
+    main()
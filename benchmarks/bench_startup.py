@@ -0,0 +1,61 @@
+"""
+Startup Benchmark for ScienceGPT
+Import-time breakdown of the app modules and the deferred API clients, plus time to first render
+"""
+
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from backend_code.startup_profile import import_time_breakdown
+
+# Modules on the cold-start path, followed by the clients that are now deferred
+STARTUP_MODULES = [
+    "streamlit",
+    "backend_code.llm_handler",
+    "frontend_components.main_interface",
+    "frontend_components.daily_challenge",
+    "frontend_components.gamification_ui",
+    "frontend_components.sidebar",
+]
+DEFERRED_MODULES = ["groq", "googleapiclient.discovery"]
+
+
+def report(module: str, top: int):
+    """Print the import cost of one module and its slowest dependencies"""
+    result = import_time_breakdown(module, top=top, cwd=ROOT)
+    status = "ok" if result["ok"] else f"FAILED ({result['error']})"
+    print(f"\n{module}: {result['total_import_ms']:.1f} ms imports, "
+          f"{result['interpreter_wall_ms']:.1f} ms interpreter wall [{status}]")
+    for entry in result["slowest"]:
+        print(f"  {entry['cumulative_ms']:>9.1f} ms  {entry['module']}")
+
+
+def main(top: int = 8):
+    """Print import breakdowns and the first-render profile recorded by the app"""
+    print("== Cold-start path ==")
+    for module in STARTUP_MODULES:
+        report(module, top)
+
+    print("\n== Deferred until first API call ==")
+    for module in DEFERRED_MODULES:
+        report(module, top)
+
+    # Written by the app on its first render when SCIENCEGPT_STARTUP_PROFILE is set
+    profile_path = os.getenv("SCIENCEGPT_STARTUP_PROFILE")
+    if profile_path and os.path.exists(profile_path):
+        with open(profile_path, encoding="utf-8") as f:
+            profile = json.load(f)
+        print("\n== App startup profile ==")
+        for name, ms in profile["milestones_ms"].items():
+            print(f"  {name:<22}{ms:>9.1f} ms")
+        print(f"  {'first render':<22}{profile['time_to_first_render_ms']:>9.1f} ms")
+    else:
+        print("\nRun the app with SCIENCEGPT_STARTUP_PROFILE=<path> and load a page to record time to first render.")
+
+
+if __name__ == "__main__":
+    main()
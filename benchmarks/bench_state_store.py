@@ -0,0 +1,92 @@
+"""
+State Store Benchmark for ScienceGPT
+Per-rerun cost of gamification and progress views with and without memoization
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SCIENCEGPT_QUIZ_PATH", os.path.join(tempfile.mkdtemp(), "quiz.sqlite3"))
+
+import streamlit as st
+
+# Outside `streamlit run` every session_state access logs a warning that would dominate the timings
+logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").setLevel(logging.ERROR)
+
+from backend_code.activity_tracker import open_session
+from backend_code.gamification import GamificationManager
+from backend_code.state_store import StateStore
+from backend_code.student_progress import StudentProgress
+
+
+def seed_session():
+    """A returning student: a year of visits, 300 learning sessions and some badges"""
+    st.session_state.session_id = "bench-session"
+    st.session_state.student_id = "bench-student"
+    st.session_state.class_id = "6B"
+    gamification = GamificationManager()
+    progress = StudentProgress()
+    data = st.session_state.gamification_data
+    data["daily_visits"] = [date.today() - timedelta(days=i) for i in range(365)]
+    data["questions_asked"] = 240
+    data["subjects_explored"] = {"Physics", "Chemistry", "Biology"}
+    for n in range(300):
+        session = open_session(6, "English")
+        session["start_time"] = (date.today() - timedelta(days=n % 60)).isoformat() + "T10:00:00"
+        session["subjects_covered"] = ["Physics"]
+        session["questions_asked"] = 3
+        st.session_state.progress_data["sessions"].append(session)
+    gamification.add_points(10)
+    return gamification, progress
+
+
+def rerun(gamification: GamificationManager, progress: StudentProgress):
+    """The gamification and progress calls every rerun makes"""
+    gamification.update_streak()
+    gamification.get_stats()
+    gamification.sync_leaderboards()
+    gamification.get_user_badges()
+    gamification.get_available_badges()
+    gamification.get_challenge_stats()
+    progress.get_progress_summary()
+    progress.get_weekly_progress()
+
+
+def measure(gamification, progress, reruns: int, memoized: bool) -> float:
+    start = time.perf_counter()
+    for _ in range(reruns):
+        if not memoized:
+            # Forget every view and mark, as if nothing were memoized
+            StateStore(st.session_state).invalidate()
+        rerun(gamification, progress)
+    return (time.perf_counter() - start) / reruns * 1e6
+
+
+def main(reruns: int = 2000):
+    gamification, progress = seed_session()
+    cold_us = measure(gamification, progress, reruns, memoized=False)
+    before = StateStore(st.session_state).get_stats()
+    warm_us = measure(gamification, progress, reruns, memoized=True)
+
+    # An event between reruns invalidates the gamification views only
+    start = time.perf_counter()
+    for _ in range(reruns // 10):
+        gamification.add_subject_explored("Physics")
+        rerun(gamification, progress)
+    after_event_us = (time.perf_counter() - start) / (reruns // 10) * 1e6
+
+    stats = StateStore(st.session_state).get_stats()
+    hits, misses = stats["hits"] - before["hits"], stats["misses"] - before["misses"]
+    print(f"views recomputed every rerun: {cold_us:.0f} us per rerun")
+    print(f"memoized, nothing changed:    {warm_us:.0f} us per rerun")
+    print(f"memoized, one event per rerun: {after_event_us:.0f} us per rerun (incl. the event)")
+    print(f"view hit rate over the memoized runs: {hits / (hits + misses):.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Video Search Benchmark for ScienceGPT
+Quota units per question and pick quality of ranked topic pools vs. a blind top search result
+"""
+
+import hashlib
+import os
+import random
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend_code.curriculum_data import CurriculumData
+from backend_code.retrieval_engine import tokenize
+from backend_code.tiered_cache import SQLiteStore, TieredCache
+from backend_code.video_search import SEARCH_COST, VIDEOS_LIST_COST, VideoSearcher, duration_fit
+
+CONCEPTS = [
+    "photosynthesis", "evaporation", "condensation", "friction", "gravity", "magnet", "circuit",
+    "reflection", "refraction", "shadow", "echo", "vibration", "lever", "pulley", "digestion",
+    "respiration", "skeleton", "muscle", "germination", "pollination", "habitat", "camouflage",
+    "migration", "fossil", "volcano", "erosion", "rainbow", "thermometer", "conduction", "insulator",
+    "solution", "crystal", "rusting", "neutralisation", "indicator", "fibre", "compost", "rainwater",
+    "windmill", "satellite"
+]
+
+QUESTION_TEMPLATES = [
+    "What is {concept}?",
+    "How does {concept} work?",
+    "Can you explain {concept} with an example?"
+]
+
+
+def _iso(seconds: int) -> str:
+    return f"PT{seconds // 60}M{seconds % 60}S"
+
+
+class FakeYouTube:
+    """Local stand-in for the YouTube Data API with a synthetic corpus and quota metering"""
+
+    def __init__(self, seed: int = 3):
+        rng = random.Random(seed)
+        curriculum = CurriculumData()
+        self.corpus = {}
+        self.topic_concepts = {}
+        self.units = 0
+        topics = sorted({topic for topics in curriculum.topics.values() for topic in topics})
+        for topic in topics:
+            concepts = rng.sample(CONCEPTS, 4)
+            self.topic_concepts[topic] = concepts
+            self._add(rng, f"{topic} | Science for kids", "Khan Academy India", "en", 420, topic, None)
+            self._add(rng, f"{topic} class video", "Study Hub", "en", 540, topic, None)
+            self._add(rng, f"{topic} full chapter one shot lecture", "Exam Toppers", "en", 3300, topic, None, 5)
+            for concept in concepts:
+                title = concept.capitalize()
+                allowed = rng.random() < 0.5
+                self._add(rng, f"{title} explained | {topic}", "NCERT OFFICIAL" if allowed else "Fun Science",
+                          "en", rng.randint(200, 420), topic, concept)
+                self._add(rng, f"{title} in Hindi | {topic}", "Vigyan Hindi", "hi", 380, topic, concept)
+                self._add(rng, f"{title} #shorts {topic}", "Quick Facts", "en", 45, topic, concept, 20)
+                self._add(rng, f"{title} detailed lecture {topic}", "Exam Toppers", "en", 2400, topic, concept, 8)
+
+    def _add(self, rng, title, channel, language, duration, topic, concept, popularity=1):
+        video_id = hashlib.md5(f"{title}{channel}".encode()).hexdigest()[:11]
+        self.corpus[video_id] = {
+            "title": title, "channel": channel, "language": language, "duration": duration,
+            "views": int(rng.randint(1_000, 200_000) * popularity), "topic": topic, "concept": concept,
+            "tokens": set(tokenize(title))
+        }
+
+    def search(self):
+        return SimpleNamespace(list=lambda **params: SimpleNamespace(execute=lambda: self._search(**params)))
+
+    def videos(self):
+        return SimpleNamespace(list=lambda **params: SimpleNamespace(execute=lambda: self._videos(**params)))
+
+    def _search(self, q, maxResults, relevanceLanguage="en", **_):
+        """Keyword match plus popularity and noise, like a relevance-ranked search with popular off-target hits"""
+        self.units += SEARCH_COST
+        query = set(tokenize(q))
+        rng = random.Random(q)
+        scored = []
+        for video_id, video in self.corpus.items():
+            overlap = len(query & video["tokens"])
+            if overlap:
+                score = (overlap + 0.4 * min(1.0, video["views"] / 1_000_000) + rng.random()
+                         + (0.2 if video["language"] == relevanceLanguage else 0.0))
+                scored.append((score, video_id))
+        scored.sort(reverse=True)
+        return {"items": [{"id": {"videoId": video_id}} for _, video_id in scored[:maxResults]]}
+
+    def _videos(self, id, **_):
+        self.units += VIDEOS_LIST_COST
+        items = []
+        for video_id in id.split(","):
+            video = self.corpus[video_id]
+            items.append({
+                "id": video_id,
+                "snippet": {"title": video["title"], "description": "", "channelId": video["channel"],
+                            "channelTitle": video["channel"], "defaultAudioLanguage": video["language"]},
+                "contentDetails": {"duration": _iso(video["duration"])},
+                "statistics": {"viewCount": str(video["views"])}
+            })
+        return {"items": items}
+
+    def is_good(self, video_id, concept, grade) -> bool:
+        """A good pick covers the question's concept, in English, at a length that suits the grade"""
+        video = self.corpus.get(video_id)
+        return (video is not None and video["concept"] == concept and video["language"] == "en"
+                and duration_fit(video["duration"], grade) >= 0.5)
+
+
+def make_questions(api: FakeYouTube, count: int, seed: int = 11):
+    rng = random.Random(seed)
+    curriculum = CurriculumData()
+    # A handful of popular topics get most questions, as in real classes
+    pairs = [(grade, subject, topic) for grade, subjects in curriculum.grade_subjects.items()
+             for subject in subjects for topic in curriculum.topics[subject]]
+    weights = [1 / (rank + 1) for rank in range(len(pairs))]
+    rng.shuffle(pairs)
+    questions = {}
+    while len(questions) < count:
+        grade, subject, topic = rng.choices(pairs, weights)[0]
+        concept = rng.choice(api.topic_concepts[topic])
+        text = rng.choice(QUESTION_TEMPLATES).format(concept=concept)
+        questions[(text, grade, subject, topic)] = concept
+    return list(questions.items())
+
+
+def run_baseline(api: FakeYouTube, questions):
+    """The previous behaviour: one search.list with maxResults=1 per question"""
+    good = 0
+    for (text, grade, subject, topic), concept in questions:
+        items = api._search(q=f"educational video for grade {grade} {subject} {topic}: {text}", maxResults=1)["items"]
+        good += bool(items) and api.is_good(items[0]["id"]["videoId"], concept, grade)
+    return good
+
+
+def run_ranked(api: FakeYouTube, questions, concurrency: int = 4):
+    """Questions arrive in groups (e.g. prefetched suggestions) and are searched concurrently"""
+    cache = TieredCache(SQLiteStore(os.path.join(tempfile.mkdtemp(), "video_cache.sqlite3")))
+    searcher = VideoSearcher(lambda: api, cache=cache)
+
+    def one(item):
+        (text, grade, subject, topic), concept = item
+        best = searcher.find(text, grade, subject, topic, "English")
+        return bool(best) and api.is_good(best["id"], concept, grade)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        good = sum(pool.map(one, questions))
+    return good, searcher.get_stats()
+
+
+def main(count: int = 600):
+    baseline_api = FakeYouTube()
+    questions = make_questions(baseline_api, count)
+    baseline_good = run_baseline(baseline_api, questions)
+
+    ranked_api = FakeYouTube()
+    ranked_good, stats = run_ranked(ranked_api, questions)
+
+    print(f"{count} distinct questions")
+    print(f"{'strategy':<22}{'units/question':>16}{'good picks':>12}")
+    print(f"{'top search result':<22}{baseline_api.units / count:>16.1f}{baseline_good / count:>12.1%}")
+    print(f"{'ranked topic pools':<22}{ranked_api.units / count:>16.1f}{ranked_good / count:>12.1%}")
+    print(f"search.list calls {stats['search_calls']} ({stats['question_searches']} question-specific), "
+          f"videos.list calls {stats['videos_calls']} at {stats['ids_per_videos_call']} IDs each, "
+          f"pool hits {stats['pool_hits']}")
+
+
+if __name__ == "__main__":
+    main()
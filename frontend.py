@@ -3,10 +3,14 @@ ScienceGPT - AI-Powered Science Learning Tool
 Main Streamlit application
 """
 
+# Imported first so its clock starts as close to process start as possible
+from backend_code import startup_profile
+
 import streamlit as st
-import os
 from datetime import datetime
 
+startup_profile.mark("streamlit_imported")
+
 # Set page config
 st.set_page_config(
     page_title="ScienceGPT",
@@ -14,27 +18,27 @@ st.set_page_config(
     layout="wide"
 )
 
-# Import components
-from frontend_components.sidebar import draw_sidebar
-from frontend_components.main_interface import draw_main_interface
-from frontend_components.gamification_ui import draw_gamification_ui
-from frontend_components.daily_challenge import draw_daily_challenge
-
-from backend_code.llm_handler import LLMHandler
-from backend_code.curriculum_data import CurriculumData
-from backend_code.gamification import GamificationManager
-from backend_code.student_progress import StudentProgress
+# Components and backend modules are imported inside the functions that use them;
+# heavy API clients are only loaded when a request needs them (see llm_handler.py).
 
 # Initialize session state variables
 def initialize_session_state():
     """Initialize all session state variables"""
+    from backend_code.session_memory import ChatHistory
+
     if 'initialized' not in st.session_state:
         st.session_state.initialized = True
         st.session_state.grade = 3
         st.session_state.language = 'English'
         st.session_state.subject = 'General Science'
         st.session_state.topic = 'All Topics'
-        st.session_state.messages = []
+        st.session_state.messages = ChatHistory()
+        st.session_state.session_id = st.session_state.messages.session_id
+        st.session_state.student_id = st.session_state.session_id
+        st.session_state.student_name = 'Learner'
+        st.session_state.class_id = ''
+        st.session_state.school_id = ''
+        st.session_state.district_id = ''
         st.session_state.points = 0
         st.session_state.badges = []
         st.session_state.streak = 0
@@ -47,8 +51,51 @@ def initialize_session_state():
         st.session_state.last_fact_time = {}
         st.session_state.settings_applied = False
 
+        # Pick up where this student left off if the server restarted since their last visit
+        restore_session_snapshot()
+
+
+def restore_session_snapshot():
+    """Restore the session named in the URL from its last snapshot and keep the URL pointing at it"""
+    from backend_code.session_snapshot import get_snapshotter
+
+    previous_id = st.query_params.get("sid")
+    if previous_id:
+        restored = get_snapshotter().restore(previous_id, st.session_state)
+        if "messages" in restored:
+            st.session_state.session_id = st.session_state.messages.session_id
+    st.query_params["sid"] = st.session_state.session_id
+
+def profiling_requested() -> bool:
+    """Whether this session asked for its reruns to be profiled (``?profile=1``, off with ``?profile=0``)"""
+    flag = st.query_params.get("profile")
+    if flag is not None:
+        st.session_state.profile_reruns = flag == "1"
+    return st.session_state.get("profile_reruns", False)
+
 def main():
-    """Main application function"""
+    """Main application function, profiled when the session asks for it or is sampled"""
+    from backend_code.profiling import get_rerun_profiler
+
+    with get_rerun_profiler().rerun(st.session_state.get("session_id", "new"), requested=profiling_requested()):
+        render()
+
+def render():
+    """Render one rerun of the app"""
+    from frontend_components.sidebar import draw_sidebar
+    from frontend_components.main_interface import draw_main_interface
+    from frontend_components.gamification_ui import draw_gamification_ui
+    from frontend_components.daily_challenge import draw_daily_challenge
+    from frontend_components.quiz import draw_quiz
+
+    from backend_code.llm_handler import LLMHandler
+    from backend_code.curriculum_data import CurriculumData
+    from backend_code.gamification import GamificationManager
+    from backend_code.student_progress import StudentProgress
+    from backend_code.session_memory import enforce_session_limits
+
+    startup_profile.mark("modules_imported")
+
     initialize_session_state()
 
     # Initialize backend components
@@ -63,6 +110,12 @@ def main():
     st.session_state.gamification = gamification
     st.session_state.progress = progress
 
+    # Queue an activity heartbeat; sessions and analytics are updated in the background
+    progress.track_rerun()
+
+    # Keep this session's footprint bounded before rendering
+    st.session_state.memory_report = enforce_session_limits(st.session_state)
+
     # Main layout
     with st.sidebar:
         draw_sidebar()
@@ -76,7 +129,15 @@ def main():
     with col2:
         draw_daily_challenge()
         st.divider()
+        draw_quiz()
+        st.divider()
         draw_gamification_ui()
 
+    # Checkpoint whatever changed this rerun so a restart does not lose it
+    from backend_code.session_snapshot import get_snapshotter
+    get_snapshotter().checkpoint(st.session_state.session_id, st.session_state)
+
+    startup_profile.record_first_render()
+
 if __name__ == "__main__":
     main()
@@ -46,9 +46,9 @@ def draw_daily_challenge():
     st.markdown(f"*Grade {grade} • {subject} • {topic_text}*")
 
     # Fact refresh button
-    if st.button("🔄 Get New Fact", help="Generate a new fact for current settings"):
-        # Clear the fact cache for current settings to force regeneration
-        llm_handler.clear_fact_cache()
+    if st.button("🔄 Get New Fact", help="Show another fact for current settings"):
+        # Pick the next fact from today's pre-generated pool instead of regenerating
+        llm_handler.next_fact(grade, subject, topic)
         st.rerun()
 
     # Display when the fact was generated
@@ -68,34 +68,28 @@ def draw_daily_challenge():
     st.markdown("---")
     st.markdown("### 🎯 Daily Challenge")
 
-    # Simple daily challenge based on current settings
-    challenge_questions = {
-        1: "Can you name 3 things you see around you that are living?",
-        2: "What makes plants green? Think about it!",
-        3: "How many bones do you think are in your body?",
-        4: "What happens to water when you heat it?",
-        5: "Why do we see different shapes of the moon?",
-        6: "What is the smallest unit of life?",
-        7: "How do magnets work?",
-        8: "What causes earthquakes?"
-    }
-
-    challenge = challenge_questions.get(grade, "What's your favorite science topic and why?")
+    # Today's entry of the monthly calendar for this grade and subject
+    challenge = llm_handler.get_daily_challenge(grade, subject)
 
     st.markdown(f"**Today's Challenge for Grade {grade}:**")
     st.info(challenge)
 
-    # Challenge completion tracking
-    if f"challenge_completed_{datetime.now().date()}" not in st.session_state:
-        if st.button("✅ I thought about it!", key="complete_challenge"):
-            st.session_state[f"challenge_completed_{datetime.now().date()}"] = True
-            if 'gamification' in st.session_state:
-                st.session_state.gamification.add_points(5)  # 5 points for daily challenge
-                st.session_state.points = st.session_state.gamification.get_total_points()
-            st.success("Great job! You earned 5 points! 🎉")
-            st.rerun()
-    else:
-        st.success("✅ Challenge completed for today!")
+    # Challenge completion is a bit per day in the student's gamification data
+    gamification = st.session_state.get('gamification')
+    if gamification is not None:
+        if not gamification.is_challenge_completed():
+            if st.button("✅ I thought about it!", key="complete_challenge"):
+                if gamification.complete_challenge(5):  # 5 points for daily challenge
+                    st.session_state.points = gamification.get_total_points()
+                st.success("Great job! You earned 5 points! 🎉")
+                st.rerun()
+        else:
+            st.success("✅ Challenge completed for today!")
+        challenge_stats = gamification.get_challenge_stats()
+        if challenge_stats["this_month"]:
+            st.caption(f"🔥 {challenge_stats['streak']}-day challenge streak • "
+                       f"{challenge_stats['this_month']} challenge{'s' if challenge_stats['this_month'] != 1 else ''} "
+                       f"this month")
 
     # Learning tip
     st.markdown("---")
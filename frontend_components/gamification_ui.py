@@ -51,6 +51,43 @@ def draw_gamification_ui():
             help="Questions asked"
         )
 
+    # Leaderboard ranks for every scope the student belongs to
+    gamification.sync_leaderboards()
+    ranks = gamification.get_leaderboard_ranks()
+
+    if ranks:
+        st.markdown("#### 🏆 Leaderboard")
+
+        scope_labels = {"class": "Class", "school": "School", "district": "District", "global": "All Students"}
+        rank_lines = []
+        for scope, info in ranks.items():
+            name = scope_labels[scope] if scope == "global" else f"{scope_labels[scope]} {info['scope_id']}"
+            rank_lines.append(f"- **{name}:** #{info['rank']} of {info['size']}")
+        st.markdown("\n".join(rank_lines))
+
+        # Show the top students of the most local scope
+        scope = next(iter(ranks))
+        top_students = gamification.get_leaderboard_top(scope, ranks[scope]["scope_id"], k=5)
+        medals = {1: "🥇", 2: "🥈", 3: "🥉"}
+        st.caption(f"Top in {scope_labels[scope].lower()}:")
+        top_lines = []
+        for entry in top_students:
+            place = medals.get(entry["rank"], f"{entry['rank']}.")
+            top_lines.append(f"- {place} {entry['name']} — {entry['points']} pts")
+        st.markdown("\n".join(top_lines))
+
+        # Topics the most classmates are due to review, from one vectorized pass over the class
+        if "class" in ranks:
+            from backend_code.spaced_repetition import get_review_scheduler
+            summary = get_review_scheduler().class_summary(ranks["class"]["scope_id"], limit=3)
+            if summary["topics"]:
+                st.caption(f"Class review: {summary['students_with_reviews_due']} of "
+                           f"{summary['students']} classmates have topics due")
+                st.markdown("\n".join(
+                    f"- {entry['topic']} ({entry['subject']}) — {entry['students_due']} due"
+                    for entry in summary["topics"]
+                ))
+
     # Display earned badges
     earned_badges = gamification.get_user_badges()
 
@@ -124,6 +161,9 @@ def draw_gamification_ui():
                 "facts_generated": 0,
                 "streak_days": 0,
                 "last_visit": st.session_state.gamification_data.get("last_visit"),
-                "daily_visits": []
+                "daily_visits": [],
+                "challenge_days": st.session_state.gamification_data.get("challenge_days")
             }
+            from backend_code.state_store import StateStore
+            StateStore(st.session_state).touch("gamification_data")
         st.rerun()
@@ -3,8 +3,190 @@ Enhanced Main Interface for ScienceGPT
 Handles chat interface, dynamic question suggestions, and video display.
 """
 
+import time
+
 import streamlit as st
 from typing import List, Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+from backend_code.session_memory import ChatHistory, ChatMessage
+from backend_code.state_store import StateStore
+
+# Messages drawn per rerun, and how many more each "load older" click adds
+HISTORY_PAGE_SIZE = 10
+
+
+def _youtube_id(video_url: str) -> Optional[str]:
+    """Extract the video id from a YouTube watch URL"""
+    return parse_qs(urlparse(video_url).query).get("v", [None])[0]
+
+
+def _draw_video(video_url: str, position: int, embed: bool):
+    """Draw a recommended video, as a full player or as a thumbnail that embeds on click"""
+    st.markdown("---")
+    st.markdown("##### 📺 Recommended Video")
+    if embed or position in st.session_state.expanded_videos:
+        st.video(video_url)
+        return
+
+    video_id = _youtube_id(video_url)
+    if video_id:
+        st.markdown(f"[![Video thumbnail](https://img.youtube.com/vi/{video_id}/mqdefault.jpg)]({video_url})")
+    else:
+        st.markdown(f"[Watch on YouTube]({video_url})")
+    if st.button("▶️ Play here", key=f"play_video_{position}"):
+        st.session_state.expanded_videos.add(position)
+        st.rerun()
+
+
+def _draw_trending_questions(grade: int, subject: str, language: str, topic: str):
+    """Draw the most asked questions for this grade, subject and language"""
+    from backend_code.trending import get_trending
+
+    trending = get_trending()
+    st.markdown(f"### 🔥 What other Grade {grade} students are asking")
+    entries = trending.top(grade, subject, language)
+    if not entries:
+        st.caption("Popular questions will appear here as students ask them.")
+        return
+
+    for i, entry in enumerate(entries):
+        if st.button(entry["question"], key=f"trending_{i}", use_container_width=True):
+            # Copies the cached answer to this topic's key so the click skips the LLM
+            trending.prepare_click(entry, grade, subject, language, topic)
+            st.session_state.user_input = entry["question"]
+            st.rerun()
+
+
+def _draw_due_reviews(subject: str):
+    """Offer topics of this subject that are due for spaced-repetition review"""
+    if 'progress' not in st.session_state:
+        return
+    due = st.session_state.progress.get_due_reviews(subject)
+    if not due:
+        return
+
+    st.caption("🔁 Time to review:")
+    for card in due:
+        if st.button(f"Can you help me review {card['topic']}?", key=f"review_{card['topic']}",
+                     use_container_width=True):
+            # Graded by the student's own check once the answer is shown, not by the click
+            prompt = f"Can you help me review {card['topic']}?"
+            st.session_state.pending_review = {"subject": card["subject"], "topic": card["topic"],
+                                               "prompt": prompt, "answered": False}
+            st.session_state.user_input = prompt
+            st.rerun()
+
+
+def _draw_review_check():
+    """Ask whether the student remembered a reviewed topic and record that as its SM-2 grade"""
+    review = st.session_state.get('pending_review')
+    if not review or not review["answered"] or 'progress' not in st.session_state:
+        return
+    from backend_code.spaced_repetition import QUALITY_FORGOTTEN, QUALITY_REVIEW
+
+    st.caption(f"🔁 Did you remember {review['topic']} before reading the answer?")
+    remembered_col, forgotten_col = st.columns(2)
+    quality = None
+    if remembered_col.button("✅ I remembered it", key="review_remembered", use_container_width=True):
+        quality = QUALITY_REVIEW
+    if forgotten_col.button("🤔 I had forgotten", key="review_forgotten", use_container_width=True):
+        quality = QUALITY_FORGOTTEN
+    if quality is not None:
+        st.session_state.progress.track_review(review["subject"], review["topic"], quality)
+        st.session_state.pending_review = None
+        st.rerun()
+
+
+def _student_id() -> str:
+    return st.session_state.get('student_id') or st.session_state.get('session_id', 'anonymous')
+
+
+def _load_stored_history(messages: ChatHistory):
+    """Start an empty session from the newest page of the student's stored turns
+
+    Older stored turns are counted but only read when "load older" reaches them.
+    """
+    from backend_code.chat_store import get_chat_store
+
+    archive = {"before_id": None, "count": 0}
+    if not messages.total_count():
+        store = get_chat_store()
+        recent = store.page(_student_id(), HISTORY_PAGE_SIZE)
+        if recent:
+            # Earlier visits' questions are history, not questions asked this session
+            messages.extend((ChatMessage(m["role"], m["content"], m["video_url"]) for m in recent), counted=False)
+            archive = {"before_id": recent[0]["id"], "count": store.count(_student_id(), recent[0]["id"])}
+    st.session_state.history_archive = archive
+    StateStore(st.session_state).touch("messages", "history_archive")
+
+
+def _remember(message: ChatMessage, subject: str, question: Optional[str] = None):
+    """Add a turn to the session history and the student's persistent chat store"""
+    from backend_code.chat_store import get_chat_store
+
+    st.session_state.messages.append(message)
+    StateStore(st.session_state).touch("messages")
+    get_chat_store().append(_student_id(), message, subject, question)
+
+
+def _draw_history_search():
+    """Keyword search over the student's past answers, so revisiting one costs no LLM call"""
+    with st.expander("🔎 Search your past answers"):
+        query = st.text_input("Keywords", key="history_search", placeholder="e.g. photosynthesis sunlight")
+        if not query:
+            return
+        from backend_code.chat_store import get_chat_store
+        results = get_chat_store().search(_student_id(), query)
+        if not results:
+            st.caption("No past answers match all of these keywords.")
+        for result in results:
+            st.markdown(f"**{result['question']}**")
+            st.markdown(result["content"])
+            if result["video_url"]:
+                st.markdown(f"[📺 Recommended video]({result['video_url']})")
+            st.divider()
+
+
+def _history_window(messages: ChatHistory, window: int, archive: Dict) -> tuple:
+    """The newest ``window`` messages (reading older ones back as needed) and the total count"""
+    in_memory = list(messages)
+    visible = in_memory[-window:]
+    if window > len(in_memory):
+        # Older turns were spilled to disk; read back only what the window needs
+        visible = messages.load_spilled(window - len(in_memory)) + visible
+    if window > len(visible) and archive["count"]:
+        # Turns from earlier visits come from the chat store, one page at a time
+        from backend_code.chat_store import get_chat_store
+        stored = get_chat_store().page(_student_id(), window - len(visible), archive["before_id"])
+        visible = [ChatMessage(m["role"], m["content"], m["video_url"]) for m in stored] + visible
+    return visible, messages.total_count() + archive["count"]
+
+
+def _draw_chat_history(messages: ChatHistory):
+    """Draw the newest window of the conversation with a control to load older turns
+
+    Only ``history_window`` messages are drawn and only the latest answer embeds its
+    video, so a rerun costs about the same however long the conversation gets.
+    """
+    window = st.session_state.history_window
+    # Spill-file and chat-store reads are repeated only when the history or the window changed
+    visible, total = StateStore(st.session_state).view(
+        "chat_window", ("messages", "history_archive"),
+        lambda: _history_window(messages, window, st.session_state.history_archive), window
+    )
+    if total > len(visible):
+        if st.button(f"⬆️ Load older messages ({total - len(visible)} more)", key="load_older_messages"):
+            st.session_state.history_window += HISTORY_PAGE_SIZE
+            st.rerun()
+
+    first_position = total - len(visible)
+    last_answer = max((i for i, m in enumerate(visible) if m["role"] == "assistant"), default=None)
+    for i, message in enumerate(visible):
+        with st.chat_message(message["role"]):
+            st.markdown(message["content"])
+            if message["role"] == "assistant" and message["video_url"]:
+                _draw_video(message["video_url"], first_position + i, embed=(i == last_answer))
 
 def draw_main_interface():
     """Draw the enhanced main interface with a simplified and robust chat handler."""
@@ -26,20 +208,29 @@ def draw_main_interface():
     with st.spinner("Generating personalized questions..."):
         suggestions = llm_handler.generate_suggestions(grade, subject, language, topic)
 
-    # Display suggested questions
-    st.markdown("### 💭 Suggested Questions")
-    st.markdown(f"*Based on Grade {grade} {subject} in {language}*")
-
-    col1, col2 = st.columns(2)
     # Use a session state variable to hold input from buttons
     if "user_input" not in st.session_state:
         st.session_state.user_input = None
 
-    for i, suggestion in enumerate(suggestions):
-        with col1 if i % 2 == 0 else col2:
-            if st.button(suggestion, key=f"suggestion_{i}", use_container_width=True):
-                st.session_state.user_input = suggestion
-                st.rerun()
+    suggestions_col, trending_col = st.columns([2, 1])
+
+    # Display suggested questions
+    with suggestions_col:
+        st.markdown("### 💭 Suggested Questions")
+        st.markdown(f"*Based on Grade {grade} {subject} in {language}*")
+
+        _draw_due_reviews(subject)
+
+        col1, col2 = st.columns(2)
+        for i, suggestion in enumerate(suggestions):
+            with col1 if i % 2 == 0 else col2:
+                if st.button(suggestion, key=f"suggestion_{i}", use_container_width=True):
+                    st.session_state.user_input = suggestion
+                    st.rerun()
+
+    # Display what other students in the same grade are asking
+    with trending_col:
+        _draw_trending_questions(grade, subject, language, topic)
 
     # Chat interface
     st.markdown("---")
@@ -47,15 +238,17 @@ def draw_main_interface():
 
     # Initialize and display chat messages
     if 'messages' not in st.session_state:
-        st.session_state.messages = []
+        st.session_state.messages = ChatHistory()
+    if 'history_window' not in st.session_state:
+        st.session_state.history_window = HISTORY_PAGE_SIZE
+    if 'expanded_videos' not in st.session_state:
+        st.session_state.expanded_videos = set()
+    if 'history_archive' not in st.session_state:
+        _load_stored_history(st.session_state.messages)
 
-    for message in st.session_state.messages:
-        with st.chat_message(message["role"]):
-            st.markdown(message["content"])
-            if message["role"] == "assistant" and "video_url" in message and message["video_url"]:
-                st.markdown("---")
-                st.markdown("##### 📺 Recommended Video")
-                st.video(message["video_url"])
+    _draw_chat_history(st.session_state.messages)
+    _draw_review_check()
+    _draw_history_search()
 
     # Process input from either a button click or the chat input box
     prompt = st.chat_input(f"Ask your {subject} question in {language}...")
@@ -65,8 +258,14 @@ def draw_main_interface():
 
     # Main logic block to handle a new prompt
     if prompt:
+        # Greetings, repeats and off-topic input are answered locally without an LLM call
+        from backend_code.prefilter import get_prefilter
+        previous_question, previous_at = st.session_state.get("last_question") or (None, None)
+        prefiltered = get_prefilter().check(prompt, subject, previous_question, previous_at)
+        is_question = prefiltered["reply"] is None
+
         # Add user message to history and display it
-        st.session_state.messages.append({"role": "user", "content": prompt})
+        _remember(ChatMessage("user", prompt), subject)
         
         # Display the user's message immediately
         with st.chat_message("user"):
@@ -74,25 +273,41 @@ def draw_main_interface():
 
         # Generate and display assistant response
         with st.chat_message("assistant"):
-            with st.spinner("Thinking and finding a relevant video..."):
-                response_data = llm_handler.generate_response(
-                    prompt, grade, subject, language, topic
-                )
-                response_text = response_data.get("text", "Sorry, I encountered an error.")
-                video_url = response_data.get("video_url")
-
-                st.markdown(response_text)
-                if video_url:
-                    st.markdown("---")
-                    st.markdown("##### 📺 Recommended Video")
-                    st.video(video_url)
-
-        # Add assistant message to history
-        assistant_message = {"role": "assistant", "content": response_text, "video_url": video_url}
-        st.session_state.messages.append(assistant_message)
-
-        # Update gamification stats
-        if 'gamification' in st.session_state:
+            if not is_question:
+                response_data = {"text": prefiltered["reply"], "video_url": None, "prefiltered": True}
+            else:
+                with st.spinner("Thinking and finding a relevant video..."):
+                    response_data = llm_handler.generate_response(
+                        prompt, grade, subject, language, topic
+                    )
+            response_text = response_data.get("text", "Sorry, I encountered an error.")
+            video_url = response_data.get("video_url")
+
+            st.markdown(response_text)
+            if video_url:
+                st.markdown("---")
+                st.markdown("##### 📺 Recommended Video")
+                st.video(video_url)
+
+        # Only a real answer counts: a throttled, budget-refused or failed question can be retried
+        answered = is_question and not response_data.get("throttled") and not response_data.get("error")
+        if answered:
+            st.session_state.last_question = (prompt, time.time())
+            if 'progress' in st.session_state:
+                st.session_state.progress.track_question(subject, grade, topic)
+
+        # Add assistant message to history and jump back to the newest window
+        _remember(ChatMessage("assistant", response_text, video_url), subject, prompt)
+        review = st.session_state.get('pending_review')
+        if review:
+            # Any other question drops the check; the review is offered again while it is due
+            review["answered"] = prompt == review["prompt"] and answered
+            if not review["answered"]:
+                st.session_state.pending_review = None
+        st.session_state.history_window = HISTORY_PAGE_SIZE
+
+        # Update gamification stats (throttled, failed and pre-filtered input earns no points)
+        if 'gamification' in st.session_state and answered:
             # This single call handles points, achievements, and question count
             st.session_state.gamification.add_question()
         
@@ -0,0 +1,110 @@
+"""
+Quick Quiz Component for ScienceGPT
+Serves quizzes from the pre-generated item bank and grades them instantly in the browser session
+"""
+
+import streamlit as st
+
+from backend_code.quiz_bank import DIFFICULTIES, QuizItem
+
+POINTS_PER_CORRECT = 5
+PERFECT_BONUS = 5
+
+DIFFICULTY_OPTIONS = ["Mixed"] + list(DIFFICULTIES.values())
+
+
+def _draw_item(item: QuizItem, position: int):
+    """Draw the input for one quiz item and return the student's response"""
+    st.markdown(f"**Q{position + 1}.** {item.question}")
+    key = f"quiz_{item.id}"
+    if item.kind == "mcq":
+        return st.radio("Choose one", range(len(item.options)), format_func=lambda i: item.options[i],
+                        index=None, key=key, label_visibility="collapsed")
+    if item.kind == "true_false":
+        choice = st.radio("True or false", ["True", "False"], index=None, key=key, horizontal=True,
+                          label_visibility="collapsed")
+        return None if choice is None else choice == "True"
+    return st.text_input("Your answer (a number)", key=key)
+
+
+def _draw_results(quiz: dict):
+    """Show the score and the correct answers with explanations"""
+    items = [QuizItem.from_dict(item) for item in quiz["items"]]
+    correct = sum(quiz["results"])
+    st.success(f"You got {correct} of {len(items)} right and earned {quiz['points']} points! 🎉")
+    for position, (item, ok) in enumerate(zip(items, quiz["results"])):
+        mark = "✅" if ok else "❌"
+        st.markdown(f"{mark} **Q{position + 1}.** {item.question}")
+        if not ok:
+            st.caption(f"Answer: {item.correct_text()}")
+        if item.explanation:
+            st.caption(item.explanation)
+
+
+def draw_quiz():
+    """Draw the quick quiz: pick a difficulty, answer, and get graded without waiting"""
+    st.markdown("### 📝 Quick Quiz")
+
+    grade = st.session_state.get('grade', 3)
+    subject = st.session_state.get('subject', 'General Science')
+    topic = st.session_state.get('topic', 'All Topics')
+
+    if 'llm_handler' not in st.session_state:
+        from backend_code.llm_handler import LLMHandler
+        st.session_state.llm_handler = LLMHandler()
+
+    quiz = st.session_state.get("quiz")
+    # A quiz belongs to the settings it was drawn for
+    if quiz and quiz["settings"] != [grade, subject, topic]:
+        quiz = st.session_state.quiz = None
+
+    if not quiz:
+        difficulty = st.selectbox("Difficulty", DIFFICULTY_OPTIONS, key="quiz_difficulty")
+        if st.button("🚀 Start a 5-question quiz", key="start_quiz"):
+            level = None if difficulty == "Mixed" else DIFFICULTY_OPTIONS.index(difficulty)
+            with st.spinner("Preparing your quiz..."):
+                items = st.session_state.llm_handler.get_quiz(grade, subject, topic, level)
+            if items:
+                st.session_state.quiz = {
+                    "settings": [grade, subject, topic],
+                    "items": [item.to_dict() for item in items],
+                    "results": None,
+                    "points": 0
+                }
+                st.rerun()
+            st.info("No quiz is ready for these settings yet. Please try again in a little while!")
+        return
+
+    if quiz["results"] is not None:
+        _draw_results(quiz)
+        if st.button("🔁 New quiz", key="new_quiz"):
+            st.session_state.quiz = None
+            st.rerun()
+        return
+
+    items = [QuizItem.from_dict(item) for item in quiz["items"]]
+    with st.form("quiz_form"):
+        responses = [_draw_item(item, position) for position, item in enumerate(items)]
+        submitted = st.form_submit_button("✅ Check my answers")
+
+    if submitted:
+        # Graded locally against the stored answers: no LLM round-trip
+        from backend_code.quiz_bank import get_quiz_bank
+        results = get_quiz_bank().grade(items, responses)
+        points = POINTS_PER_CORRECT * sum(results) + (PERFECT_BONUS if all(results) else 0)
+        quiz["results"] = results
+        quiz["points"] = points
+        if 'progress' in st.session_state:
+            # Each topic in the quiz is an SM-2 review graded by the score on it
+            from backend_code.spaced_repetition import quiz_quality
+            by_topic = {}
+            for item, ok in zip(items, results):
+                by_topic.setdefault((item.subject, item.topic), []).append(ok)
+            for (item_subject, item_topic), outcomes in by_topic.items():
+                if item_topic != "All Topics":
+                    st.session_state.progress.track_review(item_subject, item_topic,
+                                                           quiz_quality(sum(outcomes), len(outcomes)))
+        if 'gamification' in st.session_state and points:
+            st.session_state.gamification.add_points(points)
+            st.session_state.points = st.session_state.gamification.get_total_points()
+        st.rerun()
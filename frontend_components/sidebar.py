@@ -71,10 +71,10 @@ def draw_sidebar():
 
         # Check if settings actually changed
         if old_settings != new_settings:
-            # Clear caches to force regeneration of suggestions and facts
+            # Clear the suggestion cache to force regeneration; facts are keyed by
+            # settings in the shared fact store, so they need no invalidation
             if 'llm_handler' in st.session_state:
                 st.session_state.llm_handler.clear_suggestion_cache()
-                st.session_state.llm_handler.clear_fact_cache()
 
             # Set flag to indicate settings were applied
             st.session_state.settings_applied = True
@@ -101,6 +101,22 @@ def draw_sidebar():
     - **Topic:** {current_topic}
     """)
 
+    # Student profile used for class, school and district leaderboards
+    with st.expander("👤 Your Profile"):
+        student_name = st.text_input("Name:", value=st.session_state.get('student_name', 'Learner'))
+        class_id = st.text_input("Class code:", value=st.session_state.get('class_id', ''))
+        school_id = st.text_input("School:", value=st.session_state.get('school_id', ''))
+        district_id = st.text_input("District:", value=st.session_state.get('district_id', ''))
+
+        if st.button("Save Profile", use_container_width=True):
+            st.session_state.student_name = student_name.strip() or 'Learner'
+            st.session_state.class_id = class_id.strip()
+            st.session_state.school_id = school_id.strip()
+            st.session_state.district_id = district_id.strip()
+            if 'gamification' in st.session_state:
+                st.session_state.gamification.sync_leaderboards()
+            st.success("✅ Profile saved!")
+
     # Progress summary
     st.markdown("---")
     st.markdown("#### 📈 Progress Summary")
@@ -115,7 +131,7 @@ def draw_sidebar():
         st.metric("Streak", f"{streak} days")
     with col2:
         st.metric("Badges", badges_count)
-        questions_asked = len([msg for msg in st.session_state.get('messages', []) if msg.get('role') == 'user'])
+        questions_asked = st.session_state.messages.user_count
         st.metric("Questions", questions_asked)
 
     # Quick tips